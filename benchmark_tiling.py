@@ -0,0 +1,75 @@
+# Benchmark the tiling code on synthetic catalogues
+#
+# e.g.
+# python benchmark_tiling.py --catalogues uniform clustered --sizes 1000 10000
+#     --output bench-new.json --compare bench-old.json
+#
+# See taipan/benchmark.py for the catalogues and benchmarks available.
+
+import taipan.benchmark as bm
+import argparse
+import logging
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Time the tiling code on seeded synthetic catalogues.')
+    parser.add_argument('--catalogues', nargs='+', default=['uniform'],
+                        choices=bm.CATALOGUE_TYPES,
+                        help='Catalogue types to benchmark on')
+    parser.add_argument('--sizes', nargs='+', type=int, default=[1000],
+                        help='Numbers of science targets (e.g. 1000 to '
+                             '1000000)')
+    parser.add_argument('--benchmarks', nargs='+', default=bm.BENCHMARKS,
+                        choices=bm.BENCHMARKS, help='Benchmarks to run')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--region', nargs=4, type=float,
+                        default=[30., 40., -34., -26.],
+                        metavar=('RA_MIN', 'RA_MAX', 'DEC_MIN', 'DEC_MAX'))
+    parser.add_argument('--completeness-target', type=float, default=0.9)
+    parser.add_argument('--tiling-file', default='ipack.3.8192.txt')
+    parser.add_argument('--ncpu', type=int, default=1)
+    parser.add_argument('--output', default='benchmark_tiling.json',
+                        help='File to write the results to')
+    parser.add_argument('--compare', default=None,
+                        help='Results file from an earlier run to compare '
+                             'against')
+    parser.add_argument('--verbose', action='store_true',
+                        help='Log the progress of the tilings')
+    args = parser.parse_args()
+
+    # The tiling functions log every tile, so only do so if asked
+    logging.basicConfig(level=logging.INFO if args.verbose
+                        else logging.WARNING,
+                        format='%(asctime)s %(message)s')
+
+    ra_min, ra_max, dec_min, dec_max = args.region
+    results = bm.run_benchmarks(catalogue_types=args.catalogues,
+                                sizes=args.sizes,
+                                benchmarks=args.benchmarks,
+                                seed=args.seed,
+                                ra_min=ra_min, ra_max=ra_max,
+                                dec_min=dec_min, dec_max=dec_max,
+                                completeness_target=args.completeness_target,
+                                tiling_file=args.tiling_file,
+                                ncpu=args.ncpu)
+    bm.write_results(results, args.output)
+
+    print '%-10s %8s %-11s %-18s %10s' % ('catalogue', 'targets',
+                                          'benchmark', 'variant', 'time (s)')
+    for r in results['results']:
+        print '%-10s %8d %-11s %-18s %10.3f' % (r['catalogue'],
+                                                r['n_targets'],
+                                                r['benchmark'], r['variant'],
+                                                r['time'])
+    print 'Results written to %s' % args.output
+
+    if args.compare is not None:
+        baseline = bm.read_results(args.compare)
+        print
+        print 'Compared with %s (commit %s):' % (
+            args.compare, baseline['metadata'].get('commit'))
+        for (catalogue, n_targets, benchmark, variant, before, after,
+             ratio) in bm.compare_results(baseline, results):
+            print '%-10s %8d %-11s %-18s %10.3f %10.3f %6.2fx' % (
+                catalogue, n_targets, benchmark, variant, before, after,
+                ratio)
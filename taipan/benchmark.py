@@ -0,0 +1,568 @@
+#!python
+
+# Module for benchmarking the TAIPAN tiling code on synthetic catalogues
+
+# The catalogue generators are seeded, so the same catalogue is produced for
+# the same arguments on any machine. The benchmark results are written as
+# JSON with sorted keys, so results from different commits may be compared
+# directly (see compare_results).
+
+import core as tp
+import tiling as tl
+import time
+import random
+import numpy as np
+import logging
+import json
+import os
+import platform
+import subprocess
+import datetime
+from collections import OrderedDict
+
+# ------
+# CONSTANTS
+# ------
+
+# Format version of the benchmark results files
+BENCHMARK_FORMAT_VERSION = 1
+
+# Synthetic catalogue types
+CATALOGUE_TYPES = [
+    'uniform',          # Uniform density on the sky
+    'clustered',        # Gaussian clusters on a uniform background
+    'galactic',         # Density rising towards the Galactic plane
+    'funnelweb',        # As for galactic, with stellar magnitudes
+]
+
+# Benchmarks, in the order they are run
+BENCHMARKS = [
+    'difficulty',       # core.compute_target_difficulties
+    'unpick',           # TaipanTile.unpick_tile, for each allocation method
+    'greedy',           # tiling.generate_tiling_greedy
+    'byorder',          # tiling.generate_tiling_byorder
+    'funnelweb',        # tiling.generate_tiling_funnelweb
+]
+
+# Target allocation methods timed by the 'unpick' benchmark
+UNPICK_METHODS = [
+    'priority',
+    'most_difficult',
+    'combined_weighted',
+    'sequential',
+]
+
+# Maximum number of tiles unpicked by the 'unpick' benchmark
+UNPICK_BENCHMARK_TILES = 20
+
+# Rotation matrix from equatorial (J2000) to Galactic unit vectors
+EQ_TO_GAL = np.array([
+    [-0.0548755604, -0.8734370902, -0.4838350155],
+    [0.4941094279, -0.4448296300, 0.7469822445],
+    [-0.8676661490, -0.1980763734, 0.4559837762],
+])
+
+# Parameters of the synthetic catalogues
+CLUSTER_SIZE = 500                  # Mean targets per cluster
+CLUSTER_FRACTION = 0.7              # Fraction of targets in clusters
+CLUSTER_SIGMA = 0.5                 # Cluster radius (deg)
+GALACTIC_SCALE = 10.0               # Scale height in Galactic latitude (deg)
+GALACTIC_FLOOR = 0.1                # Relative density far from the plane
+FUNNELWEB_MAG_RANGE = (5., 14.)     # Magnitude range
+FUNNELWEB_MAG_SLOPE = 0.35          # d(log N)/dm of the number counts
+
+# Magnitude ranges used by the 'funnelweb' benchmark
+FUNNELWEB_MAG_RANGES = [[5, 8], [7, 10], [9, 12], [11, 14]]
+FUNNELWEB_MAG_RANGES_PRIORITISE = [[5, 7], [7, 8], [9, 10], [11, 12]]
+FUNNELWEB_COMPLETENESS_PRIORITY = 4
+# Priority boost in the prioritised ranges; keeps the synthetic priorities
+# (1 - 8) within TARGET_PRIORITY_MAX
+FUNNELWEB_PRIORITISE_EXTRA = 2
+
+
+# ------
+# CATALOGUE GENERATION
+# ------
+
+def _uniform_positions(rng, n, ra_min, ra_max, dec_min, dec_max):
+    # Positions distributed uniformly over the sky within the bounds
+    ra = rng.uniform(ra_min, ra_max, n) % 360.
+    dec = np.degrees(np.arcsin(rng.uniform(np.sin(np.radians(dec_min)),
+                                           np.sin(np.radians(dec_max)), n)))
+    return ra, dec
+
+
+def galactic_latitude(ra, dec):
+    """
+    Compute the Galactic latitude of equatorial (J2000) positions.
+
+    Parameters
+    ----------
+    ra, dec : array-like
+        The RA and Dec of the positions, in decimal degrees.
+
+    Returns
+    -------
+    b : :class:`numpy.ndarray`
+        The Galactic latitude of each position, in decimal degrees.
+    """
+    ra = np.radians(np.asarray(ra, dtype=float))
+    dec = np.radians(np.asarray(dec, dtype=float))
+    posns = np.array([np.cos(dec) * np.cos(ra),
+                      np.cos(dec) * np.sin(ra),
+                      np.sin(dec)])
+    return np.degrees(np.arcsin(np.clip(np.dot(EQ_TO_GAL[2], posns),
+                                        -1., 1.)))
+
+
+def _clustered_positions(rng, n, ra_min, ra_max, dec_min, dec_max):
+    # A CLUSTER_FRACTION of the targets are placed in Gaussian clusters of
+    # radius CLUSTER_SIGMA, the rest uniformly
+    n_clusters = max(1, int(round(n * CLUSTER_FRACTION / CLUSTER_SIZE)))
+    cluster_ra, cluster_dec = _uniform_positions(rng, n_clusters, ra_min,
+                                                 ra_max, dec_min, dec_max)
+    n_clustered = int(round(n * CLUSTER_FRACTION))
+    ra, dec = [], []
+    n_found = 0
+    while n_found < n_clustered:
+        k = rng.randint(0, n_clusters, n_clustered - n_found)
+        new_dec = cluster_dec[k] + rng.normal(0., CLUSTER_SIGMA, len(k))
+        new_ra = (cluster_ra[k] + rng.normal(0., CLUSTER_SIGMA, len(k)) /
+                  np.cos(np.radians(np.clip(new_dec, -89., 89.)))) % 360.
+        keep = (np.abs(new_dec) <= 90.) & tl.is_within_bounds_array(
+            new_ra, np.clip(new_dec, -90., 90.), ra_min, ra_max, dec_min,
+            dec_max)
+        ra.append(new_ra[keep])
+        dec.append(new_dec[keep])
+        n_found += np.sum(keep)
+    uniform_ra, uniform_dec = _uniform_positions(rng, n - n_clustered, ra_min,
+                                                 ra_max, dec_min, dec_max)
+    return (np.concatenate(ra + [uniform_ra]),
+            np.concatenate(dec + [uniform_dec]))
+
+
+def _galactic_positions(rng, n, ra_min, ra_max, dec_min, dec_max):
+    # Rejection-sample uniform positions, with an acceptance probability
+    # falling off exponentially with Galactic latitude
+    ra, dec = [], []
+    n_found = 0
+    while n_found < n:
+        new_ra, new_dec = _uniform_positions(rng, 2 * (n - n_found), ra_min,
+                                             ra_max, dec_min, dec_max)
+        accept = GALACTIC_FLOOR + (1. - GALACTIC_FLOOR) * np.exp(
+            -1. * np.abs(galactic_latitude(new_ra, new_dec)) / GALACTIC_SCALE)
+        keep = np.flatnonzero(rng.uniform(0., 1., len(new_ra)) < accept)
+        keep = keep[:n - n_found]
+        ra.append(new_ra[keep])
+        dec.append(new_dec[keep])
+        n_found += len(keep)
+    return np.concatenate(ra), np.concatenate(dec)
+
+
+def _funnelweb_mags(rng, n):
+    # Magnitudes with number counts rising as 10**(FUNNELWEB_MAG_SLOPE * m),
+    # drawn by inverting the cumulative distribution
+    mag_min, mag_max = FUNNELWEB_MAG_RANGE
+    lo = 10. ** (FUNNELWEB_MAG_SLOPE * mag_min)
+    hi = 10. ** (FUNNELWEB_MAG_SLOPE * mag_max)
+    return np.log10(rng.uniform(lo, hi, n)) / FUNNELWEB_MAG_SLOPE
+
+
+def generate_catalogue(catalogue_type, n_targets, seed=0,
+                       ra_min=30.0, ra_max=40.0, dec_min=-34.0, dec_max=-26.0,
+                       standard_fraction=0.1, guide_fraction=0.1):
+    """
+    Generate a synthetic catalogue of science, standard and guide targets.
+
+    The catalogue depends only on the arguments, not on the state of the
+    random module.
+
+    Parameters
+    ----------
+    catalogue_type :
+        The type of catalogue to generate, one of CATALOGUE_TYPES:
+        'uniform' - Targets distributed uniformly on the sky
+        'clustered' - A fraction CLUSTER_FRACTION of the targets in Gaussian
+        clusters of radius CLUSTER_SIGMA, the rest distributed uniformly
+        'galactic' - Target density falling off exponentially (with scale
+        GALACTIC_SCALE) away from the Galactic plane
+        'funnelweb' - As for 'galactic', with magnitudes following stellar
+        number counts over FUNNELWEB_MAG_RANGE (all targets, standards and
+        guides are given magnitudes)
+
+    n_targets :
+        The number of science targets to generate.
+
+    seed :
+        The seed for the catalogue. Defaults to 0.
+
+    ra_min, ra_max, dec_min, dec_max :
+        The region to generate targets in (see tiling.compute_bounds).
+        Defaults to a 10 x 8 deg region.
+
+    standard_fraction, guide_fraction :
+        The number of standards and guides to generate, as a fraction of
+        n_targets. Standards and guides are distributed uniformly. Default
+        to 0.1.
+
+    Returns
+    -------
+    candidate_targets, standard_targets, guide_targets :
+        Lists of TaipanTarget objects, with their unit sphere positions and
+        (for the candidate targets) difficulties computed.
+    """
+    if catalogue_type not in CATALOGUE_TYPES:
+        raise ValueError('catalogue_type must be one of %s' %
+                         str(CATALOGUE_TYPES))
+    n_targets = int(n_targets)
+    if n_targets <= 0:
+        raise ValueError('n_targets must be > 0')
+
+    ra_min, ra_max, dec_min, dec_max = tl.compute_bounds(ra_min, ra_max,
+                                                         dec_min, dec_max)
+    rng = np.random.RandomState(seed)
+    if catalogue_type == 'uniform':
+        ra, dec = _uniform_positions(rng, n_targets, ra_min, ra_max,
+                                     dec_min, dec_max)
+    elif catalogue_type == 'clustered':
+        ra, dec = _clustered_positions(rng, n_targets, ra_min, ra_max,
+                                       dec_min, dec_max)
+    else:
+        ra, dec = _galactic_positions(rng, n_targets, ra_min, ra_max,
+                                      dec_min, dec_max)
+    priorities = rng.randint(1, 9, n_targets)
+    n_standards = int(round(n_targets * standard_fraction))
+    n_guides = int(round(n_targets * guide_fraction))
+    standard_ra, standard_dec = _uniform_positions(rng, n_standards, ra_min,
+                                                   ra_max, dec_min, dec_max)
+    guide_ra, guide_dec = _uniform_positions(rng, n_guides, ra_min, ra_max,
+                                             dec_min, dec_max)
+    mags = [None] * (n_targets + n_standards + n_guides)
+    if catalogue_type == 'funnelweb':
+        mags = [float(m) for m in _funnelweb_mags(rng, len(mags))]
+
+    candidate_targets = [tp.TaipanTarget(i + 1, ra[i], dec[i],
+                                         priority=int(priorities[i]),
+                                         mag=mags[i])
+                         for i in range(n_targets)]
+    standard_targets = [tp.TaipanTarget(
+        n_targets + i + 1, standard_ra[i], standard_dec[i], standard=True,
+        mag=mags[n_targets + i])
+        for i in range(n_standards)]
+    guide_targets = [tp.TaipanTarget(
+        n_targets + n_standards + i + 1, guide_ra[i], guide_dec[i],
+        guide=True, mag=mags[n_targets + n_standards + i])
+        for i in range(n_guides)]
+    for t in candidate_targets + standard_targets + guide_targets:
+        t.compute_usposn()
+    tp.compute_target_difficulties(candidate_targets)
+
+    return candidate_targets, standard_targets, guide_targets
+
+
+# ------
+# BENCHMARKS
+# ------
+
+def _time_call(function, *args, **kwargs):
+    # Call function, returning the wall time taken and the return value
+    start = time.time()
+    result = function(*args, **kwargs)
+    return time.time() - start, result
+
+
+def _tiling_record(result, elapsed):
+    # Summarise a tiling entry point called with return_report=True
+    tiles, completeness, remaining, report = result
+    return OrderedDict([
+        ('time', elapsed),
+        ('result', OrderedDict([('tiles', len(tiles)),
+                                ('completeness', completeness),
+                                ('remaining_targets', len(remaining))])),
+        ('stages', report['stages']),
+        ('counters', report['counters']),
+    ])
+
+
+def _benchmark_difficulty(catalogue, settings):
+    candidate_targets = catalogue[0]
+    elapsed, burn = _time_call(tp.compute_target_difficulties,
+                               candidate_targets)
+    yield '', OrderedDict([
+        ('time', elapsed),
+        ('result', OrderedDict([('mean_difficulty', float(np.mean(
+            [t.difficulty for t in candidate_targets])))])),
+    ])
+
+
+def _benchmark_unpick(catalogue, settings):
+    candidate_targets, standard_targets, guide_targets = catalogue
+    random.seed(settings['seed'])
+    tiles = tl.generate_SH_tiling(
+        settings['tiling_file'], randomise_seed=False, randomise_pa=False,
+        ra_min=settings['ra_min'], ra_max=settings['ra_max'],
+        dec_min=settings['dec_min'], dec_max=settings['dec_max'])
+    tiles = tiles[:UNPICK_BENCHMARK_TILES]
+    for method in UNPICK_METHODS:
+        assigned = []
+        start = time.time()
+        for tile in tiles:
+            tile = tile.clone()
+            burn = tile.unpick_tile(candidate_targets[:], standard_targets,
+                                    guide_targets, overwrite_existing=True,
+                                    check_tile_radius=True,
+                                    recompute_difficulty=False,
+                                    method=method,
+                                    consider_removed_targets=False)
+            assigned.append(tile.count_assigned_targets_science())
+        elapsed = time.time() - start
+        yield method, OrderedDict([
+            ('time', elapsed),
+            ('result', OrderedDict([
+                ('tiles', len(tiles)),
+                ('mean_targets_per_tile',
+                 float(np.mean(assigned)) if len(assigned) > 0 else 0.)])),
+        ])
+
+
+def _tiling_kwargs(settings):
+    # Arguments common to the tiling entry points
+    return dict(completeness_target=settings['completeness_target'],
+                tiling_file=settings['tiling_file'],
+                ra_min=settings['ra_min'], ra_max=settings['ra_max'],
+                dec_min=settings['dec_min'], dec_max=settings['dec_max'],
+                ncpu=settings['ncpu'],
+                return_report=True)
+
+
+def _benchmark_greedy(catalogue, settings):
+    random.seed(settings['seed'])
+    elapsed, result = _time_call(
+        tl.generate_tiling_greedy, catalogue[0][:], catalogue[1],
+        catalogue[2], ranking_method='priority-sum',
+        **_tiling_kwargs(settings))
+    yield '', _tiling_record(result, elapsed)
+
+
+def _benchmark_byorder(catalogue, settings):
+    random.seed(settings['seed'])
+    elapsed, result = _time_call(
+        tl.generate_tiling_byorder, catalogue[0][:], catalogue[1],
+        catalogue[2], tiling_order='density',
+        **_tiling_kwargs(settings))
+    yield '', _tiling_record(result, elapsed)
+
+
+def _benchmark_funnelweb(catalogue, settings):
+    if catalogue[0][0].mag is None:
+        logging.info('Skipping funnelweb benchmark - catalogue has no '
+                     'magnitudes')
+        return
+    # generate_tiling_funnelweb requires priority targets in every
+    # magnitude range, which small catalogues may not have at the bright end
+    ranges = [(mag_range, prioritise) for mag_range, prioritise in zip(
+        FUNNELWEB_MAG_RANGES, FUNNELWEB_MAG_RANGES_PRIORITISE)
+        if np.any([mag_range[0] <= t.mag < mag_range[1] and
+                   t.priority >= FUNNELWEB_COMPLETENESS_PRIORITY
+                   for t in catalogue[0]])]
+    random.seed(settings['seed'])
+    elapsed, result = _time_call(
+        tl.generate_tiling_funnelweb, catalogue[0][:], catalogue[1],
+        catalogue[2], mag_ranges=[r[0] for r in ranges],
+        mag_ranges_prioritise=[r[1] for r in ranges],
+        completeness_priority=FUNNELWEB_COMPLETENESS_PRIORITY,
+        prioritise_extra=FUNNELWEB_PRIORITISE_EXTRA,
+        **_tiling_kwargs(settings))
+    yield '', _tiling_record(result, elapsed)
+
+
+def run_benchmarks(catalogue_types=('uniform', ), sizes=(1000, ),
+                   benchmarks=BENCHMARKS, seed=0,
+                   ra_min=30.0, ra_max=40.0, dec_min=-34.0, dec_max=-26.0,
+                   completeness_target=0.9, tiling_file='ipack.3.8192.txt',
+                   ncpu=1):
+    """
+    Run the benchmarks on synthetic catalogues.
+
+    A fresh catalogue is generated (see generate_catalogue) for each
+    benchmark, so the benchmarks don't affect each other, and the random
+    module is seeded before each tiling.
+
+    Parameters
+    ----------
+    catalogue_types :
+        The catalogue types (see CATALOGUE_TYPES) to benchmark on. Defaults
+        to ('uniform', ).
+
+    sizes :
+        The numbers of science targets to benchmark with. Defaults to
+        (1000, ).
+
+    benchmarks :
+        The benchmarks to run (see BENCHMARKS). Defaults to all of them.
+        The 'funnelweb' benchmark is skipped for catalogues without
+        magnitudes (i.e. other than 'funnelweb').
+
+    seed :
+        The seed for the catalogues and tilings. Defaults to 0.
+
+    ra_min, ra_max, dec_min, dec_max :
+        The region to generate the catalogues in and tile. Defaults to a
+        10 x 8 deg region.
+
+    completeness_target, tiling_file, ncpu :
+        Passed to the tiling functions. Default to 0.9, 'ipack.3.8192.txt'
+        and 1, respectively.
+
+    Returns
+    -------
+    results :
+        A dictionary with keys 'format_version', 'metadata' (see
+        benchmark_metadata, plus the benchmark settings) and 'results', a
+        list with one dictionary per benchmark run, giving the 'catalogue'
+        type, 'n_targets', 'benchmark', 'variant' (e.g. the unpick method),
+        wall 'time' in seconds, and a summary of the 'result'. The tiling
+        benchmarks also give the 'stages' and 'counters' of the tiling
+        report (see tiling.TilingReport).
+    """
+    for catalogue_type in catalogue_types:
+        if catalogue_type not in CATALOGUE_TYPES:
+            raise ValueError('catalogue_types must be from %s' %
+                             str(CATALOGUE_TYPES))
+    for benchmark in benchmarks:
+        if benchmark not in BENCHMARKS:
+            raise ValueError('benchmarks must be from %s' % str(BENCHMARKS))
+
+    settings = OrderedDict([
+        ('seed', seed),
+        ('ra_min', ra_min), ('ra_max', ra_max),
+        ('dec_min', dec_min), ('dec_max', dec_max),
+        ('completeness_target', completeness_target),
+        ('tiling_file', tiling_file),
+        ('ncpu', ncpu),
+    ])
+    benchmark_functions = {
+        'difficulty': _benchmark_difficulty,
+        'unpick': _benchmark_unpick,
+        'greedy': _benchmark_greedy,
+        'byorder': _benchmark_byorder,
+        'funnelweb': _benchmark_funnelweb,
+    }
+
+    results = []
+    random_state = random.getstate()
+    try:
+        for catalogue_type in catalogue_types:
+            for n_targets in sizes:
+                for benchmark in [b for b in BENCHMARKS if b in benchmarks]:
+                    logging.info('Benchmark %s: %s catalogue, %d targets' %
+                                 (benchmark, catalogue_type, n_targets, ))
+                    catalogue = generate_catalogue(
+                        catalogue_type, n_targets, seed=seed, ra_min=ra_min,
+                        ra_max=ra_max, dec_min=dec_min, dec_max=dec_max)
+                    for variant, record in benchmark_functions[benchmark](
+                            catalogue, settings):
+                        record = OrderedDict(
+                            [('catalogue', catalogue_type),
+                             ('n_targets', n_targets),
+                             ('benchmark', benchmark),
+                             ('variant', variant)] + record.items())
+                        logging.info('%s %s: %.2f s' % (benchmark, variant,
+                                                        record['time'], ))
+                        results.append(record)
+    finally:
+        random.setstate(random_state)
+
+    metadata = benchmark_metadata()
+    metadata['settings'] = settings
+    return OrderedDict([('format_version', BENCHMARK_FORMAT_VERSION),
+                        ('metadata', metadata),
+                        ('results', results)])
+
+
+def benchmark_metadata():
+    """
+    Describe the environment the benchmarks are run in.
+
+    Returns
+    -------
+    metadata : dict
+        The git 'commit' of the taipan code (None if unavailable), the
+        'python', 'numpy' and 'scipy' versions, the 'platform', the number
+        of CPUs ('cpus') and the 'date' (UTC, ISO format).
+    """
+    import scipy
+    import multiprocessing
+    try:
+        with open(os.devnull, 'w') as devnull:
+            commit = subprocess.check_output(
+                ['git', 'rev-parse', 'HEAD'],
+                cwd=os.path.dirname(os.path.abspath(__file__)),
+                stderr=devnull).strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return OrderedDict([
+        ('commit', commit),
+        ('python', platform.python_version()),
+        ('numpy', np.__version__),
+        ('scipy', scipy.__version__),
+        ('platform', platform.platform()),
+        ('cpus', multiprocessing.cpu_count()),
+        ('date', datetime.datetime.utcnow().isoformat()),
+    ])
+
+
+def write_results(results, filename):
+    """
+    Write benchmark results (see run_benchmarks) to a JSON file.
+
+    The keys are sorted, so files from different runs differ only where the
+    results do.
+    """
+    with open(filename, 'w') as results_fileobj:
+        json.dump(results, results_fileobj, indent=1, sort_keys=True)
+        results_fileobj.write('\n')
+
+
+def read_results(filename):
+    """
+    Read benchmark results written by write_results.
+    """
+    with open(filename, 'r') as results_fileobj:
+        results = json.load(results_fileobj)
+    if results.get('format_version') != BENCHMARK_FORMAT_VERSION:
+        raise ValueError('%s is not a version %d benchmark results file' %
+                         (filename, BENCHMARK_FORMAT_VERSION, ))
+    return results
+
+
+def compare_results(baseline, current):
+    """
+    Compare the timings of two sets of benchmark results.
+
+    Parameters
+    ----------
+    baseline, current :
+        Benchmark results, as returned by run_benchmarks or read_results.
+
+    Returns
+    -------
+    comparison :
+        A list of (catalogue, n_targets, benchmark, variant, baseline_time,
+        current_time, ratio) tuples, one for each benchmark run present in
+        both sets of results, in the order of current. ratio is
+        current_time / baseline_time.
+    """
+    def key(record):
+        return (record['catalogue'], record['n_targets'],
+                record['benchmark'], record['variant'])
+
+    baseline_times = dict((key(r), r['time']) for r in baseline['results'])
+    comparison = []
+    for record in current['results']:
+        if key(record) not in baseline_times:
+            continue
+        before = baseline_times[key(record)]
+        ratio = record['time'] / before if before > 0. else float('inf')
+        comparison.append(key(record) + (before, record['time'], ratio))
+    return comparison
@@ -26,6 +26,13 @@ from sklearn.neighbors import KDTree as skKDTree
 # with a KDTREE
 BREAKEVEN_KDTREE = 50
 
+# Counts of the expensive operations performed in this process, for
+# reporting by the tiling functions (see taipan.tiling.TilingReport)
+WORK_COUNTERS = {
+    'kdtrees_built': 0,
+    'forbidden_checks': 0,
+}
+
 
 # Instrument variables
 TARGET_PER_TILE = 120
@@ -251,6 +258,17 @@ PATROL_RADIUS = 1.2 * 3600.           # arcsec
 TARGET_PRIORITY_MIN = 0
 TARGET_PRIORITY_MAX = 10
 
+# Tile ranking methods (see TaipanTile.calculate_tile_score)
+SCORE_METHODS = [
+    'completeness',
+    'difficulty-sum',
+    'difficulty-prod',
+    'priority-sum',
+    'priority-prod',
+    'combined-weighted-sum',
+    'combined-weighted-prod',
+]
+
 
 # ------
 # GLOBAL UTILITY FUNCTIONS
@@ -487,8 +505,8 @@ def generate_ranking_list(candidate_targets,
     if len(candidate_targets) == 0:
         ranking_list = []
     elif method == 'sequential':
-        difficulty_list = [t.difficulty for t in candidate_targets]
-        priority_list = [t.priority for t in candidate_targets]
+        difficulty_list = target_difficulties(candidate_targets)
+        priority_list = target_priorities(candidate_targets)
         lists = [None, difficulty_list, priority_list]
         maxes = [None, max(difficulty_list), max(priority_list)]
         ranking_list = [maxes[sequential_ordering[1]] * lists[
@@ -496,16 +514,17 @@ def generate_ranking_list(candidate_targets,
             sequential_ordering[1]][i] 
             for i in range(len(difficulty_list))]
     elif method == 'most_difficult':
-        ranking_list = [t.difficulty for t in candidate_targets]
+        ranking_list = target_difficulties(candidate_targets)
     elif method == 'priority':
-        ranking_list = [t.priority for t in candidate_targets]
+        ranking_list = target_priorities(candidate_targets)
     elif method == 'combined_weighted':
+        difficulty_list = target_difficulties(candidate_targets)
+        priority_list = target_priorities(candidate_targets)
         max_excluded_tgts = float(max(
-            [t.difficulty for t 
-                in candidate_targets])) / float(TARGET_PRIORITY_MAX)
-        ranking_list = [combined_weight*t.priority 
-            + float(t.difficulty)/max_excluded_tgts 
-            for t in candidate_targets]
+            difficulty_list)) / float(TARGET_PRIORITY_MAX)
+        ranking_list = [combined_weight*p 
+            + float(d)/max_excluded_tgts 
+            for d, p in zip(difficulty_list, priority_list)]
 
     return ranking_list
 
@@ -602,6 +621,7 @@ def compute_target_difficulties(target_list, full_target_list=None,
         tree = tree_function(full_cart_targets, leaf_size=leafsize)
     else:
         tree = tree_function(full_cart_targets, leafsize=leafsize)
+    WORK_COUNTERS['kdtrees_built'] += 1
 
     dist_check = dist_euclidean(FIBRE_EXCLUSION_RADIUS/3600.)
 
@@ -618,14 +638,20 @@ def compute_target_difficulties(target_list, full_target_list=None,
             if verbose:
                 logging.debug('Generating subtree for difficulties...')
             subtree = tree_function(cart_targets, leafsize=leafsize)
+            WORK_COUNTERS['kdtrees_built'] += 1
             difficulties = subtree.query_ball_tree(tree,
                 dist_euclidean(FIBRE_EXCLUSION_RADIUS/3600.))
     difficulties = [len(d) for d in difficulties]
 
     if verbose:
         logging.debug('Assigning difficulties...')
-    for i in range(len(difficulties)):
-        target_list[i].difficulty = difficulties[i]
+    overlay = _common_overlay(target_list)
+    if overlay is not None:
+        # Write straight to the overlay's difficulty array
+        overlay.difficulties[[t._index for t in target_list]] = difficulties
+    else:
+        for i in range(len(difficulties)):
+            target_list[i].difficulty = difficulties[i]
     if verbose:
         logging.debug('Difficulties done!')
         
@@ -637,7 +663,7 @@ def compute_target_difficulties(target_list, full_target_list=None,
 
 
 def targets_in_range(ra, dec, target_list, dist,
-                     leafsize=BREAKEVEN_KDTREE):
+                     leafsize=BREAKEVEN_KDTREE, preserve_order=False):
     """
     Return the subset of target_list within dist of (ra, dec).
 
@@ -656,6 +682,11 @@ def targets_in_range(ra, dec, target_list, dist,
     leafsize : int, optional
         The size of the leaves in the KDTree structure. Defaults to
         BREAKEVEN_KDTREE.
+    preserve_order : bool, optional
+        If True, return the targets in the order they appear in
+        target_list, so the result does not depend on the structure of the
+        KDTree (and hence on the other targets in target_list). Defaults to
+        False, in which case KDTree results are in tree order.
 
     Returns
     -------
@@ -677,16 +708,19 @@ def targets_in_range(ra, dec, target_list, dist,
         cart_targets = np.asarray([t.usposn for t in target_list])
         # logging.debug(cart_targets)
         tree = cKDTree(cart_targets, leafsize=leafsize)
+        WORK_COUNTERS['kdtrees_built'] += 1
         logging.debug('Querying tree')
         inds = tree.query_ball_point(polar2cart((ra, dec)),
                                      dist_euclidean(dist / 3600.))
+        if preserve_order:
+            inds = sorted(inds)
         targets_in_range = [target_list[i] for i in inds]
 
     return targets_in_range
 
 
 def targets_in_range_multi(ra_dec_list, target_list, dist,
-                           leafsize=BREAKEVEN_KDTREE):
+                           leafsize=BREAKEVEN_KDTREE, preserve_order=False):
     """
     Return the number of targets in target_list
     within each position specified in ra_dec_list.
@@ -702,6 +736,9 @@ def targets_in_range_multi(ra_dec_list, target_list, dist,
         The list of TaipanTarget objects to consider.
     dist : float
         The distance to test against, in *arcseconds*.
+    preserve_order : bool, optional
+        If True, each sublist holds its targets in the order they appear in
+        target_list. See targets_in_range. Defaults to False.
 
     Returns
     -------
@@ -721,16 +758,19 @@ def targets_in_range_multi(ra_dec_list, target_list, dist,
 
     cart_targets = np.asarray([t.usposn for t in target_list])
     tree = cKDTree(cart_targets, leafsize=leafsize)
+    WORK_COUNTERS['kdtrees_built'] += 1
     inds = [tree.query_ball_point(polar2cart(radec),
                                   dist_euclidean(dist / 3600.))
             for radec in ra_dec_list]
+    if preserve_order:
+        inds = [sorted(ind) for ind in inds]
     targets = [[target_list[i] for i in ind] for ind in inds]
 
     return targets
 
 
 def targets_in_range_tiles(tile_list, target_list,
-                           leafsize=BREAKEVEN_KDTREE):
+                           leafsize=BREAKEVEN_KDTREE, preserve_order=False):
     """
     Alias to targets_in_range_multi for use when passing a list of
     TaipanTile objects.
@@ -744,6 +784,8 @@ def targets_in_range_tiles(tile_list, target_list,
     leafsize : int, optional
         Optional. Leafsize of the constructed KDTree. Defaults to
         BREAKEVEN_KDTREE.
+    preserve_order : bool, optional
+        Optional. See targets_in_range_multi. Defaults to False.
 
     Returns
     -------
@@ -754,7 +796,8 @@ def targets_in_range_tiles(tile_list, target_list,
         [(t.ra, t.dec) for t in tile_list],
         target_list,
         TILE_RADIUS,
-        leafsize=leafsize
+        leafsize=leafsize,
+        preserve_order=preserve_order
     )
 
 # ------
@@ -1346,6 +1389,7 @@ class TaipanTarget(object):
         forbidden : Boolean
             If this target is forbidden or not, based on the input target list.
         """
+        WORK_COUNTERS['forbidden_checks'] += 1
         if len(tgts) == 0:
             return False
 
@@ -1355,11 +1399,231 @@ class TaipanTarget(object):
         return False
 
 
+class TaipanTargetView(TaipanTarget):
+    """
+    A view of a TaipanTarget, with the priority and difficulty held in a
+    TargetOverlay.
+
+    All other attributes are read from the underlying target. The position
+    of a view is that of its target, and cannot be set on the view. Other
+    attributes set on the view (apart from the priority and difficulty) are
+    held by the view itself, so the underlying target is never modified.
+    """
+
+    def __init__(self, target, overlay, index):
+        """
+        Parameters
+        ----------
+        target : :class:`TaipanTarget`
+            The underlying target.
+        overlay : :class:`TargetOverlay`
+            The overlay holding the priority and difficulty of the view.
+        index : int
+            The position of target in the overlay.
+        """
+        self._target = target
+        self._overlay = overlay
+        self._index = index
+
+    def __getattr__(self, name):
+        # Only called for attributes not found on the view itself
+        if name in ('_target', '_overlay', '_index'):
+            raise AttributeError(name)
+        return getattr(self._target, name)
+
+    def __repr__(self):
+        return 'TP TGT %s' % str(self._target.idn)
+
+    def __str__(self):
+        return 'TP TGT %s' % str(self._target.idn)
+
+    @property
+    def target(self):
+        """The underlying TaipanTarget"""
+        return self._target
+
+    # The target positions are read in the innermost loops of tile
+    # unpicking, so read them straight from the target, rather than through
+    # __getattr__
+    @property
+    def ra(self):
+        """Target RA"""
+        return self._target._ra
+
+    @property
+    def dec(self):
+        """Target dec"""
+        return self._target._dec
+
+    @property
+    def usposn(self):
+        """Target position on the unit sphere"""
+        return self._target._usposn
+
+    def compute_usposn(self):
+        """
+        Compute the position of the underlying target on the unit sphere.
+        """
+        self._target.compute_usposn()
+
+    # The priority and difficulty properties of TaipanTarget (including
+    # their input checking) read and write these
+    @property
+    def _priority(self):
+        return int(self._overlay.priorities[self._index])
+
+    @_priority.setter
+    def _priority(self, p):
+        self._overlay.priorities[self._index] = p
+
+    @property
+    def _difficulty(self):
+        return int(self._overlay.difficulties[self._index])
+
+    @_difficulty.setter
+    def _difficulty(self, d):
+        self._overlay.difficulties[self._index] = d
+
+
+class TargetOverlay(object):
+    """
+    Holds run-specific priorities and difficulties for a list of
+    TaipanTargets.
+
+    The priorities and difficulties are held in arrays, indexed by the
+    position of each target in the overlaid list. The overlay provides a
+    TaipanTargetView of each target; code working with the views reads and
+    writes these arrays, rather than the targets themselves. This allows
+    several tiling runs (or runs with different parameters) to share one
+    catalogue of targets without modifying it.
+
+    Attributes
+    ----------
+    priorities, difficulties : numpy.ndarray of int
+        The priority and difficulty of each target.
+    """
+
+    def __init__(self, targets):
+        """
+        Parameters
+        ----------
+        targets : list of :class:`TaipanTarget`
+            The targets to overlay. The overlay priorities and difficulties
+            are initialised from these targets.
+        """
+        self._targets = list(targets)
+        self.priorities = np.asarray([t.priority for t in self._targets],
+                                     dtype=int)
+        self.difficulties = np.asarray([t.difficulty for t in self._targets],
+                                       dtype=int)
+        self._views = [TaipanTargetView(t, self, i)
+                       for i, t in enumerate(self._targets)]
+        self._lookup = dict((id(t), i) for i, t in enumerate(self._targets))
+
+    def __len__(self):
+        return len(self._targets)
+
+    @property
+    def targets(self):
+        """The overlaid TaipanTargets"""
+        return self._targets
+
+    @property
+    def views(self):
+        """The TaipanTargetViews of the targets, in the same order"""
+        return self._views
+
+    def view(self, target):
+        """
+        Return the view of target, or target itself if it is not part of
+        this overlay.
+        """
+        try:
+            return self._views[self._lookup[id(target)]]
+        except KeyError:
+            return target
+
+    def unwrap(self, target):
+        """
+        Return the underlying TaipanTarget of a view from this overlay, or
+        target itself if it is not such a view.
+        """
+        if isinstance(target, TaipanTargetView) and (
+                target._overlay is self):
+            return target.target
+        return target
+
+
+def _common_overlay(targets):
+    """
+    Return the TargetOverlay which every one of targets is a view of, or None
+    if there is no such overlay.
+    """
+    if len(targets) == 0 or not isinstance(targets[0], TaipanTargetView):
+        return None
+    overlay = targets[0]._overlay
+    for t in targets:
+        if not isinstance(t, TaipanTargetView) or t._overlay is not overlay:
+            return None
+    return overlay
+
+
+def target_priorities(targets):
+    """
+    Return the priorities of a list of TaipanTargets.
+
+    If the targets are all TaipanTargetViews of the same TargetOverlay, the
+    priorities are read straight from the overlay's array.
+
+    Parameters
+    ----------
+    targets : list of :class:`TaipanTarget`
+        The targets of interest.
+
+    Returns
+    -------
+    priorities : list of int
+        The priorities of targets, in the same order.
+    """
+    overlay = _common_overlay(targets)
+    if overlay is None:
+        return [t.priority for t in targets]
+    return overlay.priorities[[t._index for t in targets]].tolist()
+
+
+def target_difficulties(targets):
+    """
+    Return the difficulties of a list of TaipanTargets.
+
+    If the targets are all TaipanTargetViews of the same TargetOverlay, the
+    difficulties are read straight from the overlay's array.
+
+    Parameters
+    ----------
+    targets : list of :class:`TaipanTarget`
+        The targets of interest.
+
+    Returns
+    -------
+    difficulties : list of int
+        The difficulties of targets, in the same order.
+    """
+    overlay = _common_overlay(targets)
+    if overlay is None:
+        return [t.difficulty for t in targets]
+    return overlay.difficulties[[t._index for t in targets]].tolist()
+
+
 class TaipanTile(object):
     """
     Holds information and convenience functions for a TAIPAN tile configuration
     """
 
+    # Cache of the fibre rest positions on the sky, which only depend on the
+    # tile position and PA. It is replaced (never modified in place) when the
+    # tile is moved, so it may be safely shared between clones of a tile.
+    _fibre_posns = None
+
     def __init__(self, ra, dec, field_id=None, pk=None, usposn=None,
                  pa=0.0, mag_min=None, mag_max=None):
         """
@@ -1391,6 +1655,7 @@ class TaipanTile(object):
         self._mag_min = None
         self._mag_max = None
         self._pa = 0.0
+        self._fibre_posns = None
 
         # Insert the passed values
         # Doing it like this forces the setter functions to be
@@ -1440,6 +1705,7 @@ class TaipanTile(object):
         if r < 0.0 or r >= 360.0: 
             raise Exception('RA outside valid range')
         self._ra = r
+        self._fibre_posns = None
 
     @property
     def dec(self):
@@ -1452,6 +1718,7 @@ class TaipanTile(object):
         if d < -90.0 or d > 90.0:
             raise Exception('Dec outside valid range')
         self._dec = d
+        self._fibre_posns = None
 
     @property
     def usposn(self):
@@ -1493,6 +1760,7 @@ class TaipanTile(object):
         if p < 0.0 or p >= 360.0:
             raise ValueError('PA must be 0 <= pa < 360')
         self._pa = p
+        self._fibre_posns = None
 
     @property
     def field_id(self):
@@ -1540,6 +1808,27 @@ class TaipanTile(object):
             assert (m > -10 and m < 30), "mag_min outside valid range"
         self._mag_min = m
 
+    def clone(self):
+        """
+        Create a cheap copy of this tile.
+
+        The fibre assignments are copied, so the clone may be unpicked (or
+        otherwise altered) without affecting the original tile. The assigned
+        TaipanTargets themselves are *not* copied, and the cached fibre
+        positions are shared with the original until either tile is moved.
+        This makes cloning far cheaper than copy.deepcopy, and safer than
+        copy.copy (which shares the fibre assignments between tiles).
+
+        Returns
+        -------
+        tile : :class:`TaipanTile`
+            The cloned tile.
+        """
+        tile = self.__class__.__new__(self.__class__)
+        tile.__dict__.update(self.__dict__)
+        tile._fibres = self._fibres.copy()
+        return tile
+
     def priority(self):
         """
         Calculate the priority ranking of this tile. Do this by summing
@@ -1627,15 +1916,15 @@ class TaipanTile(object):
         if fibre not in BUGPOS_MM:
             raise ValueError('Fibre does not exist in BUGPOS listing')
 
-        fibre_offset = BUGPOS_OFFSET[fibre]
-        pos = compute_offset_posn(self.ra, self.dec,
-                                  fibre_offset[0],  # Fibre distance from
-                                                    # tile centre
-                                  (fibre_offset[1] + self.pa) % 360.  # Account
-                                                                      # for tile
-                                                                      # PA
-                                  )
-        return pos
+        # Compute all of the fibre positions at once, and cache them - the
+        # unpicking routines need the full set every time they are called
+        if self._fibre_posns is None:
+            self._fibre_posns = {f: compute_offset_posn(
+                self.ra, self.dec,
+                fibre_offset[0],  # Fibre distance from tile centre
+                (fibre_offset[1] + self.pa) % 360.  # Account for tile PA
+            ) for (f, fibre_offset) in BUGPOS_OFFSET.iteritems()}
+        return self._fibre_posns[fibre]
 
     def compute_fibre_travel(self, fibre):
         """
@@ -1957,15 +2246,6 @@ class TaipanTile(object):
             a float, even if the ranking could be expressed as an integer. A
             higher score denotes a better-ranked tile.
         """
-        SCORE_METHODS = [
-            'completeness',
-            'difficulty-sum',
-            'difficulty-prod',
-            'priority-sum',
-            'priority-prod',
-            'combined-weighted-sum',
-            'combined-weighted-prod',
-        ]
         if method not in SCORE_METHODS:
             raise ValueError('Scoring method must be one of %s' 
                 % str(SCORE_METHODS))
@@ -1987,19 +2267,20 @@ class TaipanTile(object):
         if method == 'completeness':
             ranking_score = len(targets_sci)
         elif method == 'difficulty-sum':
-            ranking_score = sum([t.difficulty for t in targets_sci])
+            ranking_score = sum(target_difficulties(targets_sci))
         elif method == 'difficulty-prod':
-            ranking_score = prod([t.difficulty for t in targets_sci])
+            ranking_score = prod(target_difficulties(targets_sci))
         elif method == 'priority-sum':
-            ranking_score = sum([t.priority for t in targets_sci])
+            ranking_score = sum(target_priorities(targets_sci))
         elif method == 'priority-prod':
-            ranking_score = prod([t.priority for t in targets_sci])
+            ranking_score = prod(target_priorities(targets_sci))
         elif 'combined-weighted' in method:
-            max_difficulty = float(max([t.difficulty for t in targets_sci] +
+            difficulty_list = target_difficulties(targets_sci)
+            max_difficulty = float(max(difficulty_list +
                                        [1]))  # Stops NaN if all diffs are 0
-            ranking_list = np.asarray([t.difficulty 
-                for t in targets_sci])/max_difficulty + combined_weight * np.asarray(
-                [t.priority for t in targets_sci]) / float(TARGET_PRIORITY_MAX)
+            ranking_list = np.asarray(
+                difficulty_list)/max_difficulty + combined_weight * np.asarray(
+                target_priorities(targets_sci)) / float(TARGET_PRIORITY_MAX)
             if '-sum' in method:
                 ranking_score = sum(ranking_list)
             elif '-prod' in method:
@@ -2013,6 +2294,118 @@ class TaipanTile(object):
         ranking_score = float(ranking_score)
         return ranking_score
 
+    def calculate_tile_score_bound(self, candidate_targets,
+                                   standard_targets=[],
+                                   method='completeness',
+                                   combined_weight=1.0,
+                                   check_tile_radius=True):
+        """
+        Compute an upper bound on the ranking score of a fresh unpick of
+        this tile.
+
+        The bound is computed directly from the candidate targets within
+        range of the tile, without doing any fibre assignment. It is
+        guaranteed to be no less than the value that calculate_tile_score
+        would return (with the same method and combined_weight) after
+        unpicking this tile against the same target lists with
+        overwrite_existing=True. This allows the tiling algorithms to
+        skip or defer the unpicking of tiles that cannot beat the
+        current best tile.
+
+        The bound accounts for the fibre exclusion radius by placing the
+        candidate targets on a Cartesian grid with cells small enough that no
+        two targets in the same cell may be assigned together. At most one
+        target per cell is counted. The number of targets counted is also
+        capped by the number of non-guide fibres which unpick_tile may fill
+        with science targets; this is more than TARGET_PER_TILE, as
+        unpick_tile will use any standard fibres it cannot fill for science
+        targets.
+
+        The bound ignores the guide and standard requirements checked by
+        the disqualify_below_min option of calculate_tile_score.
+
+        Parameters
+        ----------
+        candidate_targets : list of :class:`TaipanTarget`
+            The science targets that would be passed to unpick_tile.
+
+        standard_targets : list of :class:`TaipanTarget`, optional
+            The standard targets that would be passed to unpick_tile. Only
+            those which are also science targets contribute to the bound.
+            Defaults to the empty list.
+
+        method : str, optional
+            The scoring method, as for calculate_tile_score. Defaults to
+            'completeness'.
+
+        combined_weight : float, optional
+            The combined weighting, as for calculate_tile_score. Defaults to
+            1.0.
+
+        check_tile_radius : bool, optional
+            Boolean denoting whether the input target lists need to be
+            trimmed down to those targets within TILE_RADIUS of the tile
+            centre. Set to False if the lists have already been trimmed (e.g.
+            by targets_in_range_tiles). Defaults to True.
+
+        Returns
+        -------
+        score_bound : float
+            The upper bound on the ranking score of this tile.
+        """
+        if method not in SCORE_METHODS:
+            raise ValueError('Scoring method must be one of %s'
+                % str(SCORE_METHODS))
+
+        if check_tile_radius:
+            candidate_targets = targets_in_range(self.ra, self.dec,
+                candidate_targets, TILE_RADIUS)
+            standard_targets = targets_in_range(self.ra, self.dec,
+                standard_targets, TILE_RADIUS)
+        targets = candidate_targets + [t for t in standard_targets
+                                       if t.science]
+        if len(targets) == 0:
+            return 0.
+
+        # unpick_tile stops filling fibres with science targets once at
+        # most SKY_PER_TILE fibres (including any empty guide fibres)
+        # remain empty
+        max_targets = len(FIBRES_NORMAL) - max(
+            SKY_PER_TILE - len(FIBRES_GUIDE), 0)
+
+        if method == 'completeness':
+            values = [1.] * len(targets)
+        elif 'difficulty' in method:
+            values = [float(d) for d in target_difficulties(targets)]
+        elif 'priority' in method:
+            values = [float(p) for p in target_priorities(targets)]
+        elif 'combined-weighted' in method:
+            # The normalised difficulty of a target can be at most 1
+            values = [1. + combined_weight * p
+                      / float(TARGET_PRIORITY_MAX)
+                      for p in target_priorities(targets)]
+
+        # Keep the best value in each exclusion cell
+        cell_size = dist_euclidean(FIBRE_EXCLUSION_RADIUS
+                                   / 3600.) / math.sqrt(3.) * 0.999
+        cells = np.floor(np.asarray([t.usposn for t in targets])
+                         / cell_size).astype(int)
+        cell_values = {}
+        for cell, value in zip(map(tuple, cells), values):
+            if value > cell_values.get(cell, -1.):
+                cell_values[cell] = value
+        values = sorted(cell_values.values(), reverse=True)[:max_targets]
+
+        if '-prod' in method:
+            # The largest product comes from multiplying together all
+            # the values above 1 (or taking the single largest value)
+            score_bound = max(prod([v for v in values if v > 1.]),
+                              values[0]) - 1.
+        else:
+            score_bound = sum(values)
+
+        return float(score_bound)
+
     def set_fibre(self, fibre, tgt):
         """
         Explicitly assign a TaipanTarget to a fibre on this tile.
@@ -2215,9 +2608,8 @@ class TaipanTile(object):
                 for t in candidates_this_fibre]
             distance_list = [max(distance_list) - d 
                 for d in distance_list]
-            difficulty_list = [t.difficulty 
-                for t in candidates_this_fibre]
-            priority_list = [t.priority for t in candidates_this_fibre]
+            difficulty_list = target_difficulties(candidates_this_fibre)
+            priority_list = target_priorities(candidates_this_fibre)
             lists = [distance_list, difficulty_list, priority_list]
             maxes = [max(distance_list), max(difficulty_list), 
                 max(priority_list)]
@@ -2233,21 +2625,23 @@ class TaipanTile(object):
             self._fibres[fibre] = candidate_targets_return.pop(
                 candidate_targets_return.index(tgt))
         elif method == 'most_difficult':
-            i = np.argmax([t.difficulty for t in candidates_this_fibre])
+            i = np.argmax(target_difficulties(candidates_this_fibre))
             tgt = candidates_this_fibre[i]
             self._fibres[fibre] = candidate_targets_return.pop(
                 candidate_targets_return.index(tgt))
         elif method == 'priority':
-            i = np.argmax([t.priority for t in candidates_this_fibre])
+            i = np.argmax(target_priorities(candidates_this_fibre))
             tgt = candidates_this_fibre[i]
             self._fibres[fibre] = candidate_targets_return.pop(
                 candidate_targets_return.index(tgt))
         elif method == 'combined_weighted':
-            max_excluded_tgts = float(max([t.difficulty
-                for t in candidates_this_fibre])) / float(TARGET_PRIORITY_MAX)
-            i = np.argmax([combined_weight*t.priority 
-                + float(t.difficulty)/max_excluded_tgts 
-                for t in candidates_this_fibre])
+            difficulty_list = target_difficulties(candidates_this_fibre)
+            priority_list = target_priorities(candidates_this_fibre)
+            max_excluded_tgts = float(max(
+                difficulty_list)) / float(TARGET_PRIORITY_MAX)
+            i = np.argmax([combined_weight*p 
+                + float(d)/max_excluded_tgts 
+                for d, p in zip(difficulty_list, priority_list)])
             tgt = candidates_this_fibre[i]
             self._fibres[fibre] = candidate_targets_return.pop(
                 candidate_targets_return.index(tgt))
@@ -2689,7 +3083,8 @@ class TaipanTile(object):
                     rank_supplements=False,
                     repick_after_complete=True,
                     consider_removed_targets=True,
-                    allow_standard_targets=False):
+                    allow_standard_targets=False,
+                    preserve_order=False):
         """
         Unpick this tile, i.e. make a full allocation of targets, guides etc.
 
@@ -2778,6 +3173,14 @@ class TaipanTile(object):
             place targets removed (due to having overwrite_existing=True) back
             into the candidate_targets list. Defaults to True.
 
+        preserve_order : bool, optional
+            Boolean value denoting whether to keep the trimmed target lists
+            in the order of the input lists (see targets_in_range). This
+            makes the unpick independent of which other targets are passed
+            in, so that a tile unpicked against a sublist of the targets
+            matches the same tile unpicked against the full list. Only
+            relevant if check_tile_radius is True. Defaults to False.
+
         Returns
         -------    
         remaining_targets : list of :class:`TaipanTarget`
@@ -2855,15 +3258,18 @@ class TaipanTile(object):
         guides_this_tile = guide_targets[:]
         if check_tile_radius:
             candidates_this_tile = targets_in_range(self.ra, self.dec,
-                candidates_this_tile, TILE_RADIUS)
+                candidates_this_tile, TILE_RADIUS,
+                preserve_order=preserve_order)
             logging.debug('%d science targets remain' %
                           len(candidates_this_tile))
             standards_this_tile = targets_in_range(self.ra, self.dec,
-                standards_this_tile, TILE_RADIUS)
+                standards_this_tile, TILE_RADIUS,
+                preserve_order=preserve_order)
             logging.debug('%d standards targets remain' %
                           len(standards_this_tile))
             guides_this_tile = targets_in_range(self.ra, self.dec,
-                guides_this_tile, TILE_RADIUS)
+                guides_this_tile, TILE_RADIUS,
+                preserve_order=preserve_order)
             logging.debug('%d guide targets remain' %
                           len(guides_this_tile))
 
@@ -2895,6 +3301,12 @@ class TaipanTile(object):
             if isinstance(t, TaipanTarget)
             and t.science])
         extra_standard_targets = 0
+        if allow_standard_targets:
+            # Count any standards already assigned as science targets (e.g.
+            # when unpicking around existing assignments)
+            extra_standard_targets = min(len([t for t in self._fibres.values()
+                if isinstance(t, TaipanTarget)
+                and t.science and t.standard]), STANDARDS_PER_TILE)
         while assigned_tgts < TARGET_PER_TILE + extra_standard_targets and len(
             candidates_this_tile) > 0:
             # Search for the best target according to the criterion
@@ -3069,9 +3481,9 @@ class TaipanTile(object):
             # Reconstruct the targets_this_tile list
             candidates_this_tile = candidate_targets_return[:]
             if check_tile_radius:
-                candidates_this_tile = targets_in_range(self.ra, self.dec,
-                                                        candidates_this_tile,
-                                                        TILE_RADIUS)
+                candidates_this_tile = targets_in_range(
+                    self.ra, self.dec, candidates_this_tile, TILE_RADIUS,
+                    preserve_order=preserve_order)
 
             failure_detected = False
             while len([f for f in self._fibres 
@@ -3122,6 +3534,81 @@ class TaipanTile(object):
 
         return candidate_targets_return, removed_targets
 
+    def reunpick_tile(self, removed_targets, candidate_targets,
+                      standard_targets, guide_targets,
+                      check_tile_radius=True,
+                      method='priority', combined_weight=1.0,
+                      sequential_ordering=(1,2),
+                      rank_supplements=False,
+                      repick_after_complete=True,
+                      allow_standard_targets=False,
+                      preserve_order=False):
+        """
+        Re-unpick this tile after some of its targets have become unavailable.
+
+        This is a cheaper alternative to calling unpick_tile with
+        overwrite_existing=True. Only the fibres holding targets in
+        removed_targets (plus any sky fibres) are cleared; all other existing
+        assignments are kept. The cleared fibres are then refilled from
+        candidate_targets via unpick_tile, which also re-checks the guide and
+        standard minimums. The result will not be identical to a full
+        re-unpick, but is close enough for tile scoring purposes.
+
+        Parameters
+        ----------
+        removed_targets : list or set of :class:`TaipanTarget`
+            The targets which are no longer available to this tile (e.g.
+            those assigned to a tile just selected by a tiling algorithm).
+            Passing a set is much faster for large lists.
+
+        candidate_targets, standard_targets, guide_targets : 
+            :class:`TaipanTarget` lists
+            The targets available to refill the tile with. See unpick_tile.
+
+        check_tile_radius, method, combined_weight, sequential_ordering,
+        rank_supplements, repick_after_complete, allow_standard_targets,
+        preserve_order :
+            As for unpick_tile.
+
+        Returns
+        -------
+        remaining_targets : list of :class:`TaipanTarget`
+            The list of candidate_targets, less those targets
+            which have been assigned to this tile.
+
+        removed_targets : empty list
+            As for unpick_tile.
+        """
+        # Strip out the unavailable targets and the sky fibres - the sky
+        # fibres will be re-assigned once the tile has been refilled
+        burn = self.remove_duplicates(removed_targets)
+        for f in self._fibres:
+            if self._fibres[f] == 'sky':
+                self._fibres[f] = None
+
+        candidate_targets_return, removed_targets = self.unpick_tile(
+            candidate_targets, standard_targets, guide_targets,
+            overwrite_existing=False, check_tile_radius=check_tile_radius,
+            recompute_difficulty=False,
+            method=method, combined_weight=combined_weight,
+            sequential_ordering=sequential_ordering,
+            rank_supplements=rank_supplements,
+            repick_after_complete=repick_after_complete,
+            consider_removed_targets=False,
+            allow_standard_targets=allow_standard_targets,
+            preserve_order=preserve_order)
+
+        # unpick_tile skips the sky assignment if there are no candidates
+        # left on the tile, so make sure the sky fibres are filled again
+        skies_needed = SKY_PER_TILE - len([f for f in self._fibres
+                                           if self._fibres[f] == 'sky'])
+        for f in [f for f in self._fibres
+                  if self._fibres[f] is None
+                  and f not in FIBRES_GUIDE][:max(skies_needed, 0)]:
+            self._fibres[f] = 'sky'
+
+        return candidate_targets_return, removed_targets
+
     def repick_tile(self):
         """
         Re-assign targets to avoid unnecessary cross-over between bugs.
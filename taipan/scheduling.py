@@ -9,6 +9,7 @@ import time
 import logging
 import pickle
 import copy
+import json
 
 import ephem
 
@@ -45,10 +46,34 @@ SECONDS_PER_DAY = 86400.
 
 ALMANAC_RESOLUTION_MAX = 60. * 4.
 
+# Methods available for computing almanac airmasses
+ALMANAC_METHODS = ['vectorised', 'bruteforce']
+
+# Number of fields to compute at once when populating an AlmanacSet
+ALMANAC_SET_CHUNK = 100
+
+# On-disk almanac store layout (see AlmanacSet.save and load_almanac_set)
+ALMANAC_STORE_VERSION = 2
+ALMANAC_STORE_INDEX = 'index.json'
+ALMANAC_STORE_FIELDS = 'fields.npy'
+ALMANAC_STORE_FIELD_ORDER = 'field_order.npy'
+ALMANAC_STORE_DATA = 'data.npy'
+ALMANAC_STORE_DARK = 'dark.npy'
+
 # Constant for converting from ephem times to MJD
 EPHEM_TO_MJD = 15019.5
 EPHEM_DT_STRFMT = '%Y/%m/%d %H:%M:%S'
 
+# Constants for computing Greenwich mean sidereal time (in hours) from
+# ephem dates
+EPHEM_J2000 = float(ephem.J2000)
+GMST_AT_J2000 = 18.697374558
+GMST_RATE = 24.06570982441908
+
+# Refraction coefficient for altitudes above ~15 degrees, as used by pyephem
+# (multiply by pressure in mbar / (temperature in K * tan(altitude)))
+REFRACTION_COEFF = 7.888888e-5
+
 # Observing constants
 SLEW_TIME = (5. * 60.) + (0.8 * 60)  # seconds, configure + calibrations
 OBS_TIME = (15. * 60.) + (1. * 60.)  # seconds, obs + readout
@@ -171,6 +196,121 @@ def utc_local_dt(dt, tz=UKST_TIMEZONE):
     dt_utc = tz.localize(dt).astimezone(pytz.utc).replace(tzinfo=None)
     return dt_utc
 
+
+def local_sidereal_time(dates_j2000, observer=UKST_TELESCOPE):
+    """
+    Compute the local mean sidereal time for an array of dates in closed form
+
+    Parameters
+    ----------
+    dates_j2000:
+        Array of dates, in the date standard of the ephem module.
+    observer:
+        An ephem.Observer instance holding information on the observing
+        location. Only the longitude is used. Defaults to UKST_TELESCOPE.
+
+    Returns
+    -------
+    lst:
+        Array of local sidereal times, in radians, in the range [0, 2pi).
+        These are mean sidereal times, so will differ from ephem's apparent
+        sidereal time by the equation of the equinoxes (~1 second).
+    """
+    dates_j2000 = np.asarray(dates_j2000, dtype=float)
+    gmst = GMST_AT_J2000 + GMST_RATE * (dates_j2000 - EPHEM_J2000)
+    lst = np.mod(np.radians(gmst * 15.) + float(observer.lon), 2. * np.pi)
+    return lst
+
+
+def compute_target_altitudes(ra, dec, dates_j2000, observer=UKST_TELESCOPE):
+    """
+    Compute the altitudes of fixed targets over a grid of dates without
+    stepping pyephem through each date
+
+    The target positions are precessed from J2000 to the middle of the date
+    grid, and the altitude is then computed from the hour angle against the
+    local sidereal time for the whole grid in one go. Refraction is applied
+    using the same high-altitude formula as pyephem. The result agrees with
+    the pyephem values to within ~30 arcsec over grids of a few years (larger
+    grids accumulate precession error at ~50 arcsec per year from the
+    middle of the grid).
+
+    Parameters
+    ----------
+    ra, dec:
+        Target position(s) in decimal degrees (J2000). May be scalars, or
+        equal-length 1D arrays.
+    dates_j2000:
+        1D array of dates, in the date standard of the ephem module.
+    observer:
+        An ephem.Observer instance holding information on the observing
+        location. Defaults to UKST_TELESCOPE.
+
+    Returns
+    -------
+    target_alt:
+        Array of target altitudes in radians. If ra and dec are scalars, this
+        is of the same length as dates_j2000; otherwise, it has shape
+        (len(ra), len(dates_j2000)).
+    """
+    scalar_input = np.isscalar(ra) and np.isscalar(dec)
+    ra = np.atleast_1d(np.asarray(ra, dtype=float))
+    dec = np.atleast_1d(np.asarray(dec, dtype=float))
+    if ra.shape != dec.shape:
+        raise ValueError('ra and dec must have the same shape')
+    dates_j2000 = np.asarray(dates_j2000, dtype=float)
+    if len(dates_j2000) == 0:
+        target_alt = np.zeros((len(ra), 0))
+        return target_alt[0] if scalar_input else target_alt
+
+    # Precess the targets to the epoch at the middle of the grid
+    epoch = ephem.Date(0.5 * (np.min(dates_j2000) + np.max(dates_j2000)))
+    ra_epoch = np.empty(len(ra))
+    dec_epoch = np.empty(len(dec))
+    for i in range(len(ra)):
+        eq = ephem.Equatorial(ephem.Equatorial(np.radians(ra[i]),
+                                               np.radians(dec[i]),
+                                               epoch=ephem.J2000),
+                              epoch=epoch)
+        ra_epoch[i], dec_epoch[i] = float(eq.ra), float(eq.dec)
+
+    lat = float(observer.lat)
+    hour_angle = (local_sidereal_time(dates_j2000, observer)[np.newaxis, :] -
+                  ra_epoch[:, np.newaxis])
+    target_alt = np.arcsin(
+        np.sin(dec_epoch)[:, np.newaxis] * np.sin(lat) +
+        np.cos(dec_epoch)[:, np.newaxis] * np.cos(lat) * np.cos(hour_angle))
+
+    # Refraction - the tangent is floored at 1 degree so the correction
+    # stays finite (and small) at and below the horizon
+    target_alt += (REFRACTION_COEFF * observer.pressure /
+                   ((273. + observer.temp) *
+                    np.tan(np.maximum(target_alt, np.radians(1.)))))
+
+    if scalar_input:
+        return target_alt[0]
+    return target_alt
+
+
+def altitude_to_airmass(target_alt):
+    """
+    Convert target altitudes to the airmass values stored in almanacs
+
+    Parameters
+    ----------
+    target_alt:
+        Array of target altitudes, in radians.
+
+    Returns
+    -------
+    airmass:
+        Array of airmasses. Targets below 10 degrees altitude are given the
+        special value 99., and all values are then clipped to [0., 9.].
+    """
+    airmass = np.clip(np.where(target_alt > np.radians(10.),
+                               1./np.sin(target_alt), 99.), 0., 9.)
+    return airmass
+
 # ______________________________________________________________________________
 # CLASS DEFINITIONS
 # ______________________________________________________________________________
@@ -188,7 +328,8 @@ class Almanac(object):
     _field_id = None
     _start_date = None
     _end_date = None
-    _data = None
+    _dates = None
+    _airmass = None
     _resolution = None
     _minimum_airmass = None
     _observer = None
@@ -276,14 +417,51 @@ class Almanac(object):
                                  "start_date for this almanac")
         self._end_date = d
 
+    @property
+    def dates(self):
+        """
+        Sorted array of the dates this almanac covers, in the date standard
+        of the ephem module
+        """
+        return self._dates
+
+    @dates.setter
+    def dates(self, d):
+        if not isinstance(d, np.ndarray) or d.ndim != 1:
+            raise ValueError("dates must be a 1D numpy array")
+        self._dates = d
+
+    @property
+    def airmass(self):
+        """
+        Array of the target airmass at each of dates
+        """
+        return self._airmass
+
+    @airmass.setter
+    def airmass(self, a):
+        if not isinstance(a, np.ndarray) or a.ndim != 1:
+            raise ValueError("airmass must be a 1D numpy array")
+        if self.dates is None or a.shape != self.dates.shape:
+            raise ValueError("airmass must have one entry per date")
+        self._airmass = a
+
     @property
     def data(self):
         """
-        An OrderedDict of the type:
-        date_j2000: airmass
-        An OrderedDict is used to keep the entries in date (i.e. key) order
+        A numpy structured array with columns 'date' and 'airmass'.
+        The almanac holds dates and airmass as separate arrays; this
+        (copied) array is kept for legacy callers.
         """
-        return self._data
+        if self.dates is None:
+            return None
+        data = np.empty(len(self.dates), dtype=[
+            ('date', float),
+            ('airmass', float)
+        ])
+        data['date'] = self.dates
+        data['airmass'] = self.airmass
+        return data
 
     @data.setter
     def data(self, a):
@@ -295,7 +473,8 @@ class Almanac(object):
         except:
             raise ValueError("data must be a numpy structured array "
                              "with columns 'date' and 'airmass'")
-        self._data = a
+        self.dates = a['date']
+        self.airmass = a['airmass']
 
     @property
     def minimum_airmass(self):
@@ -393,19 +572,25 @@ class Almanac(object):
         self.minimum_airmass = minimum_airmass
         self.resolution = resolution
 
-        # See if an almanac with these properties already exists in the PWD
+        # Almanacs are no longer looked for on disk here; read them from an
+        # almanac store (load_almanac, load_almanac_set), or call the legacy
+        # load explicitly
         if populate:
-            load_success = self.load()
-            if not load_success:
-                # Couldn't find an almanac to load, so we need to
-                # populate this one
-                self.calculate_airmass()
+            self.calculate_airmass()
 
         return
 
     # Save & read from disk
     # Uses pickle to seralize objects
     # These functions are maintained for legacy purposes only
+    def __setstate__(self, state):
+        # Almanacs pickled before the dates and airmasses were held
+        # separately carry a single structured 'data' array
+        data = state.pop('_data', None)
+        self.__dict__.update(state)
+        if data is not None:
+            self.data = data
+
     def save(self, filename=None, filepath='./'):
         if filepath[-1] != '/':
             raise ValueError('filepath must end with /')
@@ -423,11 +608,15 @@ class Almanac(object):
         encoded within the filename. If successful, the function returns True.
         If a filename matching the calling
         almanac is not found, then the function will exit and return False.
+
+        This reads the legacy pickled almanac files only, and is never called
+        when constructing an almanac. New almanacs should be read from an
+        almanac store (see load_almanac and load_almanac_set).
         """
         if filepath[-1] != '/':
             raise ValueError('filepath must end with /')
-        files_present = os.listdir(filepath)
-        if self.generate_file_name() not in files_present:
+        if not os.path.isfile('%s%s' % (filepath,
+                                        self.generate_file_name(), )):
             return False
 
         try:
@@ -449,23 +638,20 @@ class Almanac(object):
         return True
 
     # Computation functions
-    def generate_almanac_bruteforce(self, full_output=True):
-        # Define almanac-dependent horizons
-        observable = np.arcsin(1. / self.minimum_airmass)
+    def generate_time_grid(self):
+        """
+        Compute the grid of dates this almanac covers
 
-        # initialise ephem fixed body object for pointing
-        logging.debug('Creating ephem FixedBody at %3.1f, %2.1f' % (
-            self.ra, self.dec,
-        ))
-        target = ephem.FixedBody()
-        target._ra = np.radians(self.ra)  # radians everywhere
-        target._dec = np.radians(self.dec)  # radians everywhere
-        target._epoch = ephem.J2000
-        logging.debug('ephem FixedBody generated (%1.2f, %1.2f, %s)' %
-                      (target._ra, target._dec, target._epoch))
+        The grid runs from midday (local) before start_date to midday after
+        end_date, at the almanac resolution. If the almanac already holds
+        data, the dates of that data are used instead.
 
-        # Calculate the time grid
-        if self.data is None or len(self.data) == 0:
+        Returns
+        -------
+        dates_j2000:
+            Sorted array of dates, in the date standard of the ephem module.
+        """
+        if self.dates is None or len(self.dates) == 0:
             # Set the observer start to the midday before the observations
             # should start
             start_dt = self.observer.date = get_utc_datetime(
@@ -484,7 +670,86 @@ class Almanac(object):
                            np.arange(0, observing_period,
                                      self.resolution / 1440.))
         else:
-            dates_j2000 = sorted(self.data['date'])
+            dates_j2000 = np.sort(self.dates)
+        return dates_j2000
+
+    def compute_sun_moon_altitudes(self, dates_j2000):
+        """
+        Compute the solar and lunar altitudes over a grid of dates
+
+        Parameters
+        ----------
+        dates_j2000:
+            Array of dates, in the date standard of the ephem module.
+
+        Returns
+        -------
+        sol_alt, lun_alt:
+            Arrays of solar and lunar altitudes, in radians.
+        dark_time:
+            Boolean array, denoting whether the Sun and Moon are both below
+            their respective horizons.
+        """
+        sol_alt = np.empty(len(dates_j2000))
+        lun_alt = np.empty(len(dates_j2000))
+        for i, d in enumerate(dates_j2000):
+            self.observer.date = d
+            SUN.compute(self.observer)
+            MOON.compute(self.observer)
+            sol_alt[i] = SUN.alt
+            lun_alt[i] = MOON.alt
+        dark_time = np.logical_and(sol_alt < SOLAR_HORIZON,
+                                   lun_alt < LUNAR_HORIZON)
+        return sol_alt, lun_alt, dark_time
+
+    def generate_almanac_vectorised(self, full_output=True):
+        """
+        Vectorised equivalent of generate_almanac_bruteforce
+
+        The target altitudes are computed for the whole time grid at once
+        by compute_target_altitudes; pyephem is only stepped through the grid
+        for the Sun and Moon.
+
+        Parameters
+        ----------
+        full_output:
+            As for generate_almanac_bruteforce. Defaults to True.
+
+        Returns
+        -------
+        As for generate_almanac_bruteforce.
+        """
+        dates_j2000 = self.generate_time_grid()
+        sol_alt, lun_alt, dark_time = self.compute_sun_moon_altitudes(
+            dates_j2000)
+        target_alt = compute_target_altitudes(self.ra, self.dec, dates_j2000,
+                                              observer=self.observer)
+
+        if full_output:
+            return dates_j2000, sol_alt, lun_alt, target_alt, dark_time
+        else:
+            observable = np.arcsin(1. / self.minimum_airmass)
+            time_total = self.resolution * np.count_nonzero(
+                np.logical_and(dark_time, target_alt > observable))
+            return time_total / 60.
+
+    def generate_almanac_bruteforce(self, full_output=True):
+        # Define almanac-dependent horizons
+        observable = np.arcsin(1. / self.minimum_airmass)
+
+        # initialise ephem fixed body object for pointing
+        logging.debug('Creating ephem FixedBody at %3.1f, %2.1f' % (
+            self.ra, self.dec,
+        ))
+        target = ephem.FixedBody()
+        target._ra = np.radians(self.ra)  # radians everywhere
+        target._dec = np.radians(self.dec)  # radians everywhere
+        target._epoch = ephem.J2000
+        logging.debug('ephem FixedBody generated (%1.2f, %1.2f, %s)' %
+                      (target._ra, target._dec, target._epoch))
+
+        # Calculate the time grid
+        dates_j2000 = self.generate_time_grid()
 
         # Perform the computation
         time_total = 0.
@@ -518,28 +783,43 @@ class Almanac(object):
         else:
             return time_total / 60.
 
-    def calculate_airmass(self):
+    def calculate_airmass(self, method='vectorised'):
+        """
+        Populate the almanac data with airmass values
+
+        Parameters
+        ----------
+        method:
+            How to compute the target altitudes. One of ALMANAC_METHODS:
+            'vectorised' (default) computes all altitudes in closed form
+            from the local sidereal time (see compute_target_altitudes);
+            'bruteforce' steps pyephem through every date in the grid.
+            The two agree to within ~0.005 in airmass.
+        """
+        if method not in ALMANAC_METHODS:
+            raise ValueError('method must be one of %s' %
+                             (', '.join(ALMANAC_METHODS), ))
+
         logging.debug('Computing airmass values for almanac at %3.1f, %2.1f '
                       'from %s to %s' %
                       (self.ra, self.dec, self.start_date.strftime('%y-%m-%d'),
                        self.end_date.strftime('%y-%m-%d'),
                        ))
-        dates, sun, moon, target, dark_time = self.generate_almanac_bruteforce(
-            full_output=True)
-        logging.debug('Min and max target_alt from generate_almanac_'
-                      'bruteforce: '
-                      '%1.3f, %1.3f' % (min(target), max(target)))
-
-        airmass_values = np.clip(np.where(target > np.radians(10.),
-                                          1./np.sin(target), 99.), 0., 9.)
-
-        self.data = np.array([tuple(x) for x in
-                              np.vstack((dates, airmass_values)).T.tolist()],
-                             dtype=[
-                                 ('date', float),
-                                 ('airmass', float)
-                             ])
-        self.data.sort(axis=-1, order='date')
+        if method == 'vectorised':
+            # The Sun and Moon aren't needed for the airmass, so skip
+            # computing them
+            dates = self.generate_time_grid()
+            target = compute_target_altitudes(self.ra, self.dec, dates,
+                                              observer=self.observer)
+        else:
+            dates, sun, moon, target, dark_time = \
+                self.generate_almanac_bruteforce(full_output=True)
+        logging.debug('Min and max target_alt from %s computation: '
+                      '%1.3f, %1.3f' % (method, min(target), max(target)))
+
+        # generate_time_grid returns the dates in order
+        self.dates = dates
+        self.airmass = altitude_to_airmass(target)
 
         return
 
@@ -570,7 +850,7 @@ class Almanac(object):
         logging.debug('Using next_observable_period')
         # Input checking
         if datetime_to is None:
-            datetime_to = pytz.utc.localize(ephem_to_dt(self.data['date'][-1])).\
+            datetime_to = pytz.utc.localize(ephem_to_dt(self.dates[-1])).\
                 astimezone(tz).replace(tzinfo=None)
             logging.debug('Calculated datetime_to of %s' % str(datetime_to))
         if datetime_to < datetime_from:
@@ -590,29 +870,29 @@ class Almanac(object):
 
         # Determine obs_start and obs_end
         try:
-            obs_start = self.data[np.logical_and(
-                self.data['airmass'] <= self.minimum_airmass,
+            obs_start = self.dates[np.logical_and(
+                self.airmass <= self.minimum_airmass,
                 np.logical_and(
-                    ephem_dt <= self.data['date'],
-                    self.data['date'] < ephem_limiting_dt))]['date'][0]
+                    ephem_dt <= self.dates,
+                    self.dates < ephem_limiting_dt))][0]
         except IndexError:
             # No nights left in this DarkAlmanac, so return None for both
             obs_start, obs_end = None, None
             return obs_start, obs_end
         try:
-            obs_end = self.data[np.logical_and(
-                self.data['airmass'] > self.minimum_airmass,
+            obs_end = self.dates[np.logical_and(
+                self.airmass > self.minimum_airmass,
                 np.logical_and(
-                    obs_start < self.data['date'],
-                    self.data['date'] < ephem_limiting_dt
-                ))]['date'][0]
+                    obs_start < self.dates,
+                    self.dates < ephem_limiting_dt
+                ))][0]
             # obs_end = (t for t, b in sorted(self.airmass.iteritems()) if
             #            obs_start < t < ephem_limiting_dt and
             #            b > self.minimum_airmass).next()
         except IndexError:
             # No end time found, so use the last time in the almanac,
             # plus a resolution element
-            obs_end = self.data['date'][-1] + (self.resolution /
+            obs_end = self.dates[-1] + (self.resolution /
                                                (SECONDS_PER_DAY /
                                                 60.))
 
@@ -677,7 +957,7 @@ class Almanac(object):
                              'exclude_dark_time to True - this results in no '
                              'observing time!')
         if datetime_to is None:
-            datetime_to = pytz.utc.localize(ephem_to_dt(self.data['date'][-1]))\
+            datetime_to = pytz.utc.localize(ephem_to_dt(self.dates[-1]))\
                 .astimezone(tz).replace(tzinfo=None)
             logging.debug('Computed datetime_to: %s' %
                           datetime_to.strftime('%Y-%m-%d %H:%M'))
@@ -722,10 +1002,10 @@ class Almanac(object):
 
         hours_obs = 0.
         dt_up_to = copy.copy(datetime_from)
-        airmass_now = self.data[
-            self.data['date'] >= ephem.Date(tz.localize(datetime_from).
-                                            astimezone(pytz.utc))
-        ]['airmass'][0]
+        airmass_now = self.airmass[
+            self.dates >= ephem.Date(tz.localize(datetime_from).
+                                     astimezone(pytz.utc))
+        ][0]
         # airmass_now = (v for k, v in sorted(self.airmass.iteritems()) if
         #                k >= ephem.Date(tz.localize(
         #                    datetime_from).astimezone(pytz.utc))
@@ -771,13 +1051,13 @@ class Almanac(object):
                                   'Period considered: %5.3f to %5.3f' %
                                   (next_per_start, next_per_end, ))
                     half_res_in_days = self.resolution * 60. / SECONDS_PER_DAY
-                    better_per = self.data[np.logical_and(
+                    better_per = self.dates[np.logical_and(
                         np.logical_and(
                             (next_per_start - half_res_in_days) <
-                            self.data['date'],
-                            self.data['date'] <
+                            self.dates,
+                            self.dates <
                             (next_per_end - half_res_in_days)),
-                        self.data['airmass'] <= airmass_now
+                        self.airmass <= airmass_now
                     )]
                     # better_per = [k for
                     #               k, v in sorted(self.airmass.iteritems()) if
@@ -788,9 +1068,9 @@ class Almanac(object):
                     #               v <= airmass_now]
                     logging.debug('Resl. elements in better_per: %d' %
                                   better_per.shape[-1])
-                    whole_per = self.data[np.logical_and(
-                        (next_per_start - half_res_in_days) < self.data['date'],
-                        self.data['date'] < (next_per_end - half_res_in_days)
+                    whole_per = self.dates[np.logical_and(
+                        (next_per_start - half_res_in_days) < self.dates,
+                        self.dates < (next_per_end - half_res_in_days)
                     )]
                     # whole_per = [k for
                     #              k, v in sorted(self.airmass.iteritems()) if
@@ -803,8 +1083,8 @@ class Almanac(object):
                     if whole_per.shape[-1] > 0:
                         logging.debug('Period bounds found: %5.3f to %5.3f '
                                       '(%d units of resolution %2.1f)' %
-                                      (whole_per['date'][0],
-                                       whole_per['date'][-1],
+                                      (whole_per[0],
+                                       whole_per[-1],
                                        whole_per.shape[-1],
                                        self.resolution))
                     hours_obs += better_per.shape[-1] * (self.resolution / 60.)
@@ -830,6 +1110,7 @@ class DarkAlmanac(Almanac):
     Holds no RA, Dec information
     """
 
+    _data = None
     _sun_alt = None
 
     # Setters and getters
@@ -887,6 +1168,12 @@ class DarkAlmanac(Almanac):
                              "with columns 'date', 'dark_time' and 'sun_alt'")
         self._data = a
 
+    @property
+    def dates(self):
+        if self.data is None:
+            return None
+        return self.data['date']
+
     # @property
     # def dark_time(self):
     #     """
@@ -963,40 +1250,38 @@ class DarkAlmanac(Almanac):
             ('sun_alt', float)
         ])
 
-        logging.debug('Looking for existing dark almanac file')
-        # See if an almanac with these properties already exists in the PWD
         if populate:
-            load_success = self.load()
-            if not load_success:
-                # Couldn't find an almanac to load, so we need to
-                # populate this one
-                self.create_dark_almanac()
+            self.create_dark_almanac()
 
     def create_dark_almanac(self):
         """
         Perform the necessary calculations to populate this almanac
         """
         logging.debug('Creating dark almanac')
-        logging.debug('Calculating from standard almanac functions...')
-        dates, sun, moon, target, is_dark_time = \
-            self.generate_almanac_bruteforce(full_output=True)
-
         times_per_day = 1440. / self.resolution
         if abs(times_per_day - int(times_per_day)) > 1e-5:
             raise ValueError('Dark almanac resolution must divide into a day '
                              'with no remainder (i.e. resolution must be a '
                              'divisor of 1440).')
 
+        # Only the Sun and Moon are needed, so there's no need to compute
+        # the dummy target at (0, 0)
+        logging.debug('Calculating Sun and Moon altitudes...')
+        dates = self.generate_time_grid()
+        sun, moon, is_dark_time = self.compute_sun_moon_altitudes(dates)
+
         logging.debug('Populating DarkAlmanac data list')
 
-        self.data = np.array([tuple(x) for x in
-                              np.vstack((dates, is_dark_time, sun)).T.tolist()],
-                             dtype=[
-                                 ('date', float),
-                                 ('dark_time', bool),
-                                 ('sun_alt', float)
-                             ])
-        self.data.sort(axis=-1, order='date')
+        data = np.empty(len(dates), dtype=[
+            ('date', float),
+            ('dark_time', bool),
+            ('sun_alt', float)
+        ])
+        data['date'] = dates
+        data['dark_time'] = is_dark_time
+        data['sun_alt'] = sun
+        data.sort(axis=-1, order='date')
+        self.data = data
 
         # Blank or initialise the relevant dicts
         # self.dark_time = {}
@@ -1275,6 +1560,388 @@ class DarkAlmanac(Almanac):
 
         return grey_start, grey_end
 
+
+class AlmanacSet(object):
+    """
+    Object which stores observability information for many points on the sky
+    over a common time grid.
+
+    The time grid and the Sun/Moon ephemeris are computed once (held in a
+    DarkAlmanac), and the target airmasses for all fields are held in a
+    single (fields x time) matrix. Per-field Almanac objects are views onto
+    the DarkAlmanac dates and a row of the matrix, rather than separate
+    calculations.
+    """
+
+    _ra = None
+    _dec = None
+    _field_ids = None
+    _field_order = None
+    _minimum_airmass = None
+    _dark_almanac = None
+    _airmass = None
+
+    # Setters & getters
+    @property
+    def ra(self):
+        """
+        Array of field RAs for this almanac set
+        """
+        return self._ra
+
+    @property
+    def dec(self):
+        """
+        Array of field Decs for this almanac set
+        """
+        return self._dec
+
+    @property
+    def field_ids(self):
+        """
+        Array of field IDs, in the row order of the airmass matrix
+        """
+        return self._field_ids
+
+    @property
+    def dark_almanac(self):
+        """
+        DarkAlmanac holding the shared time grid and Sun/Moon information
+        """
+        return self._dark_almanac
+
+    @property
+    def start_date(self):
+        return self.dark_almanac.start_date
+
+    @property
+    def end_date(self):
+        return self.dark_almanac.end_date
+
+    @property
+    def resolution(self):
+        return self.dark_almanac.resolution
+
+    @property
+    def observer(self):
+        return self.dark_almanac.observer
+
+    @property
+    def minimum_airmass(self):
+        """
+        The minimum airmass that the per-field almanacs will consider
+        'observable'
+        """
+        return self._minimum_airmass
+
+    @property
+    def dates(self):
+        """
+        The shared time grid, as ephem dates (held by the DarkAlmanac)
+        """
+        return self.dark_almanac.dates
+
+    @property
+    def airmass(self):
+        """
+        The (fields x time) float airmass matrix. Each row holds the airmasses
+        of one field at dates.
+        """
+        return self._airmass
+
+    @airmass.setter
+    def airmass(self, a):
+        if not isinstance(a, np.ndarray) or a.ndim != 2:
+            raise ValueError("airmass must be a 2D numpy array")
+        if a.dtype != float:
+            raise ValueError("airmass must be an array of floats")
+        if a.shape != (len(self.field_ids), len(self.dates)):
+            raise ValueError("airmass must have one row per field, and one "
+                             "column per date")
+        self._airmass = a
+
+    # Initialization
+    def __init__(self, ra, dec, start_date, end_date=None,
+                 observing_period=None, field_ids=None,
+                 observer=UKST_TELESCOPE, minimum_airmass=2.0,
+                 resolution=15., populate=True):
+        ra = np.atleast_1d(np.asarray(ra, dtype=float))
+        dec = np.atleast_1d(np.asarray(dec, dtype=float))
+        if ra.ndim != 1 or ra.shape != dec.shape:
+            raise ValueError('ra and dec must be 1D arrays of equal length')
+        if np.any(ra < 0.) or np.any(ra >= 360.):
+            raise ValueError('AlmanacSet must have 0 <= RA < 360')
+        if np.any(dec < -90.) or np.any(dec > 90.):
+            raise ValueError('AlmanacSet must have -90 <= Dec <= 90')
+        if field_ids is None:
+            field_ids = np.arange(len(ra))
+        field_ids = np.atleast_1d(np.asarray(field_ids, dtype=int))
+        if field_ids.shape != ra.shape:
+            raise ValueError('field_ids must be the same length as ra and dec')
+        field_order = np.argsort(field_ids, kind='mergesort')
+        if np.any(np.diff(field_ids[field_order]) == 0):
+            raise ValueError('field_ids must be unique')
+
+        self._ra = ra
+        self._dec = dec
+        self._field_ids = field_ids
+        self._field_order = field_order
+        # Use a (validating) Almanac to vet the airmass limit, as the
+        # DarkAlmanac fixes its own
+        self._minimum_airmass = Almanac(
+            0., 0., start_date, end_date=end_date,
+            observing_period=observing_period, observer=observer,
+            minimum_airmass=minimum_airmass, resolution=resolution,
+            populate=False).minimum_airmass
+
+        # The DarkAlmanac holds the time grid and the Sun/Moon calculations
+        # for the whole set
+        self._dark_almanac = DarkAlmanac(start_date, end_date=end_date,
+                                         observing_period=observing_period,
+                                         observer=observer,
+                                         resolution=resolution,
+                                         populate=False)
+
+        if populate:
+            self.calculate_airmass()
+
+        return
+
+    def __len__(self):
+        return len(self.field_ids)
+
+    # Computation functions
+    def calculate_airmass(self, chunk_size=ALMANAC_SET_CHUNK):
+        """
+        Compute the shared Sun/Moon ephemeris, and the airmass matrix for all
+        fields
+
+        Parameters
+        ----------
+        chunk_size:
+            Number of fields to compute target altitudes for at a time, to
+            bound the size of the temporary arrays. Defaults to
+            ALMANAC_SET_CHUNK.
+        """
+        logging.debug('Computing almanac set for %d fields from %s to %s' %
+                      (len(self), self.start_date.strftime('%y-%m-%d'),
+                       self.end_date.strftime('%y-%m-%d'), ))
+        self.dark_almanac.create_dark_almanac()
+        dates = self.dates
+
+        airmass = np.empty((len(self), len(dates)), dtype=float)
+        for i in range(0, len(self), chunk_size):
+            target = compute_target_altitudes(self.ra[i:i + chunk_size],
+                                              self.dec[i:i + chunk_size],
+                                              dates, observer=self.observer)
+            airmass[i:i + chunk_size] = altitude_to_airmass(target)
+        self.airmass = airmass
+
+        return
+
+    def field_index(self, field_id):
+        """
+        Return the row of the airmass matrix corresponding to field_id
+        """
+        # Binary search, so lookups on a memory-mapped store don't need to
+        # read the whole field list
+        i = np.searchsorted(self.field_ids, field_id,
+                            sorter=self._field_order)
+        if i == len(self) or \
+                self.field_ids[self._field_order[i]] != field_id:
+            raise ValueError('Field %d is not in this AlmanacSet' %
+                             (field_id, ))
+        return int(self._field_order[i])
+
+    def almanac(self, field_id):
+        """
+        Construct the Almanac for a single field, as a view into this set
+
+        Parameters
+        ----------
+        field_id:
+            ID of the field to return the Almanac for.
+
+        Returns
+        -------
+        almanac:
+            An Almanac instance, whose dates are the shared time grid and
+            whose airmasses are a view of the relevant row of this set's
+            airmass matrix (so nothing is recomputed or copied).
+        """
+        if self.airmass is None:
+            raise RuntimeError('AlmanacSet has not been populated')
+        i = self.field_index(field_id)
+        almanac = Almanac(self.ra[i], self.dec[i], self.start_date,
+                          end_date=self.end_date, observer=self.observer,
+                          minimum_airmass=self.minimum_airmass,
+                          resolution=self.resolution, populate=False)
+        almanac.field_id = field_id
+        almanac.dates = self.dates
+        almanac.airmass = self.airmass[i]
+        return almanac
+
+    def almanac_dict(self):
+        """
+        Construct the Almanacs for all fields in this set
+
+        Returns
+        -------
+        almanacs:
+            Dictionary of field_id: Almanac, where each Almanac is a view into
+            this set (see almanac).
+        """
+        return {int(f): self.almanac(f) for f in self.field_ids}
+
+    # Save & read from disk
+    def save(self, dirname):
+        """
+        Write this set to an almanac store, which can be re-opened (memory
+        mapped) with load_almanac_set.
+
+        The store is a directory holding a small JSON index of the set
+        properties, and .npy files of the fields (ID, RA, Dec), the field ID
+        sort order, the (fields x time) airmass matrix, and the DarkAlmanac
+        data (which holds the only copy of the dates). This replaces saving
+        one pickled Almanac per field.
+
+        Parameters
+        ----------
+        dirname:
+            Directory to write the store to. Will be created if it doesn't
+            exist; any existing store in it is overwritten.
+        """
+        if self.airmass is None:
+            raise RuntimeError('AlmanacSet has not been populated')
+        if not os.path.isdir(dirname):
+            os.makedirs(dirname)
+
+        fields = np.empty(len(self), dtype=[
+            ('field_id', int),
+            ('ra', float),
+            ('dec', float)
+        ])
+        fields['field_id'] = self.field_ids
+        fields['ra'] = self.ra
+        fields['dec'] = self.dec
+        np.save(os.path.join(dirname, ALMANAC_STORE_FIELDS), fields)
+        np.save(os.path.join(dirname, ALMANAC_STORE_FIELD_ORDER),
+                self._field_order)
+        np.save(os.path.join(dirname, ALMANAC_STORE_DATA), self.airmass)
+        np.save(os.path.join(dirname, ALMANAC_STORE_DARK),
+                self.dark_almanac.data)
+
+        # Write the index last, so a partially-written store can't be opened
+        index = {
+            'format_version': ALMANAC_STORE_VERSION,
+            'start_date': self.start_date.strftime('%Y-%m-%d'),
+            'end_date': self.end_date.strftime('%Y-%m-%d'),
+            'resolution': self.resolution,
+            'minimum_airmass': self.minimum_airmass,
+            'n_fields': len(self),
+            'n_times': len(self.dates),
+            'observer': {
+                'lat': float(self.observer.lat),
+                'lon': float(self.observer.lon),
+                'elevation': self.observer.elevation,
+                'temp': self.observer.temp,
+                'pressure': self.observer.pressure,
+            },
+        }
+        with open(os.path.join(dirname, ALMANAC_STORE_INDEX), 'w') as fileobj:
+            json.dump(index, fileobj, indent=2, sort_keys=True)
+
+        return
+
+# ______________________________________________________________________________
+
+
+def load_almanac_set(dirname):
+    """
+    Open an almanac store written by AlmanacSet.save
+
+    The arrays in the store are memory-mapped (read-only), so opening the
+    store doesn't depend on the number of fields in it, and reading a
+    field's Almanac (AlmanacSet.almanac) only touches that field's data.
+
+    Parameters
+    ----------
+    dirname:
+        Directory holding the almanac store.
+
+    Returns
+    -------
+    almanac_set:
+        An AlmanacSet backed by the store.
+    """
+    with open(os.path.join(dirname, ALMANAC_STORE_INDEX)) as fileobj:
+        index = json.load(fileobj)
+    if index['format_version'] != ALMANAC_STORE_VERSION:
+        raise ValueError('Almanac store %s has format version %s (this module '
+                         'reads version %d)' % (dirname,
+                                                index['format_version'],
+                                                ALMANAC_STORE_VERSION, ))
+
+    fields = np.load(os.path.join(dirname, ALMANAC_STORE_FIELDS),
+                     mmap_mode='r')
+    field_order = np.load(os.path.join(dirname, ALMANAC_STORE_FIELD_ORDER),
+                          mmap_mode='r')
+    airmass = np.load(os.path.join(dirname, ALMANAC_STORE_DATA),
+                      mmap_mode='r')
+    dark_data = np.load(os.path.join(dirname, ALMANAC_STORE_DARK),
+                        mmap_mode='r')
+    if airmass.shape != (index['n_fields'], index['n_times']) or \
+            len(dark_data) != index['n_times']:
+        raise ValueError('Almanac store %s does not match its index' %
+                         (dirname, ))
+
+    observer = ephem.Observer()
+    for k, v in index['observer'].iteritems():
+        setattr(observer, k, v)
+
+    start_date = datetime.datetime.strptime(index['start_date'],
+                                            '%Y-%m-%d').date()
+    end_date = datetime.datetime.strptime(index['end_date'],
+                                          '%Y-%m-%d').date()
+    dark_almanac = DarkAlmanac(start_date, end_date=end_date,
+                               observer=observer,
+                               resolution=index['resolution'],
+                               populate=False)
+    dark_almanac.data = dark_data
+
+    # Build the set directly from the stored arrays, rather than through
+    # __init__, which would validate (and so read) every field
+    almanac_set = AlmanacSet.__new__(AlmanacSet)
+    almanac_set._ra = fields['ra']
+    almanac_set._dec = fields['dec']
+    almanac_set._field_ids = fields['field_id']
+    almanac_set._field_order = field_order
+    almanac_set._minimum_airmass = index['minimum_airmass']
+    almanac_set._dark_almanac = dark_almanac
+    almanac_set.airmass = airmass
+
+    return almanac_set
+
+
+def load_almanac(dirname, field_id):
+    """
+    Read a single field's Almanac from an almanac store
+
+    Parameters
+    ----------
+    dirname:
+        Directory holding the almanac store (see AlmanacSet.save).
+    field_id:
+        ID of the field to read.
+
+    Returns
+    -------
+    almanac:
+        The field's Almanac, as a view into the memory-mapped store (see
+        load_almanac_set and AlmanacSet.almanac).
+    """
+    return load_almanac_set(dirname).almanac(field_id)
+
 # ______________________________________________________________________________
 
 
@@ -1664,11 +2331,8 @@ def create_almanac(ra, dec, dates_j2000, almanac_filename):
     logging.info('creating almanac' % (almanac_filename, ))
     # sys.stdout.flush()
     
-    dates, sun, moon, target, dark_time = hours_observable_bruteforce(
-        ra, dec, dates_j2000=dates_j2000, full_output=True)
-
-    airmass = np.clip(np.where(target > np.radians(10.),
-                               1./np.sin(target), 99.), 0., 9.)
+    target = compute_target_altitudes(ra, dec, np.ravel(dates_j2000))
+    airmass = altitude_to_airmass(target).reshape(np.shape(dates_j2000))
 
     save_dict = {'dates_J2000': dates_j2000, 'airmass': airmass}
     np.savez(almanac_filename, **save_dict)
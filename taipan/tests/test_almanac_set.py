@@ -0,0 +1,38 @@
+import datetime
+from taipan.scheduling import Almanac, DarkAlmanac, AlmanacSet
+import numpy as np
+
+if __name__ == "__main__":
+    # Check that the AlmanacSet views match individually-computed almanacs
+    start_date = datetime.date(2017, 4, 1)
+    end_date = datetime.date(2017, 6, 1)
+    ra = np.array([0., 45., 120., 200., 315.])
+    dec = np.array([-80., -31., -60., 10., -5.])
+    field_ids = [101, 7, 55, 3, 12]
+
+    alm_set = AlmanacSet(ra, dec, start_date, end_date=end_date,
+                         field_ids=field_ids)
+    assert alm_set.airmass.shape == (len(ra), len(alm_set.dates))
+    assert alm_set.airmass.dtype == float
+
+    dal = DarkAlmanac(start_date, end_date=end_date, populate=False)
+    dal.create_dark_almanac()
+    assert np.all(alm_set.dark_almanac.data == dal.data)
+
+    almanacs = alm_set.almanac_dict()
+    for i, field_id in enumerate(field_ids):
+        al = Almanac(ra[i], dec[i], start_date, end_date=end_date,
+                     populate=False)
+        al.calculate_airmass()
+        al_view = almanacs[field_id]
+        assert al_view.field_id == field_id
+        assert np.all(al_view.dates == al.dates)
+        assert np.all(al_view.airmass == al.airmass)
+        # The per-field almanac must share memory with the set
+        assert np.may_share_memory(al_view.dates, alm_set.dark_almanac.data)
+        assert np.may_share_memory(al_view.airmass, alm_set.airmass)
+
+        start_datetime = datetime.datetime(2017, 4, 10, 17, 0)
+        assert al_view.hours_observable(
+            start_datetime, dark_almanac=alm_set.dark_almanac) == \
+            al.hours_observable(start_datetime, dark_almanac=dal)
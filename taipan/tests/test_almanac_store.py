@@ -0,0 +1,70 @@
+import datetime
+import shutil
+import tempfile
+from taipan.scheduling import AlmanacSet, load_almanac_set, load_almanac
+import numpy as np
+
+if __name__ == "__main__":
+    # Check that an AlmanacSet survives a round trip through the on-disk
+    # almanac store
+    start_date = datetime.date(2017, 4, 1)
+    end_date = datetime.date(2017, 5, 1)
+    ra = np.array([10., 80., 150., 290.])
+    dec = np.array([-70., -20., -45., 0.])
+    field_ids = [40, 2, 17, 9]
+
+    alm_set = AlmanacSet(ra, dec, start_date, end_date=end_date,
+                         field_ids=field_ids, minimum_airmass=1.5)
+    store = tempfile.mkdtemp()
+    try:
+        alm_set.save(store)
+        stored_set = load_almanac_set(store)
+
+        assert isinstance(stored_set.airmass, np.memmap)
+        assert np.all(stored_set.airmass == alm_set.airmass)
+        assert np.all(stored_set.dark_almanac.data == alm_set.dark_almanac.data)
+        assert stored_set.start_date == start_date
+        assert stored_set.end_date == end_date
+        assert stored_set.minimum_airmass == 1.5
+
+        start_datetime = datetime.datetime(2017, 4, 3, 17, 0)
+        for field_id in field_ids:
+            al = alm_set.almanac(field_id)
+            al_stored = stored_set.almanac(field_id)
+            # Reading a field from the store must not copy its data
+            assert np.may_share_memory(al_stored.airmass, stored_set.airmass)
+            assert np.all(al_stored.dates == al.dates)
+            assert np.all(al_stored.airmass == al.airmass)
+            assert np.all(load_almanac(store, field_id).airmass ==
+                          al.airmass)
+            assert al_stored.hours_observable(
+                start_datetime, dark_almanac=stored_set.dark_almanac) == \
+                al.hours_observable(start_datetime,
+                                    dark_almanac=alm_set.dark_almanac)
+
+        try:
+            stored_set.almanac(3)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError('Missing field should raise ValueError')
+    finally:
+        shutil.rmtree(store)
+
+    # Sets may be given datetimes rather than dates; the store must still
+    # round-trip
+    alm_set = AlmanacSet(ra, dec, datetime.datetime(2019, 11, 15),
+                         end_date=datetime.datetime(2019, 11, 22),
+                         field_ids=field_ids)
+    store = tempfile.mkdtemp()
+    try:
+        alm_set.save(store)
+        stored_set = load_almanac_set(store)
+        assert stored_set.start_date == datetime.date(2019, 11, 15)
+        assert stored_set.end_date == datetime.date(2019, 11, 22)
+        assert np.all(stored_set.dates == alm_set.dates)
+        for field_id in field_ids:
+            assert np.all(load_almanac(store, field_id).airmass ==
+                          alm_set.almanac(field_id).airmass)
+    finally:
+        shutil.rmtree(store)
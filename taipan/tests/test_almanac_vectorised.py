@@ -0,0 +1,48 @@
+import datetime
+from taipan.scheduling import Almanac, DarkAlmanac
+import numpy as np
+
+if __name__ == "__main__":
+    # Check the vectorised almanac computation against the pyephem
+    # brute-force calculation
+    for start_date in [datetime.date(2017, 4, 1), datetime.date(2019, 11, 15)]:
+        end_date = start_date + datetime.timedelta(60)
+        for ra in [0., 97.5, 215., 330.]:
+            for dec in [-85., -60., -31., 0., 25.]:
+                al_vec = Almanac(ra, dec, start_date, end_date=end_date,
+                                 populate=False)
+                al_vec.calculate_airmass(method='vectorised')
+                al_bf = Almanac(ra, dec, start_date, end_date=end_date,
+                                populate=False)
+                al_bf.calculate_airmass(method='bruteforce')
+
+                assert np.all(al_vec.data['date'] == al_bf.data['date'])
+                # Airmass jumps to the clipped value of 9 at 10 degrees
+                # altitude, so a handful of points straddling that may differ
+                above = np.logical_and(al_vec.data['airmass'] < 9.,
+                                       al_bf.data['airmass'] < 9.)
+                diff = np.max(np.abs(al_vec.data['airmass'] -
+                                     al_bf.data['airmass'])[above])
+                n_straddle = np.count_nonzero(
+                    (al_vec.data['airmass'] < 9.) !=
+                    (al_bf.data['airmass'] < 9.))
+                print(start_date, ra, dec, diff, n_straddle)
+                assert diff < 0.01
+                assert n_straddle <= 0.001 * len(al_bf.data)
+
+                dates, sun, moon, target, dark = \
+                    al_bf.generate_almanac_bruteforce()
+                vec = al_vec.generate_almanac_vectorised()
+                assert np.all(vec[1] == sun)
+                assert np.all(vec[2] == moon)
+                assert np.all(vec[4] == dark)
+                assert np.max(np.abs(vec[3] - target)[
+                                  target > np.radians(10.)]) < np.radians(
+                    1. / 60.)
+
+        dal = DarkAlmanac(start_date, end_date=end_date, populate=False)
+        dal.create_dark_almanac()
+        dates, sun, moon, target, dark = dal.generate_almanac_bruteforce()
+        assert np.all(dal.data['date'] == dates)
+        assert np.all(dal.data['dark_time'] == dark)
+        assert np.all(dal.data['sun_alt'] == sun)
@@ -15,13 +15,917 @@ import random
 import math
 import numpy as np
 import copy
+import heapq
 import logging
+import multiprocessing
+import os
+import gzip
+import pickle
+import json
 import line_profiler
+from collections import OrderedDict
+from contextlib import contextmanager
+from scipy.spatial import cKDTree
+
+# ------
+# CONSTANTS
+# ------
+
+# Methods for re-unpicking candidate tiles affected by a tile selection
+REUNPICK_METHODS = [
+    'full',             # Strip the tile and unpick from scratch
+    'delta',            # Only refill the fibres that have been invalidated
+]
+
+# Separation of tile centres beyond which selecting one tile cannot affect
+# another (shared targets, and changes in target difficulty)
+TILE_INTERACTION_RADIUS = 2.0 * tp.TILE_RADIUS + 2.0 * tp.FIBRE_EXCLUSION_RADIUS
+
+# Format version of the tiling checkpoint files
+CHECKPOINT_VERSION = 3
+
+# Number of parsed Sloane-Harding tiling files to keep in memory
+SH_TILING_CACHE_SIZE = 8
+
+# Minimum separation of the extra tile centres added by
+# generate_adaptive_tiling from any other tile centre (arcsec)
+ADAPTIVE_MIN_SEPARATION = tp.TILE_RADIUS / 6.
+
+# Number of mean-shift steps taken towards the local target density maximum
+# by generate_adaptive_tiling
+ADAPTIVE_MEAN_SHIFT_STEPS = 5
+
+# Methods for updating the tile rankings in generate_tiling_greedy
+SELECTION_ENGINES = [
+    'lazy',             # Only update stale tiles once they reach the top
+    'exhaustive',       # Re-pick affected tiles and re-score all tiles
+    'check',            # Lazy, checked against an exhaustive selection
+]
 
 # ------
 # UTILITY FUNCTIONS
 # ------
 
+class TilingReport(object):
+    """
+    Per-stage wall times and call counts, plus work counters, for a tiling
+    run.
+
+    The tiling functions time their stages with stage(), and add their own
+    counters with count(). The counts of KD-trees built and forbidden
+    checks made in this process (core.WORK_COUNTERS) since the report was
+    created are added when the report is output. Work done by worker
+    processes is timed in the stage that waits for it, but is not
+    included in the work counters.
+
+    Stages may be nested, in which case the time of the inner stage is
+    also counted in the outer one.
+    """
+
+    def __init__(self, function):
+        self.function = function
+        self.stages = OrderedDict()
+        self.counters = OrderedDict()
+        self.result = OrderedDict()
+        self._start = time.time()
+        self._work_counters = dict(tp.WORK_COUNTERS)
+
+    @contextmanager
+    def stage(self, name):
+        """
+        Context manager timing one call of the stage name.
+        """
+        start = time.time()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.time() - start)
+
+    def add_time(self, name, seconds, calls=1):
+        """
+        Add seconds, and calls calls, to the stage name.
+        """
+        entry = self.stages.setdefault(name, OrderedDict([('calls', 0),
+                                                          ('time', 0.)]))
+        entry['calls'] += calls
+        entry['time'] += seconds
+
+    def count(self, name, n=1):
+        """
+        Add n to the counter name.
+        """
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def as_dict(self):
+        """
+        Return the report as a dictionary of JSON-serialisable values.
+
+        Returns
+        -------
+        report : dict
+            The keys are 'function', 'wall_time' (seconds since the report
+            was created), 'stages' (a dictionary of {'calls', 'time'} for
+            each stage), 'counters' and 'result'.
+        """
+        counters = OrderedDict(self.counters)
+        for key in sorted(tp.WORK_COUNTERS):
+            counters[key] = counters.get(key, 0) + (
+                tp.WORK_COUNTERS[key] - self._work_counters.get(key, 0))
+        return OrderedDict([
+            ('function', self.function),
+            ('wall_time', time.time() - self._start),
+            ('stages', OrderedDict((name, dict(entry)) for name, entry
+                                   in self.stages.items())),
+            ('counters', counters),
+            ('result', OrderedDict(self.result)),
+        ])
+
+    def write(self, filename):
+        """
+        Write the report (see as_dict) to filename as JSON.
+        """
+        with open(filename, 'w') as report_fileobj:
+            json.dump(self.as_dict(), report_fileobj, indent=2)
+        logging.info('Tiling report written to %s' % filename)
+
+
+def _finish_report(report, report_file, return_report, result):
+    # Write the report of an entry point, and append it to the entry point's
+    # return value if requested
+    if report_file is not None:
+        report.write(report_file)
+    if return_report:
+        return result + (report.as_dict(), )
+    return result
+
+
+def index_tile_targets(target_tiles, tile):
+    """
+    Add the science targets of a tile to a target-to-tile index.
+
+    The tiling algorithms use this index to quickly find which candidate
+    tiles hold a given target. Targets are keyed by their idn; distinct
+    targets sharing an idn will simply cause extra tiles to be found.
+
+    Parameters
+    ----------
+    target_tiles : dict
+        The index, mapping target idn to the set of TaipanTiles holding that
+        target. Updated in-place.
+
+    tile : :class:`TaipanTile`
+        The tile to add to the index.
+    """
+    for t in tile.get_assigned_targets_science():
+        target_tiles.setdefault(t.idn, set()).add(tile)
+
+
+def unindex_tile_targets(target_tiles, tile):
+    """
+    Remove the science targets of a tile from a target-to-tile index.
+
+    This must be called before the fibre assignments of an indexed tile are
+    changed; see index_tile_targets.
+
+    Parameters
+    ----------
+    target_tiles : dict
+        The index, mapping target idn to the set of TaipanTiles holding that
+        target. Updated in-place.
+
+    tile : :class:`TaipanTile`
+        The tile to remove from the index.
+    """
+    for t in tile.get_assigned_targets_science():
+        if t.idn in target_tiles:
+            target_tiles[t.idn].discard(tile)
+
+
+def _catalogue_lookup(catalogues):
+    """
+    Map the targets in a tuple of catalogues to (catalogue, index) pairs.
+    """
+    lookup = {}
+    for c in range(len(catalogues) - 1, -1, -1):
+        for i, t in enumerate(catalogues[c]):
+            lookup[id(t)] = (c, i)
+    return lookup
+
+
+def _encode_fibres(tile, lookup):
+    """
+    Encode the non-empty fibre assignments of a tile for passing between
+    processes.
+
+    Returns a list of (fibre, value) pairs, where value is either 'sky', or
+    a (catalogue, index) pair as given by lookup (see _catalogue_lookup).
+    """
+    return [(f, t if t == 'sky' else lookup[id(t)])
+            for f, t in tile.fibres.iteritems() if t is not None]
+
+
+def _decode_fibres(tile, fibres, catalogues):
+    """
+    Write fibre assignments encoded by _encode_fibres back into a tile.
+    """
+    for f in tile.fibres:
+        tile.set_fibre(f, None)
+    for f, value in fibres:
+        if value != 'sky':
+            value = catalogues[value[0]][value[1]]
+        tile.set_fibre(f, value)
+
+
+def _output_tile(tile, overlay):
+    """
+    Prepare a selected tile for output from a tiling generator. If overlay
+    (a TargetOverlay) is given, a clone of the tile is returned, with the
+    target views replaced by the underlying targets.
+    """
+    if overlay is None:
+        return tile
+    tile = tile.clone()
+    for f, t in tile.fibres.items():
+        if isinstance(t, _GuideTargetView):
+            if overlay.unwrap(t._target) is not t._target:
+                tile.set_fibre(f, _GuideTargetView(overlay.unwrap(t._target)))
+        elif isinstance(t, tp.TaipanTarget):
+            tile.set_fibre(f, overlay.unwrap(t))
+    return tile
+
+
+def _release_targets(overlay, caller_targets, candidate_targets):
+    """
+    When a tiling generator is working with a TargetOverlay, reduce the
+    caller's list of candidate targets in place to the targets underlying
+    the remaining candidate_targets views.
+    """
+    if overlay is not None:
+        caller_targets[:] = [overlay.unwrap(t) for t in candidate_targets]
+
+
+def _encode_tile(tile, lookup):
+    """
+    Encode a tile (position, identifiers and fibre assignments) for writing
+    to a checkpoint. See _encode_fibres. If lookup is None, the fibre
+    assignments are not encoded.
+    """
+    fibres = []
+    if lookup is not None:
+        fibres = _encode_fibres(tile, lookup)
+    return (tile.ra, tile.dec, tile.pa, tile.field_id, tile.pk,
+            tile.mag_min, tile.mag_max, fibres)
+
+
+def _decode_tile(encoded, catalogues):
+    """
+    Re-create a tile encoded by _encode_tile.
+    """
+    ra, dec, pa, field_id, pk, mag_min, mag_max, fibres = encoded
+    tile = tp.TaipanTile(ra, dec, field_id=field_id, pk=pk, pa=pa)
+    tile.mag_min = mag_min
+    tile.mag_max = mag_max
+    _decode_fibres(tile, fibres, catalogues)
+    return tile
+
+
+class _GuideTargetView(tp.TaipanTarget):
+    """
+    A view of a TaipanTarget as a guide-only target.
+
+    The view shares all of its attributes with the underlying target, except
+    that it is always a guide, and never a standard or science target. This
+    allows a target to be used as a guide in one magnitude range of a
+    FunnelWeb tiling, and as a science target or standard in another,
+    without copying it.
+    """
+    _guide = True
+    _standard = False
+    _science = False
+
+    def __init__(self, target):
+        self._target = target
+
+    def __getattr__(self, name):
+        # Only called for attributes not found on the view itself
+        if name == '_target':
+            raise AttributeError(name)
+        return getattr(self._target, name)
+
+
+def _guide_view(target):
+    """
+    Return target as a guide-only target, wrapping it in a _GuideTargetView
+    if it is not one already.
+    """
+    if target.guide and not target.standard and not target.science:
+        return target
+    return _GuideTargetView(target)
+
+
+def save_tiling_checkpoint(filename, state):
+    """
+    Write the state of a tiling run to a checkpoint file.
+
+    The state is pickled and gzipped. It is written to a temporary file,
+    which is then moved into place, so that an interrupted write cannot
+    corrupt an existing checkpoint.
+
+    Parameters
+    ----------
+    filename : str
+        The checkpoint file to write.
+
+    state : dict
+        The tiling state, as assembled by iter_tiling_greedy or
+        iter_tiling_funnelweb. Targets must be encoded as indices into
+        the target lists passed to the tiling function, so the checkpoint
+        contains no TaipanTarget objects.
+
+    Returns
+    -------
+    Nil.
+    """
+    state = dict(state, version=CHECKPOINT_VERSION)
+    with gzip.open(filename + '.tmp', 'wb') as fileobj:
+        pickle.dump(state, fileobj, pickle.HIGHEST_PROTOCOL)
+    os.rename(filename + '.tmp', filename)
+    logging.info('Wrote tiling checkpoint to %s' % filename)
+
+
+def load_tiling_checkpoint(filename, tiling_function=None):
+    """
+    Read a checkpoint file written by save_tiling_checkpoint.
+
+    Parameters
+    ----------
+    filename : str
+        The checkpoint file to read.
+
+    tiling_function : str, optional
+        The name of the tiling function the checkpoint is expected to have
+        been written by (e.g. 'generate_tiling_greedy'). Defaults to None,
+        in which case the checkpoint is not checked.
+
+    Returns
+    -------
+    state : dict
+        The tiling state stored in the checkpoint.
+    """
+    with gzip.open(filename, 'rb') as fileobj:
+        state = pickle.load(fileobj)
+    if state.get('version') != CHECKPOINT_VERSION:
+        raise ValueError('%s is not a compatible tiling checkpoint '
+                         '(version %s)' % (filename, state.get('version')))
+    if tiling_function is not None and state['function'] != tiling_function:
+        raise ValueError('%s was written by %s, not %s' %
+                         (filename, state['function'], tiling_function))
+    return state
+
+
+# Target catalogues and unpick_tile options of the worker pool a worker
+# process belongs to. These are set in each worker when it starts (see
+# _init_unpick_worker), and are never set in the parent process.
+_worker_catalogues = None
+_worker_kwargs = None
+_worker_lookup = None
+
+
+def _init_unpick_worker(catalogues, unpick_kwargs):
+    """
+    Initialise a worker process of an UnpickPool.
+    """
+    global _worker_catalogues, _worker_kwargs, _worker_lookup
+    _worker_catalogues = catalogues
+    _worker_kwargs = unpick_kwargs
+    _worker_lookup = _catalogue_lookup(catalogues)
+
+
+def _unpick_worker(task):
+    """
+    Unpick a single tile in a worker process.
+
+    Parameters
+    ----------
+    task : tuple
+        (key, ra, dec, pa, candidate_inds, difficulties) of the tile to
+        unpick. If candidate_inds is None, the tile is unpicked against the
+        full candidate catalogue. Otherwise, only the candidates at the
+        given catalogue indices are considered, and their difficulties are
+        first set to the given values.
+
+    Returns
+    -------
+    key :
+        The key passed in with the task.
+
+    fibres : list of 2-tuples
+        The non-empty fibre assignments of the unpicked tile, as
+        (fibre, value) pairs. value is either 'sky', or a
+        (catalogue number, index) pair, where catalogue number is 0, 1 or 2
+        for the candidate, standard and guide targets respectively.
+    """
+    key, ra, dec, pa, candidate_inds, difficulties = task
+    candidate_targets, standard_targets, guide_targets = _worker_catalogues
+    if candidate_inds is not None:
+        # Keep the candidates in catalogue order, as they would be in
+        # the parent's (reduced) candidate list
+        candidate_targets = []
+        for i, d in sorted(zip(candidate_inds, difficulties)):
+            _worker_catalogues[0][i].difficulty = d
+            candidate_targets.append(_worker_catalogues[0][i])
+    tile = tp.TaipanTile(ra, dec, pa=pa)
+    burn = tile.unpick_tile(candidate_targets, standard_targets,
+                            guide_targets, overwrite_existing=True,
+                            **_worker_kwargs)
+    return key, _encode_fibres(tile, _worker_lookup)
+
+
+class UnpickPool(object):
+    """
+    A pool of worker processes for unpicking tiles in parallel, together
+    with the target catalogues the workers unpick against.
+
+    Create with create_unpick_pool. Each pool holds its own catalogues, so
+    several pools may be in use at the same time.
+
+    Attributes
+    ----------
+    catalogues : 3-tuple of lists of :class:`TaipanTarget`
+        The candidate, standard and guide target catalogues.
+
+    lookup : dict
+        The (catalogue number, index) of each target in catalogues, keyed
+        by id (see _catalogue_lookup).
+
+    candidate_index : dict
+        The index of each candidate target in the candidate catalogue,
+        keyed by id.
+    """
+
+    def __init__(self, candidate_targets, standard_targets, guide_targets,
+                 ncpu, unpick_kwargs):
+        # Take copies, as the caller's lists may be reduced during tiling
+        self.catalogues = (candidate_targets[:], standard_targets[:],
+                           guide_targets[:])
+        self.lookup = _catalogue_lookup(self.catalogues)
+        self.candidate_index = dict((id(t), i) for i, t in
+                                    enumerate(self.catalogues[0]))
+        # The catalogues are handed to the workers when they are forked
+        self._pool = multiprocessing.Pool(
+            ncpu, initializer=_init_unpick_worker,
+            initargs=(self.catalogues, unpick_kwargs))
+
+    def imap_unordered(self, func, tasks, chunksize=1):
+        return self._pool.imap_unordered(func, tasks, chunksize=chunksize)
+
+    def close(self):
+        self._pool.close()
+
+    def join(self):
+        self._pool.join()
+
+    def terminate(self):
+        self._pool.terminate()
+
+
+def create_unpick_pool(candidate_targets, standard_targets, guide_targets,
+                       ncpu, **unpick_kwargs):
+    """
+    Create a pool of worker processes for unpicking tiles in parallel.
+
+    The target lists are handed to the workers when they are forked, so
+    they are only copied once per worker. The pool must be used with
+    unpick_tiles_parallel or unpick_tiles_waves, and closed by the caller
+    when finished with.
+    The pool may be kept for the duration of a tiling run; tiles can be
+    unpicked against a reduced candidate list (see unpick_tiles_parallel).
+
+    Parameters
+    ----------
+    candidate_targets, standard_targets, guide_targets : lists of :class:`TaipanTarget`
+        The target lists to be passed to TaipanTile.unpick_tile. The lists
+        are copied, but the targets themselves must not be changed while
+        the pool is in use (target difficulties aside). Later candidate
+        lists passed to unpick_tiles_parallel must be a subset of
+        candidate_targets, in the same order.
+
+    ncpu : int
+        The number of worker processes to create.
+
+    unpick_kwargs :
+        Any other arguments to be passed to TaipanTile.unpick_tile.
+        overwrite_existing is always True for unpick_tiles_parallel, and is
+        given to unpick_tiles_waves. Tiles unpicked against only the
+        candidates near them (i.e. by unpick_tiles_waves, or by
+        unpick_tiles_parallel with a reduced candidate list) only match a
+        serial unpick if preserve_order=True is given.
+
+    Returns
+    -------
+    pool : :class:`UnpickPool`
+        The worker pool.
+    """
+    return UnpickPool(candidate_targets, standard_targets, guide_targets,
+                      ncpu, unpick_kwargs)
+
+
+@contextmanager
+def _closing_pool(pool):
+    """
+    Shut down a worker pool (an UnpickPool or multiprocessing.Pool) once the
+    with block using it is done. The pool is closed, and its workers waited
+    for, if the block finishes normally. If the block raises an exception
+    (including GeneratorExit, when a tiling generator is stopped early), the
+    workers are terminated straight away. pool may be None, in which case
+    nothing is done.
+    """
+    try:
+        yield pool
+    except BaseException:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+        raise
+    if pool is not None:
+        pool.close()
+        pool.join()
+
+
+def unpick_tiles_parallel(pool, tiles, candidate_targets=None, costs=None):
+    """
+    Unpick a list of tiles using a worker pool.
+
+    Each tile is unpicked afresh (i.e. with overwrite_existing=True)
+    against the target lists given to create_unpick_pool, and the
+    resulting fibre assignments are written back into the tile. This
+    function blocks until all of the tiles have been unpicked.
+    The tiles are treated as independent: any changes an unpick makes to
+    target difficulties are not passed back. Use unpick_tiles_waves (with
+    repeat_targets=True) to match unpicking the tiles one after another.
+
+    Parameters
+    ----------
+    pool : :class:`UnpickPool`
+        A pool created with create_unpick_pool.
+
+    tiles : list of :class:`TaipanTile`
+        The tiles to unpick. Updated in-place.
+
+    candidate_targets : list of :class:`TaipanTarget`, optional
+        The current candidate targets, if these have been reduced since the
+        pool was created. The indices of the candidates in range of each
+        tile, and their current difficulties, are sent with the task.
+        Defaults to None, in which case the full candidate list given to
+        create_unpick_pool is used.
+
+    costs : list of floats, optional
+        An estimate of the cost of unpicking each tile (e.g. the number of
+        candidate targets in range). The most expensive tiles are sent to
+        the workers first, so they are not left running at the end.
+        Defaults to None, in which case tiles are dispatched in order,
+        unless candidate_targets is given, in which case the number of
+        candidates in range of each tile is used.
+    """
+    if candidate_targets is None:
+        tasks = [(k, t.ra, t.dec, t.pa, None, None)
+                 for k, t in enumerate(tiles)]
+    else:
+        in_range = tp.targets_in_range_tiles(tiles, candidate_targets)
+        tasks = [(k, t.ra, t.dec, t.pa,
+                  [pool.candidate_index[id(c)] for c in cands],
+                  [c.difficulty for c in cands])
+                 for k, (t, cands) in enumerate(zip(tiles, in_range))]
+        if costs is None:
+            costs = [len(cands) for cands in in_range]
+    if costs is not None:
+        tasks.sort(key=lambda x: -1 * costs[x[0]])
+    results = pool.imap_unordered(_unpick_worker, tasks, chunksize=1)
+    for i, (k, fibres) in enumerate(results):
+        _decode_fibres(tiles[k], fibres, pool.catalogues)
+        logging.info('Unpicked %d / %d tiles' % (i + 1, len(tiles)))
+
+
+def _wave_worker(task):
+    """
+    Unpick the tile(s) at a single position in a worker process, for
+    unpick_tiles_waves.
+
+    Parameters
+    ----------
+    task : tuple
+        (key, ra, dec, pa, npass, overwrite_existing, candidates,
+        difficulties). npass tiles are unpicked at the given position, one
+        after another. candidates gives the candidate targets in range of the
+        position as (catalogue number, index) pairs, in the order they appear
+        in the parent's candidate list, and difficulties their current
+        difficulties.
+
+    Returns
+    -------
+    key :
+        The key passed in with the task.
+
+    fibres : list of lists of 2-tuples
+        The non-empty fibre assignments of each unpicked tile, encoded as
+        per _encode_fibres.
+
+    removed : list of 2-tuples
+        The candidates removed from the candidate list by the unpicks.
+
+    appended : list of 2-tuples
+        The candidates appended to the end of the candidate list by the
+        unpicks (e.g. science targets removed to make way for guides), in
+        order.
+
+    difficulties : list of 2-tuples
+        (candidate, difficulty) pairs for the candidates whose difficulty
+        was changed by the unpicks.
+    """
+    key, ra, dec, pa, npass, overwrite_existing, candidates, \
+        difficulties = task
+    candidate_targets = []
+    for (c, i), d in zip(candidates, difficulties):
+        _worker_catalogues[c][i].difficulty = d
+        candidate_targets.append(_worker_catalogues[c][i])
+    tiles = [tp.TaipanTile(ra, dec, pa=pa) for i in range(npass)]
+    removed, appended = _unpick_position(
+        tiles, candidate_targets, _worker_catalogues[1],
+        _worker_catalogues[2],
+        dict(_worker_kwargs, overwrite_existing=overwrite_existing))
+    fibres = [_encode_fibres(tile, _worker_lookup) for tile in tiles]
+    removed = set(id(t) for t in removed)
+    removed = [c for c, t in zip(candidates, candidate_targets)
+               if id(t) in removed]
+    appended = [_worker_lookup[id(t)] for t in appended]
+    difficulties = [(c, t.difficulty) for c, t, d in
+                    zip(candidates, candidate_targets, difficulties)
+                    if t.difficulty != d]
+    return key, fibres, removed, appended, difficulties
+
+
+def _unpick_position(tiles, candidate_targets, standard_targets,
+                     guide_targets, unpick_kwargs):
+    """
+    Unpick the tiles at a single position one after another, against the
+    candidate targets in range of that position.
+
+    Parameters
+    ----------
+    tiles : list of :class:`TaipanTile`
+        The tiles to unpick, all at the same position. The tiles are
+        updated in-place.
+
+    candidate_targets : list of :class:`TaipanTarget`
+        The candidates within TILE_RADIUS + 2 * FIBRE_EXCLUSION_RADIUS of
+        the position, in the order they appear in the full candidate list.
+
+    standard_targets, guide_targets : lists of :class:`TaipanTarget`
+        Passed to TaipanTile.unpick_tile.
+
+    unpick_kwargs : dict
+        Any other arguments to be passed to TaipanTile.unpick_tile.
+        check_tile_radius is always True.
+
+    Returns
+    -------
+    removed : list of :class:`TaipanTarget`
+        The candidates removed from the candidate list by the unpicks.
+
+    appended : list of :class:`TaipanTarget`
+        The targets appended to the end of the candidate list by the
+        unpicks (e.g. science targets removed to make way for guides), in
+        order.
+    """
+    # unpick_tile returns the candidate list less the targets it assigned,
+    # with any targets it puts back appended. A marker target on the far
+    # side of the sky shows where the original list ended
+    ra, dec = tiles[0].ra, tiles[0].dec
+    end_marker = tp.TaipanTarget(-1, (ra + 180.) % 360., -1. * dec)
+    end_marker.compute_usposn()
+    candidates_return = candidate_targets + [end_marker]
+    unpick_kwargs = dict(unpick_kwargs, check_tile_radius=True)
+    for tile in tiles:
+        candidates_return, burn = tile.unpick_tile(
+            candidates_return, standard_targets, guide_targets,
+            **unpick_kwargs)
+    split = candidates_return.index(end_marker)
+    kept = set([id(t) for t in candidates_return[:split]])
+    removed = [t for t in candidate_targets if id(t) not in kept]
+    return removed, candidates_return[split + 1:]
+
+
+class _LocalCandidates(object):
+    """
+    The candidate targets in range of each of a list of positions, as
+    targets are removed from and appended to the candidate list.
+
+    The candidates near each position are found once, from the initial
+    candidate list. The remaining candidates near a position are then
+    those candidates which are still in the list, plus any targets from
+    outside the initial list which have been appended since, in the order
+    of the current candidate list.
+    """
+
+    def __init__(self, positions, candidate_targets, radius,
+                 in_range=None):
+        self.positions = positions
+        self.radius = radius
+        if in_range is None:
+            in_range = tp.targets_in_range_multi(
+                [(t.ra, t.dec) for t in positions], candidate_targets,
+                radius, preserve_order=True)
+        self.in_range = in_range
+        self.candidate_targets = candidate_targets
+        # Sort key for each remaining candidate, giving its position in the
+        # candidate list. Appended targets are sorted after the initial
+        # targets, in the order they were appended
+        self.list_key = dict((id(t), (0, i)) for i, t in
+                             enumerate(candidate_targets))
+        self.initial = set(self.list_key)
+        self.appended = []
+        self.n_appended = 0
+
+    def near(self, k):
+        """
+        Return the remaining candidates in range of position k, in
+        candidate list order.
+        """
+        list_key = self.list_key
+        cands = [t for t in self.in_range[k] if id(t) in list_key]
+        extra = [t for t in self.appended if id(t) not in self.initial and
+                 id(t) in list_key]
+        if len(extra) > 0:
+            cands += tp.targets_in_range(
+                self.positions[k].ra, self.positions[k].dec, extra,
+                self.radius, preserve_order=True)
+        if len(self.appended) > 0:
+            cands.sort(key=lambda t: list_key[id(t)])
+        return cands
+
+    def update(self, removed, appended):
+        """
+        Remove the targets removed from the candidate list, then append
+        the targets appended to it.
+        """
+        for t in removed:
+            del self.list_key[id(t)]
+        for t in appended:
+            self.list_key[id(t)] = (1, self.n_appended)
+            self.n_appended += 1
+            self.appended.append(t)
+
+    def remaining(self):
+        """
+        Return the remaining candidate list.
+        """
+        remaining = dict((id(t), t) for t in
+                         self.candidate_targets + self.appended
+                         if id(t) in self.list_key)
+        return sorted(remaining.values(),
+                      key=lambda t: self.list_key[id(t)])
+
+
+def compute_tile_waves(tiles):
+    """
+    Split an ordered list of tiles into waves of tiles which can be
+    unpicked at the same time.
+
+    Unpicking a tile only reads and changes targets within
+    TILE_RADIUS + 2 * FIBRE_EXCLUSION_RADIUS of its centre, so tiles further
+    than TILE_INTERACTION_RADIUS apart may be unpicked in either order.
+    Each tile is placed in the wave after the latest wave holding a tile
+    it interacts with which comes before it in tiles. Unpicking the waves
+    in turn is therefore equivalent to unpicking the tiles one after
+    another, in order.
+
+    Parameters
+    ----------
+    tiles : list of :class:`TaipanTile`
+        The tiles to be unpicked, in order.
+
+    Returns
+    -------
+    waves : list of lists of ints
+        The indices into tiles of the tiles in each wave, in order.
+    """
+    if len(tiles) == 0:
+        return []
+    neighbours = cKDTree([tp.polar2cart((t.ra, t.dec))
+                          for t in tiles]).query_ball_point(
+        [tp.polar2cart((t.ra, t.dec)) for t in tiles],
+        tp.dist_euclidean(TILE_INTERACTION_RADIUS / 3600.))
+    wave_of = []
+    waves = []
+    for k in range(len(tiles)):
+        wave = 1 + max([wave_of[n] for n in neighbours[k] if n < k] + [-1])
+        wave_of.append(wave)
+        if wave == len(waves):
+            waves.append([])
+        waves[wave].append(k)
+    return waves
+
+
+def unpick_tiles_waves(pool, tiles, candidate_targets,
+                       overwrite_existing=False, repeat_targets=False,
+                       in_range=None):
+    """
+    Unpick an ordered list of tiles using a worker pool, giving the same
+    result as unpicking them one after another.
+
+    The tile positions are split into waves which cannot interact (see
+    compute_tile_waves), and the positions in each wave are unpicked
+    concurrently. The tiles at each position are unpicked in turn against
+    the candidates in range of it, in the order they appear in
+    candidate_targets. The changes made to the candidate list and to
+    target difficulties are then applied in the parent process.
+
+    Parameters
+    ----------
+    pool : :class:`UnpickPool`
+        A pool created with create_unpick_pool.
+
+    tiles : list of lists of :class:`TaipanTile`
+        The tiles to unpick, in order. Each sublist holds tiles at the same
+        position (e.g. the passes of generate_tiling_greedy_npasses), which
+        are unpicked one after another by the same worker. The tiles are
+        updated in-place.
+
+    candidate_targets : list of :class:`TaipanTarget`
+        The current candidate targets. Must be drawn from the target lists
+        given to create_unpick_pool.
+
+    overwrite_existing : bool, optional
+        Passed to TaipanTile.unpick_tile. Defaults to False.
+
+    repeat_targets : bool, optional
+        If True, the tiles at each position are unpicked against
+        candidate_targets as given, rather than against the candidates left
+        by the earlier positions. Positions may still interact through the
+        target difficulties. Defaults to False.
+
+    in_range : list of lists of :class:`TaipanTarget`, optional
+        The targets in candidate_targets within
+        TILE_RADIUS + 2 * FIBRE_EXCLUSION_RADIUS of each position, in the
+        order they appear in candidate_targets (e.g. from
+        core.targets_in_range_multi with preserve_order=True). If not
+        given, these are found with a single query. The candidates sent
+        with each position are drawn from these, less any which have
+        already been assigned. Defaults to None.
+
+    Returns
+    -------
+    candidate_targets : list of :class:`TaipanTarget`
+        The candidate targets remaining after the tiles have been unpicked,
+        in the order a serial unpick would leave them. If repeat_targets,
+        these are the candidates remaining after the last position has been
+        unpicked.
+    """
+    local_radius = tp.TILE_RADIUS + 2. * tp.FIBRE_EXCLUSION_RADIUS
+    positions = [t[0] for t in tiles]
+    waves = compute_tile_waves(positions)
+    logging.info('Unpicking %d positions in %d waves...' %
+                 (len(tiles), len(waves), ))
+    # Find the candidates near each position once
+    local = _LocalCandidates(positions, candidate_targets, local_radius,
+                             in_range=in_range)
+    done = 0
+    for wave in waves:
+        tasks = []
+        for k in wave:
+            if repeat_targets:
+                # The candidates never change
+                cands = local.in_range[k]
+            else:
+                cands = local.near(k)
+            tasks.append((k, positions[k].ra, positions[k].dec,
+                          positions[k].pa, len(tiles[k]), overwrite_existing,
+                          [pool.lookup[id(c)] for c in cands],
+                          [c.difficulty for c in cands]))
+        # Send the busiest positions out first
+        tasks.sort(key=lambda x: -1 * len(x[6]))
+        changes = {}
+        for k, fibres, removed_k, appended_k, difficulties in \
+                pool.imap_unordered(_wave_worker, tasks, chunksize=1):
+            for tile, fibres_tile in zip(tiles[k], fibres):
+                _decode_fibres(tile, fibres_tile, pool.catalogues)
+            for (c, i), d in difficulties:
+                pool.catalogues[c][i].difficulty = d
+            changes[k] = ([pool.catalogues[c][i] for c, i in removed_k],
+                          [pool.catalogues[c][i] for c, i in appended_k])
+            done += 1
+            logging.info('Unpicked %d / %d positions' % (done, len(tiles)))
+        if repeat_targets:
+            if len(tiles) - 1 in changes:
+                local.update(*changes[len(tiles) - 1])
+        else:
+            # Apply the changes to the candidate list in position order, as
+            # they would be if the positions were unpicked in turn
+            for k in sorted(changes):
+                local.update(*changes[k])
+
+    return local.remaining()
+
 
 def compute_bounds(ra_min, ra_max, dec_min, dec_max):
     """
@@ -66,12 +970,14 @@ def compute_bounds(ra_min, ra_max, dec_min, dec_max):
         raise ValueError('Max declination must be >= -90.0 and <= 90.0')
 
     # Get the entry coordinates into the standard range
-    ra_max %= 360.
-    if ra_min > ra_max:
-        ra_min = (ra_min % 360.0) - 360.0
-
-    dec_min = (dec_min + 90.) % 180. - 90.
-    dec_max = (dec_max + 90.) % 180. - 90.
+    # A full RA range is left alone, as ra_max would otherwise wrap to 0
+    if ra_max - ra_min < 360. - 1e-5:
+        ra_max %= 360.
+        if ra_min > ra_max:
+            ra_min = (ra_min % 360.0) - 360.0
+
+    # The declinations have been checked to be in range above; wrapping
+    # them would send a bound of +90 to -90
     if dec_min > dec_max:
         dec_min_old = dec_min
         dec_min = dec_max
@@ -119,6 +1025,46 @@ def is_within_bounds(tile, ra_min, ra_max, dec_min, dec_max,
     return within_bounds
 
 
+def is_within_bounds_array(ra, dec, ra_min, ra_max, dec_min, dec_max,
+                           compute_bounds_forcoords=True):
+    """
+    Check which of an array of positions are within the specified bounds.
+
+    This is an array version of is_within_bounds.
+
+    Parameters
+    ----------
+    ra, dec : :class:`numpy.ndarray`
+        The positions to check, in decimal degrees.
+
+    ra_min, ra_max, dec_min, dec_max :
+        The bounds to check.
+
+    compute_bounds_forcoords :
+        Boolean value, denoting whether to use the compute_bounds
+        function to ensure the bounds are in standard format. Defaults to True.
+
+    Returns
+    -------
+    within_bounds : :class:`numpy.ndarray`
+        Boolean array denoting whether each position is within the bounds.
+    """
+    if compute_bounds_forcoords:
+        ra_min, ra_max, dec_min, dec_max = compute_bounds(ra_min, ra_max,
+            dec_min, dec_max)
+
+    ra = np.asarray(ra)
+    dec = np.asarray(dec)
+    within_ra = (ra >= ra_min) & (ra <= ra_max)
+    # Special case for ra_min < 0
+    if ra_min < 0.:
+        within_ra |= (ra - 360. >= ra_min)
+
+    within_dec = (dec >= dec_min) & (dec <= dec_max)
+
+    return within_ra & within_dec
+
+
 # -------
 # TILE CREATION FUNCTIONS
 # -------
@@ -168,7 +1114,71 @@ def generate_random_tile(ra_min=0.0, ra_max=360.0,
     return new_tile
 
 
-def generate_SH_tiling(tiling_file, randomise_seed=True, randomise_pa=False):
+# Parsed Sloane-Harding tilings, as arrays of unit vectors, keyed by
+# (file path, modification time, size). See load_SH_tiling.
+_sh_tiling_cache = OrderedDict()
+
+
+def load_SH_tiling(tiling_file):
+    """
+    Load the tile centres of a Sloane-Harding tiling.
+
+    Parsed tilings are cached in memory (up to SH_TILING_CACHE_SIZE of them),
+    and in a .npy file alongside the tiling file (tiling_file + '.npy'),
+    which is used in place of the text file if it is newer. The .npy file
+    is not written if the directory is not writable.
+
+    Parameters
+    ----------
+    tiling_file : str
+        The text file holding the Sloane-Harding tiling (see
+        generate_SH_tiling).
+
+    Returns
+    -------
+    centres : :class:`numpy.ndarray`
+        An (N, 3) array of the tile centres, as X, Y, Z unit vectors. The
+        array is shared with the cache, so is made read-only.
+    """
+    tiling_file = os.path.abspath(tiling_file)
+    stat = os.stat(tiling_file)
+    key = (tiling_file, stat.st_mtime, stat.st_size)
+    if key in _sh_tiling_cache:
+        centres = _sh_tiling_cache.pop(key)
+        _sh_tiling_cache[key] = centres
+        return centres
+
+    sidecar_file = tiling_file + '.npy'
+    centres = None
+    if (os.path.exists(sidecar_file) and
+            os.stat(sidecar_file).st_mtime >= stat.st_mtime):
+        try:
+            centres = np.load(sidecar_file)
+        except (IOError, ValueError):
+            logging.warning('Unable to read %s - re-parsing %s' %
+                            (sidecar_file, tiling_file, ))
+    if centres is None:
+        with open(tiling_file, 'r') as tiling_fileobj:
+            textlines = tiling_fileobj.readlines()
+        # Group the tile centres
+        centres = np.array([float(l) for l in
+                            textlines[:len(textlines) / 3 * 3]]).reshape(-1, 3)
+        try:
+            with open(sidecar_file + '.tmp', 'wb') as sidecar_fileobj:
+                np.save(sidecar_fileobj, centres)
+            os.rename(sidecar_file + '.tmp', sidecar_file)
+        except (IOError, OSError):
+            logging.debug('Unable to write %s' % sidecar_file)
+
+    centres.flags.writeable = False
+    _sh_tiling_cache[key] = centres
+    while len(_sh_tiling_cache) > SH_TILING_CACHE_SIZE:
+        burn = _sh_tiling_cache.popitem(last=False)
+    return centres
+
+
+def generate_SH_tiling(tiling_file, randomise_seed=True, randomise_pa=False,
+                       ra_min=None, ra_max=None, dec_min=None, dec_max=None):
     """
     Generate a list of tiles from a Sloane-Harding tiling list.
 
@@ -177,6 +1187,7 @@ def generate_SH_tiling(tiling_file, randomise_seed=True, randomise_pa=False):
     tiling_file : 
         The text file holding the Sloane-Harding tiling. These
         should be downloaded from http://neilsloane.com/icosahedral.codes/.
+        The parsed tiling is cached (see load_SH_tiling).
         
     randomise_seed : 
         Boolean value denoting whether to randomise the location
@@ -188,6 +1199,12 @@ def generate_SH_tiling(tiling_file, randomise_seed=True, randomise_pa=False):
         Boolean value denoting whether to randomise the position
         angle of the generated tiles. Defaults to False.
 
+    ra_min, ra_max, dec_min, dec_max :
+        Optional bounds on the tile centres (see is_within_bounds). Tiles
+        outside the bounds are discarded before they are created. The
+        random numbers drawn are the same as without bounds. Any bound not
+        given is unbounded (0/360 in RA, -90/90 in Dec); if none are given,
+        all tiles are returned.
 
     Returns
     -------
@@ -196,43 +1213,214 @@ def generate_SH_tiling(tiling_file, randomise_seed=True, randomise_pa=False):
         Sloane-Harding tiling.
     """
 
-    with open(tiling_file, 'r') as tiling_fileobj:
-        textlines = tiling_fileobj.readlines()
-
-    # Group the tile centres
-    tile_cents = [(float(textlines[i*3]), float(textlines[i*3+1]), 
-        float(textlines[i*3+2]))
-        for i in range(len(textlines) / 3)]
+    tile_cents = load_SH_tiling(tiling_file)
     # Convert X, Y, Z to RA, Dec
-    tile_cents = [(np.degrees(math.atan2(c[1], c[0])),
-        np.degrees(math.acos(c[2]))- 90.) 
-        for c in tile_cents]
-    # print tile_cents
+    ra = np.degrees(np.arctan2(tile_cents[:, 1], tile_cents[:, 0]))
+    dec = np.degrees(np.arccos(tile_cents[:, 2])) - 90.
     # Randomise positions, if necessary
     if randomise_seed:
         ra_delta = random.uniform(0.0, 180.)
-        # print '(%3.1f, %2.1f)' % (ra_delta, dec_delta)
-        tile_cents = [((c[0] + ra_delta + 180.) % 360. - 180., c[1])
-            for c in tile_cents]
-        # print tile_cents[0]
-    # print len(tile_cents)
+        ra = (ra + ra_delta + 180.) % 360. - 180.
+    ra += 180.
 
-    def gen_pa(randomise_pa):
-        if randomise_pa:
-            return random.uniform(0., 360.)
-        return 0.
-
-    tile_list = [tp.TaipanTile(c[0] + 180., c[1], pa=gen_pa(randomise_pa))
-        for c in tile_cents]
+    if randomise_pa:
+        pa = [random.uniform(0., 360.) for i in range(len(ra))]
+    else:
+        pa = [0.] * len(ra)
+
+    keep = range(len(ra))
+    if any(b is not None for b in [ra_min, ra_max, dec_min, dec_max]):
+        # Any bounds not given are taken to be unbounded
+        if ra_min is None:
+            ra_min = 0.
+        if ra_max is None:
+            ra_max = 360.
+        if dec_min is None:
+            dec_min = -90.
+        if dec_max is None:
+            dec_max = 90.
+        keep = np.flatnonzero(is_within_bounds_array(ra, dec, ra_min, ra_max,
+                                                     dec_min, dec_max))
+
+    tile_list = [tp.TaipanTile(ra[i], dec[i], pa=pa[i]) for i in keep]
 
     return tile_list
 
 
+def generate_adaptive_tiling(candidate_targets, tiling_file,
+                             randomise_seed=True, randomise_pa=False,
+                             ra_min=0.0, ra_max=360.0,
+                             dec_min=-90.0, dec_max=90.0,
+                             threshold=None, jitter=2):
+    """
+    Generate a list of tiles from a coarse Sloane-Harding tiling, refined
+    to follow the density of the candidate targets.
+
+    The coarse tiling is generated by generate_SH_tiling. Each coarse tile
+    centre is then scored by the number of candidate targets within
+    TILE_RADIUS of it:
+
+    - Centres with no candidate targets are dropped.
+    - Where the score is at least threshold, an extra centre is added at
+      the local target density maximum (found by ADAPTIVE_MEAN_SHIFT_STEPS
+      mean-shift steps from the coarse centre), plus jitter centres placed
+      randomly within TILE_RADIUS / 2 of that maximum.
+
+    Extra centres closer than ADAPTIVE_MIN_SEPARATION to any other tile
+    centre, or outside the RA/Dec bounds, are discarded.
+
+    Finally, any candidate target within the bounds which is not within
+    TILE_RADIUS of a tile centre (e.g. in the gaps of a packing file) is
+    covered by a gap centre, placed at the centroid of the uncovered
+    targets within TILE_RADIUS / 2 of it.
+
+    Parameters
+    ----------
+    candidate_targets :
+        The list of science targets (TaipanTarget objects) to be tiled.
+
+    tiling_file :
+        The text file holding the coarse Sloane-Harding tiling (e.g.
+        'ipack.3.2040.txt').
+
+    randomise_seed, randomise_pa :
+        See generate_SH_tiling. randomise_pa also applies to the extra tile
+        centres.
+
+    ra_min, ra_max, dec_min, dec_max :
+        The RA and Dec bounds of the region to be tiled (see
+        is_within_bounds).
+
+    threshold :
+        The number of candidate targets within TILE_RADIUS of a coarse
+        centre at which extra centres are added. Defaults to None, in which
+        case TARGET_PER_TILE is used, i.e. extra centres are added wherever
+        a single tile cannot hold all of the nearby targets.
+
+    jitter :
+        The number of randomly-placed extra centres to add around each
+        density maximum. Defaults to 2.
+
+    Returns
+    -------
+    tile_list :
+        A list of TaipanTiles; the retained coarse tiles, followed by the
+        extra tiles, followed by the gap tiles.
+    """
+    if threshold is None:
+        threshold = tp.TARGET_PER_TILE
+    if threshold <= 0:
+        raise ValueError('threshold must be > 0')
+    jitter = int(jitter)
+    if jitter < 0:
+        raise ValueError('jitter must be >= 0')
+
+    ra_min, ra_max, dec_min, dec_max = compute_bounds(ra_min, ra_max,
+                                                      dec_min, dec_max)
+    coarse_tiles = generate_SH_tiling(tiling_file,
+                                      randomise_seed=randomise_seed,
+                                      randomise_pa=randomise_pa,
+                                      ra_min=ra_min, ra_max=ra_max,
+                                      dec_min=dec_min, dec_max=dec_max)
+    if len(coarse_tiles) == 0 or len(candidate_targets) == 0:
+        return coarse_tiles
+
+    target_posns = np.array([t.usposn for t in candidate_targets])
+    target_tree = cKDTree(target_posns)
+    tile_radius = tp.dist_euclidean(tp.TILE_RADIUS / 3600.)
+    coarse_posns = np.array([tp.polar2cart((t.ra, t.dec))
+                             for t in coarse_tiles])
+    counts = np.array([len(inds) for inds in
+                       target_tree.query_ball_point(coarse_posns,
+                                                    tile_radius)])
+
+    def density_maximum(posn):
+        # Mean-shift towards the centroid of the targets within TILE_RADIUS
+        for step in range(ADAPTIVE_MEAN_SHIFT_STEPS):
+            inds = target_tree.query_ball_point(posn, tile_radius)
+            if len(inds) == 0:
+                break
+            centroid = np.sum(target_posns[inds], axis=0)
+            norm = np.sqrt(np.sum(centroid**2))
+            if norm == 0.:
+                break
+            posn = centroid / norm
+        return posn
+
+    def cart2radec(posn):
+        x, y, z = posn
+        ra = math.degrees(math.atan2(y, x)) % 360.
+        dec = math.degrees(math.acos(max(-1., min(1., z)))) - 90.
+        return ra, dec
+
+    min_separation = tp.dist_euclidean(ADAPTIVE_MIN_SEPARATION / 3600.)
+    coarse_tree = cKDTree(coarse_posns)
+    extra_posns = []
+    extra_tiles = []
+
+    def add_centre(ra, dec):
+        if not is_within_bounds_array(np.array([ra]), np.array([dec]),
+                                      ra_min, ra_max, dec_min, dec_max)[0]:
+            return
+        posn = np.array(tp.polar2cart((ra, dec)))
+        if len(coarse_tree.query_ball_point(posn, min_separation)) > 0:
+            return
+        if len(extra_posns) > 0 and np.min(np.sqrt(np.sum(
+                (np.array(extra_posns) - posn)**2, axis=1))) < min_separation:
+            return
+        extra_posns.append(posn)
+        pa = 0.
+        if randomise_pa:
+            pa = random.uniform(0., 360.)
+        extra_tiles.append(tp.TaipanTile(ra, dec, pa=pa))
+
+    for i in np.flatnonzero(counts >= threshold):
+        ra, dec = cart2radec(density_maximum(coarse_posns[i]))
+        add_centre(ra, dec)
+        for j in range(jitter):
+            add_centre(*tp.compute_offset_posn(
+                ra, dec, random.uniform(0., tp.TILE_RADIUS / 2.),
+                random.uniform(0., 360.)))
+
+    tile_list = [coarse_tiles[i] for i in np.flatnonzero(counts > 0)]
+
+    # Cover any targets the retained and extra centres miss
+    centre_posns = np.concatenate([coarse_posns[counts > 0],
+                                   np.array(extra_posns).reshape(-1, 3)])
+    dists, _ = cKDTree(centre_posns).query(target_posns)
+    uncovered = np.logical_and(
+        dists > tile_radius,
+        is_within_bounds_array(np.array([t.ra for t in candidate_targets]),
+                               np.array([t.dec for t in candidate_targets]),
+                               ra_min, ra_max, dec_min, dec_max))
+    gap_tiles = []
+    for i in np.flatnonzero(uncovered):
+        if not uncovered[i]:
+            continue
+        inds = [j for j in target_tree.query_ball_point(target_posns[i],
+                                                        tile_radius / 2.)
+                if uncovered[j]]
+        centroid = np.sum(target_posns[inds], axis=0)
+        posn = centroid / np.sqrt(np.sum(centroid**2))
+        uncovered[target_tree.query_ball_point(posn, tile_radius)] = False
+        pa = 0.
+        if randomise_pa:
+            pa = random.uniform(0., 360.)
+        gap_tiles.append(tp.TaipanTile(*cart2radec(posn), pa=pa))
+
+    logging.info('Adaptive tiling: %d of %d coarse tiles kept, %d dense, '
+                 '%d extra tiles and %d gap tiles added' %
+                 (len(tile_list), len(coarse_tiles),
+                  np.sum(counts >= threshold), len(extra_tiles),
+                  len(gap_tiles), ))
+    return tile_list + extra_tiles + gap_tiles
+
+
 # -------
 # TILING FUNCTIONS
 # -------
 
-def tiling_consolidate(tile_list):
+def tiling_consolidate(tile_list, report=None):
     """
     Attempt to consolidate a tiling into as few tiles as possible.
 
@@ -243,11 +1431,21 @@ def tiling_consolidate(tile_list):
     'consolidate' a tiling by shifting targets off poorly-complete tiles and
     on to more complete ones.
 
+    Candidate tiles for each target are found from a spatial index of the
+    tile centres, and a map from each science target to the tiles it is
+    assigned to is kept up to date as targets are moved, so checks for
+    duplicate observations do not need to search the whole tiling.
+
     Parameters
     ----------
     tile_list : 
         The list of TaipanTile objects that constitute the tiling.
 
+    report :
+        Optional TilingReport in which to record the time taken (as the
+        'consolidation' stage), and the numbers of targets shifted and tiles
+        removed. Defaults to None.
+
     Returns
     -------
     consolidated_list : 
@@ -257,6 +1455,17 @@ def tiling_consolidate(tile_list):
     """
 
     logging.info('Consolidating tiling...')
+    start = time.time()
+
+    def finish(targets_moved, tiles_removed):
+        logging.info('%d targets shifted, %d tiles removed' %
+                     (targets_moved, tiles_removed, ))
+        if report is not None:
+            report.add_time('consolidation', time.time() - start)
+            report.count('targets_shifted', targets_moved)
+            report.count('tiles_removed', tiles_removed)
+        return consolidated_list
+
     # Strip off any tiles that have no science targets assigned
     tiles_orig = len(tile_list)
     tile_list = [t for t in tile_list if t.count_assigned_targets_science() > 0]
@@ -270,6 +1479,59 @@ def tiling_consolidate(tile_list):
     consolidated_list = [t for t in tile_list 
         if t.count_assigned_fibres() == tp.FIBRES_PER_TILE]
     tile_list = tile_list[len(consolidated_list):]
+    if len(tile_list) == 0:
+        return finish(0, tiles_removed)
+
+    # Tiles are only ever popped from the end of tile_list, so a tile's
+    # index into tile_list is fixed for as long as the tile remains in it.
+    # The tiles still available to receive targets from the current worst
+    # tile are those with index < len(tile_list) - 1
+    tile_tree = cKDTree([tp.polar2cart((t.ra, t.dec)) for t in tile_list])
+    # Pad the search radius slightly, so the exact cut below (as made by
+    # assign_tile) is never affected by rounding in the chord distance
+    search_radius = tp.dist_euclidean(tp.TILE_RADIUS / 3600.) * (1. + 1e-9)
+    # Map of science target -> indices of the tiles it is assigned to
+    tiles_with_target = {}
+    for i, tile in enumerate(tile_list):
+        for t in tile.get_assigned_targets_science():
+            tiles_with_target.setdefault(t, set()).add(i)
+    # Number of empty (non-guide) fibres on each tile; assign_tile cannot
+    # succeed on a tile with none
+    free_fibres = [len([f for f, t in tile.fibres.iteritems()
+                        if t is None and f not in tp.FIBRES_GUIDE])
+                   for tile in tile_list]
+
+    def find_tiles_to_try(targets):
+        # Return, for each target, the indices of the remaining tiles
+        # (excluding the current worst tile) within TILE_RADIUS of the
+        # target, in tile_list order
+        if len(targets) == 0:
+            return []
+        worst = len(tile_list) - 1
+        nearby = tile_tree.query_ball_point(
+            [tp.polar2cart((t.ra, t.dec)) for t in targets], search_radius)
+        return [sorted(i for i in inds if i < worst and target.dist_point(
+                    (tile_list[i].ra, tile_list[i].dec)) < tp.TILE_RADIUS)
+                for target, inds in zip(targets, nearby)]
+
+    def reassign_target(fibre, target, tiles_to_try):
+        # Attempt to move target from fibre on the worst tile to the first
+        # tile in tiles_to_try which will accept it
+        for i in tiles_to_try:
+            if free_fibres[i] == 0:
+                continue
+            targets_returned, removed_target = tile_list[i].assign_tile(
+                [target], check_tile_radius=False,
+                recompute_difficulty=False,
+                overwrite_existing=False,
+                method='priority')
+            if len(targets_returned) == 0:
+                # Target has been re-assigned
+                free_fibres[i] -= 1
+                tiles_with_target.setdefault(target, set()).add(i)
+                tile_list[-1].unassign_fibre(fibre)
+                return True
+        return False
 
     # Step through the tile list, attempting to re-assign targets to the more-
     # complete tiles
@@ -277,77 +1539,48 @@ def tiling_consolidate(tile_list):
     targets_moved = 0
     while len(tile_list) > 0:
         logging.info('Remaining tiles to consolidate: %d' % len(tile_list))
+        worst = len(tile_list) - 1
         
         # Grab the targets out of the lowest-completeness tile. Don't
         # include science targets that are also standards.
         targets_to_redo = tile_list[-1].get_assigned_targets_science(
-            return_dict=True, include_science_standards=False)
+            return_dict=True, include_science_standards=False).items()
         # Try to assign these targets to another, more-complete tile
         # Be sure not to try re-assignment to the current worst tile!
-        for (fibre, target) in targets_to_redo.iteritems():
-            tiles_to_try = [t for t in tile_list[:-1] 
-                if target.dist_point((t.ra, t.dec)) < tp.TILE_RADIUS]
-            target_reassigned = False
-            
-            while len(tiles_to_try) > 0 and target_reassigned == False:
-                # Attempt to assign target to tile
-                targets_returned, removed_targets = tiles_to_try[0].assign_tile(
-                    [target], check_tile_radius=False, 
-                    recompute_difficulty=False,
-                    overwrite_existing=False,
-                    method='priority')
-                if len(targets_returned) == 0:
-                    # Target has been re-assigned
-                    target_reassigned = True
-                    targets_moved += 1
-                    removed_target = tile_list[-1].unassign_fibre(fibre)
-                else:
-                    # Remove the top-ranked candidate tile and go again
-                    removed_tile = tiles_to_try.pop(0)
+        for (fibre, target), tiles_to_try in zip(
+                targets_to_redo,
+                find_tiles_to_try([t for _, t in targets_to_redo])):
+            if reassign_target(fibre, target, tiles_to_try):
+                targets_moved += 1
         
-        # Instead of the duplicate_obs below, we could just look for 
         targets_left = tile_list[-1].get_assigned_targets_science(
             return_dict=True, include_science_standards=False)
         
-        # Only continue for standards if we have no targets left. NB this next piece of
-        # code is mostly cut-and-paste so is bad coding practice!
+        # Only continue for standards if we have no targets left.
         if len(targets_left)==0:
             # Grab the targets out of the lowest-completeness tile. Now only 
             # include science targets that are also standards. Note that for 
             # the Taipan Galaxy survey, this should be an empty dictionary.
             targets_to_redo = tile_list[-1].get_assigned_targets_science(
-                return_dict=True, only_science_standards=True)
+                return_dict=True, only_science_standards=True).items()
             
             # Try to assign these target standards to another, more-complete tile
             # Be sure not to try re-assignment to the current worst tile!
             n_standards_left = len(targets_to_redo)
             print "Starting new loop..." #!!!
-            for (fibre, target) in targets_to_redo.iteritems():
-                tiles_to_try = [t for t in tile_list[:-1] 
-                    if target.dist_point((t.ra, t.dec)) < tp.TILE_RADIUS]
-                target_reassigned = False
-                
+            for (fibre, target), tiles_to_try in zip(
+                    targets_to_redo,
+                    find_tiles_to_try([t for _, t in targets_to_redo])):
                 #If this is a science target already on another tile, don't try to 
                 #re-assign it. 
-                duplicate_standards = [atile for atile in tiles_to_try if \
-                    target in atile.get_assigned_targets_science()]
-                if len(duplicate_standards) > 0:
+                if not tiles_with_target.get(target, set()).isdisjoint(
+                        tiles_to_try):
                     target_reassigned = True
-                while len(tiles_to_try) > 0 and target_reassigned == False:
-                    # Attempt to assign target to tile
-                    targets_returned, removed_targets = tiles_to_try[0].assign_tile(
-                        [target], check_tile_radius=False, 
-                        recompute_difficulty=False,
-                        overwrite_existing=False,
-                        method='priority')
-                    if len(targets_returned) == 0:
-                        # Target has been re-assigned
-                        target_reassigned = True
+                else:
+                    target_reassigned = reassign_target(fibre, target,
+                                                        tiles_to_try)
+                    if target_reassigned:
                         targets_moved += 1
-                        removed_target = tile_list[-1].unassign_fibre(fibre)
-                    else:
-                        # Remove the top-ranked candidate tile and go again
-                        removed_tile = tiles_to_try.pop(0)
                 if target_reassigned:
                     n_standards_left -= 1
                 else:
@@ -360,12 +1593,9 @@ def tiling_consolidate(tile_list):
         # If all unassigned science targets are assigned to another tile, we can 
         # burn this tile. Otherwise, the tile needs to be added to the consolidated_list
         targets_left = tile_list[-1].get_assigned_targets_science()
-        all_reassigned = True
-        for t in targets_left:
-            duplicate_obs = [atile for atile in tile_list[:-1] if t in atile.get_assigned_targets_science()]
-            if len(duplicate_obs)==0:
-                all_reassigned = False
-                break            
+        all_reassigned = all(
+            any(i < worst for i in tiles_with_target.get(t, ()))
+            for t in targets_left)
         if all_reassigned:
             clipped_tile = tile_list.pop(-1)
             tiles_removed += 1
@@ -376,9 +1606,81 @@ def tiling_consolidate(tile_list):
             if n_standards_left == 0:
                 raise UserWarning #Something is wrong!
 
-    logging.info('%d targets shifted, %d tiles removed' % (targets_moved,
-                                                           tiles_removed, ))
-    return consolidated_list
+    return finish(targets_moved, tiles_removed)
+
+
+class _TileOrderScores(object):
+    """
+    The scores used to order the tile sets of generate_tiling_byorder, i.e.
+    the number (density) or total priority (priority) of the remaining
+    candidate targets within each tile.
+
+    The candidate targets are indexed once. The scores of a tile set come
+    from a single query of the index, which also gives the tiles that each
+    target lies within. As targets are assigned, they are marked as used,
+    and the scores of the tiles they lie within are reduced. The scores of a
+    tile set with the same centres as the last one (e.g. an SH tiling which
+    is not randomised) are then carried over, rather than queried again.
+    """
+
+    def __init__(self, candidate_targets, tiling_order):
+        self.index = dict((id(t), i) for i, t in enumerate(candidate_targets))
+        self.tree = cKDTree([t.usposn for t in candidate_targets])
+        if tiling_order == 'density':
+            self.weights = np.ones(len(candidate_targets))
+        else:
+            self.weights = np.asarray([t.priority for t in candidate_targets],
+                                      dtype=float)
+        self.remaining = np.ones(len(candidate_targets), dtype=bool)
+        self.centres = None
+        self.scores = None
+        # The tiles that each target lies within, as a flat array of tile
+        # indices sorted by target, and the offset of each target into it
+        self.target_tiles = None
+        self.target_offsets = None
+
+    def query(self, tiles):
+        """
+        Return the scores of tiles.
+        """
+        centres = [(t.ra, t.dec) for t in tiles]
+        if centres == self.centres:
+            return self.scores.copy()
+        self.centres = centres
+        if len(tiles) == 0:
+            inds = []
+        else:
+            inds = self.tree.query_ball_point(
+                [tp.polar2cart(c) for c in centres],
+                tp.dist_euclidean(tp.TILE_RADIUS / 3600.))
+        lengths = [len(i) for i in inds]
+        flat = np.fromiter((j for i in inds for j in i), dtype=int,
+                           count=sum(lengths))
+        flat_tiles = np.repeat(np.arange(len(tiles)), lengths)
+        keep = self.remaining[flat]
+        flat, flat_tiles = flat[keep], flat_tiles[keep]
+        self.scores = np.bincount(flat_tiles, weights=self.weights[flat],
+                                  minlength=len(tiles))
+        order = np.argsort(flat, kind='mergesort')
+        self.target_tiles = flat_tiles[order]
+        self.target_offsets = np.searchsorted(flat[order],
+                                              np.arange(len(self.weights) + 1))
+        return self.scores.copy()
+
+    def remove_targets(self, targets):
+        """
+        Mark targets as used, and reduce the scores of the tiles of the last
+        tile set which they lie within.
+        """
+        for t in targets:
+            i = self.index.get(id(t))
+            if i is None or not self.remaining[i]:
+                continue
+            self.remaining[i] = False
+            if self.scores is not None:
+                self.scores[self.target_tiles[self.target_offsets[i]:
+                                              self.target_offsets[i + 1]]] \
+                    -= self.weights[i]
 
 
 def generate_tiling_byorder(candidate_targets, standard_targets, guide_targets,
@@ -393,7 +1695,11 @@ def generate_tiling_byorder(candidate_targets, standard_targets, guide_targets,
                             combined_weight=1.0,
                             sequential_ordering=(1,2), rank_supplements=False,
                             repick_after_complete=True,
-                            recompute_difficulty=True):
+                            recompute_difficulty=True,
+                            ncpu=1,
+                            preserve_order=True,
+                            report_file=None,
+                            return_report=False):
     """
     Generate a complete tiling based on a 'by-order' algorithm.
 
@@ -492,6 +1798,26 @@ def generate_tiling_byorder(candidate_targets, standard_targets, guide_targets,
         target assignment. See the documentation for taipan.core for the meaning
         and limits of these values.
 
+    ncpu :
+        The number of worker processes to unpick tiles with. Defaults to 1.
+        If greater than 1, tiles which cannot interact are unpicked
+        concurrently (see unpick_tiles_waves), which requires preserve_order;
+        the tiling is the same as that produced with ncpu=1 and
+        preserve_order=True.
+
+    preserve_order :
+        Boolean value, passed to TaipanTile.unpick_tile, denoting whether to
+        keep the targets considered for each tile in the order of the
+        candidate list (see iter_tiling_greedy). Must be True if ncpu > 1.
+        Defaults to True, so that the tiling doesn't depend on ncpu.
+
+    report_file, return_report :
+        Write a JSON report of the time spent in each stage of the tiling
+        ('tile_generation', 'selection' (ordering the new tiles),
+        'scoring' (dropping empty tiles), 'unpick' and 'consolidation') to
+        report_file, and/or return it. See generate_tiling_greedy. Default
+        to None and False, respectively.
+
     Returns
     -------
     tile_list : 
@@ -505,6 +1831,10 @@ def generate_tiling_byorder(candidate_targets, standard_targets, guide_targets,
     remaining_targets : 
         The list of science TaipanTargets that were not
         assigned during this tiling.
+
+    report :
+        The report of the tiling (see TilingReport.as_dict). Only returned
+        if return_report is True.
     """
 
     TILING_METHODS = [
@@ -535,6 +1865,12 @@ def generate_tiling_byorder(candidate_targets, standard_targets, guide_targets,
     if completeness_target <= 0. or completeness_target > 1:
         raise ValueError('completeness_target must be in the range (0, 1]')
 
+    ncpu = int(ncpu)
+    if ncpu <= 0:
+        raise ValueError('ncpu must be > 0')
+    if ncpu > 1 and not preserve_order:
+        raise ValueError('ncpu > 1 requires preserve_order=True')
+
     # Push the coordinate limits into standard format
     ra_min, ra_max, dec_min, dec_max = compute_bounds(ra_min, ra_max,
         dec_min, dec_max)
@@ -543,6 +1879,7 @@ def generate_tiling_byorder(candidate_targets, standard_targets, guide_targets,
     # the completeness achieved
     no_submitted_targets = len(candidate_targets)
     prior_tiles = []
+    report = TilingReport('generate_tiling_byorder')
 
     # Define helper function to handle randomising PAs if tile generation
     # doesn't already have it built in
@@ -552,123 +1889,858 @@ def generate_tiling_byorder(candidate_targets, standard_targets, guide_targets,
             return pa
         return 0.
 
-    # Do the tiling while completeness is < the target
-    logging.info('Commencing tiling, %d targets...' % no_submitted_targets)
-    while (float(no_submitted_targets - len(candidate_targets)) 
-        / float(no_submitted_targets)) < completeness_target:
-        # Generate the next tile(s) to unpick
-
-        if tiling_method == 'SH':
-            new_tiles = generate_SH_tiling(tiling_file, 
-                randomise_seed=randomise_SH, randomise_pa=randomise_pa)
-        elif tiling_method == 'random':
-            new_tiles = generate_random_tile(ra_min=ra_min, ra_max=ra_max,
-                dec_min=dec_min, dec_max=dec_max, randomise_pa=randomise_pa)
-            # print (new_tiles.ra, new_tiles.dec)
-            new_tiles = [new_tiles]
-        elif tiling_method == 'random-set':
-            new_tiles = [generate_random_tile(ra_min=ra_min, ra_max=ra_max,
-                dec_min=dec_min, dec_max=dec_max, randomise_pa=randomise_pa)
-                for i in range(tiling_set_size)]
-        elif tiling_method == 'random-target':
-            random_tgt = random.choice(candidate_targets)
-            new_tiles = tp.TaipanTile(random_tgt.ra, random_tgt.dec, 
-                pa=gen_pa(randomise_pa))
-            new_tiles = [new_tiles]
-        elif tiling_method == 'random-target-set':
-            new_tiles = []
-            for i in range(tiling_set_size):
-                random_tgt = random.choice(candidate_targets)
-                new_tiles.append(tp.TaipanTile(random_tgt.ra, random_tgt.dec, 
-                    pa=gen_pa(randomise_pa)))
-        elif tiling_method == 'average':
-            new_tiles = tp.TaipanTile(np.average([t.ra 
-                for t in candidate_targets]),
-                np.average([t.dec for t in candidate_targets]), 
-                pa=gen_pa(randomise_pa))
-            new_tiles = [new_tiles]
-
-        if tiling_method in TILING_METHODS_SET:
-            # Trim down to the requested RA/Dec limits
-            # print ra_min, ra_max, dec_min, dec_max
-            # print len(new_tiles)
-            # for t in new_tiles:
-            #   print t.ra, t.dec
-            new_tiles = [t for t in new_tiles 
-                if is_within_bounds(t, ra_min, ra_max, dec_min, dec_max,
-                    compute_bounds_forcoords=True)]
-            # Order the tiles as requested
-            if tiling_order == 'random':
-                random.shuffle(new_tiles)
-            elif tiling_order == 'density':
-                new_tiles.sort(key=lambda x: len(x.available_targets(
-                    candidate_targets)))
-            elif tiling_order == 'priority':
-                new_tiles.sort(key=lambda x: np.sum([t.priority for t
-                    in x.available_targets(candidate_targets)]))
-
-        # We now need to unpick the tile(s) we have just created, using
-        # existing functions
-        targets_before = len(candidate_targets)
-        logging.info('Beginning to tile %d tiles, %d targets...' %
-                     (len(new_tiles), targets_before, ))
-        i = 0
-        for tile in new_tiles:
-            candidate_targets, removed_targets = tile.unpick_tile(
-                candidate_targets, standard_targets, guide_targets,
-                overwrite_existing=False, check_tile_radius=True,
-                method=tile_unpick_method, combined_weight=combined_weight,
-                sequential_ordering=sequential_ordering,
-                rank_supplements=rank_supplements,
-                repick_after_complete=repick_after_complete,
-                recompute_difficulty=recompute_difficulty)
-            i += 1
-            logging.info('Tile %d complete...' % i)
-        print 'Tiling complete!'
-        # If we are using 'random' or 'average' tiling_method, and no targets
-        # have been successfully assigned, switch over to 'random-target' method
-        # and return to the top of the loop
-        if tiling_method in ['random', 'average'] and len(
-            candidate_targets) == targets_before:
-            logging.info('Failure detected in %s mode'
-                         ' - switching to random-target mode' %
-                         (tiling_method, ))
-            tiling_method = 'random-target'
-            continue
-
-        # Combine the new tiles with existing ones
-        prior_tiles += new_tiles
+    # For the density and priority tiling orders, index the candidate
+    # targets once, and keep track of which of them are still to be assigned
+    order_scores = None
+    if tiling_order in ['density', 'priority']:
+        order_scores = _TileOrderScores(candidate_targets, tiling_order)
+
+    # Create a worker pool, if requested
+    pool = None
+    if ncpu > 1:
+        pool = create_unpick_pool(candidate_targets, standard_targets,
+                                  guide_targets, ncpu,
+                                  method=tile_unpick_method,
+                                  combined_weight=combined_weight,
+                                  sequential_ordering=sequential_ordering,
+                                  rank_supplements=rank_supplements,
+                                  repick_after_complete=repick_after_complete,
+                                  recompute_difficulty=recompute_difficulty,
+                                  consider_removed_targets=False,
+                                  preserve_order=True)
 
-        # If using a 'set'/'SH' tiling method, consolidate the tiling
-        if tiling_method in TILING_METHODS_SET:
-            prior_tiles = tiling_consolidate(prior_tiles)
+    # Do the tiling while completeness is < the target
+    with _closing_pool(pool):
+        logging.info('Commencing tiling, %d targets...' % no_submitted_targets)
+        while (float(no_submitted_targets - len(candidate_targets)) 
+            / float(no_submitted_targets)) < completeness_target:
+            # Generate the next tile(s) to unpick
+
+            with report.stage('tile_generation'):
+                if tiling_method == 'SH':
+                    new_tiles = generate_SH_tiling(tiling_file, 
+                        randomise_seed=randomise_SH, randomise_pa=randomise_pa,
+                        ra_min=ra_min, ra_max=ra_max, dec_min=dec_min,
+                        dec_max=dec_max)
+                elif tiling_method == 'random':
+                    new_tiles = generate_random_tile(ra_min=ra_min, ra_max=ra_max,
+                        dec_min=dec_min, dec_max=dec_max, randomise_pa=randomise_pa)
+                    # print (new_tiles.ra, new_tiles.dec)
+                    new_tiles = [new_tiles]
+                elif tiling_method == 'random-set':
+                    new_tiles = [generate_random_tile(ra_min=ra_min, ra_max=ra_max,
+                        dec_min=dec_min, dec_max=dec_max, randomise_pa=randomise_pa)
+                        for i in range(tiling_set_size)]
+                elif tiling_method == 'random-target':
+                    random_tgt = random.choice(candidate_targets)
+                    new_tiles = tp.TaipanTile(random_tgt.ra, random_tgt.dec, 
+                        pa=gen_pa(randomise_pa))
+                    new_tiles = [new_tiles]
+                elif tiling_method == 'random-target-set':
+                    new_tiles = []
+                    for i in range(tiling_set_size):
+                        random_tgt = random.choice(candidate_targets)
+                        new_tiles.append(tp.TaipanTile(random_tgt.ra, random_tgt.dec, 
+                            pa=gen_pa(randomise_pa)))
+                elif tiling_method == 'average':
+                    new_tiles = tp.TaipanTile(np.average([t.ra 
+                        for t in candidate_targets]),
+                        np.average([t.dec for t in candidate_targets]), 
+                        pa=gen_pa(randomise_pa))
+                    new_tiles = [new_tiles]
+
+            if tiling_method in TILING_METHODS_SET:
+                # Trim down to the requested RA/Dec limits (SH tilings are
+                # trimmed as they are generated)
+                # print ra_min, ra_max, dec_min, dec_max
+                # print len(new_tiles)
+                # for t in new_tiles:
+                #   print t.ra, t.dec
+                if tiling_method != 'SH':
+                    new_tiles = [t for t in new_tiles 
+                        if is_within_bounds(t, ra_min, ra_max, dec_min, dec_max,
+                            compute_bounds_forcoords=True)]
+                # Order the tiles as requested
+                with report.stage('selection'):
+                    if tiling_order == 'random':
+                        random.shuffle(new_tiles)
+                    else:
+                        scores = order_scores.query(new_tiles)
+                        new_tiles = [new_tiles[i] for i in
+                                     sorted(range(len(new_tiles)),
+                                            key=lambda i: scores[i])]
+
+            # Drop any tiles which have a score bound of zero (i.e. no candidate
+            # targets in range) - unpicking them would not assign any targets,
+            # and they would be discarded during consolidation anyway
+            with report.stage('scoring'):
+                new_tiles = [tile for tile, cands in zip(new_tiles,
+                    tp.targets_in_range_tiles(new_tiles, candidate_targets))
+                    if tile.calculate_tile_score_bound(cands,
+                        check_tile_radius=False) > 0.]
+
+            # We now need to unpick the tile(s) we have just created, using
+            # existing functions
+            targets_before = len(candidate_targets)
+            logging.info('Beginning to tile %d tiles, %d targets...' %
+                         (len(new_tiles), targets_before, ))
+            with report.stage('unpick'):
+                if pool is not None:
+                    candidate_targets = unpick_tiles_waves(
+                        pool, [[tile] for tile in new_tiles], candidate_targets)
+                else:
+                    i = 0
+                    for tile in new_tiles:
+                        candidate_targets, removed_targets = tile.unpick_tile(
+                            candidate_targets, standard_targets, guide_targets,
+                            overwrite_existing=False, check_tile_radius=True,
+                            method=tile_unpick_method,
+                            combined_weight=combined_weight,
+                            sequential_ordering=sequential_ordering,
+                            rank_supplements=rank_supplements,
+                            repick_after_complete=repick_after_complete,
+                            recompute_difficulty=recompute_difficulty,
+                            consider_removed_targets=False,
+                            preserve_order=preserve_order)
+                        i += 1
+                        logging.info('Tile %d complete...' % i)
+            if order_scores is not None:
+                with report.stage('selection'):
+                    order_scores.remove_targets(
+                        [t for tile in new_tiles
+                         for t in tile.get_assigned_targets_science()])
+            print 'Tiling complete!'
+            # If we are using 'random' or 'average' tiling_method, and no targets
+            # have been successfully assigned, switch over to 'random-target' method
+            # and return to the top of the loop
+            if tiling_method in ['random', 'average'] and len(
+                candidate_targets) == targets_before:
+                logging.info('Failure detected in %s mode'
+                             ' - switching to random-target mode' %
+                             (tiling_method, ))
+                tiling_method = 'random-target'
+                continue
+
+            # Combine the new tiles with existing ones
+            prior_tiles += new_tiles
+
+            # If using a 'set'/'SH' tiling method, consolidate the tiling
+            if tiling_method in TILING_METHODS_SET:
+                prior_tiles = tiling_consolidate(prior_tiles, report=report)
 
     if tiling_method not in TILING_METHODS_SET:
-        prior_tiles = tiling_consolidate(prior_tiles)
+        prior_tiles = tiling_consolidate(prior_tiles, report=report)
 
     # Return the tiling, the completeness factor and the remaining targets
     final_completeness = float(no_submitted_targets 
         - len(candidate_targets)) / float(no_submitted_targets)
 
-    return prior_tiles, final_completeness, candidate_targets
+    report.result.update([('tiles', len(prior_tiles)),
+                          ('completeness', final_completeness),
+                          ('remaining_targets', len(candidate_targets))])
+    return _finish_report(report, report_file, return_report,
+                          (prior_tiles, final_completeness, candidate_targets))
 
 
-def generate_tiling_greedy(candidate_targets, standard_targets, guide_targets,
-                           completeness_target=1.0,
-                           ranking_method='completeness',
-                           tiles=None,
-                           disqualify_below_min=True,
-                           tiling_method='SH', randomise_pa=True,
-                           randomise_SH=True, tiling_file='ipack.3.8192.txt',
-                           ra_min=0.0, ra_max=360.0, dec_min=-90.0,
-                           dec_max=90.0,
-                           tiling_set_size=1000,
-                           tile_unpick_method='sequential', combined_weight=1.0,
-                           sequential_ordering=(1,2), rank_supplements=False,
-                           repick_after_complete=True,
-                           recompute_difficulty=True):
+class _TileSelector(object):
     """
-    Generate a tiling based on the greedy algorithm.
+    The greedy selection of tiles from a set of candidate tiles.
+
+    The selector holds the candidate tiles, their rankings, and an index of
+    which candidate tiles hold each science target. Each call to
+    select_tiles removes the highest-ranked tile(s), replaces them with new
+    tiles at the same positions, and updates the candidate tiles affected by
+    the selection. iter_tiling_greedy uses one selector for the whole
+    tiling, and iter_tiling_funnelweb one for each magnitude range.
+
+    The rankings are kept in a max-heap. A tile whose score may be out of
+    date is marked as stale, and ranked by an upper bound on its score (see
+    TaipanTile.calculate_tile_score_bound). Stale tiles are only re-unpicked
+    (if need be) and re-scored once they reach the top of the heap, until a
+    tile with an up-to-date score is on top. With the 'exhaustive'
+    selection engine, the affected tiles are instead re-picked, and all of
+    the tiles re-scored, straight after each selection.
+
+    candidate_tiles and candidate_targets are used in place. The tiles are
+    unpicked against candidate_targets, from which the caller removes the
+    targets assigned to each selected tile (see select_tiles).
+    unpick_kwargs are the options passed to TaipanTile.unpick_tile, and
+    difficulty_radius the distance from each selected tile within which
+    target difficulties are re-computed. The other arguments are as for
+    iter_tiling_greedy.
+
+    For each candidate tile, ranking_list holds its ranking, tile_unpicked
+    whether it holds a complete unpick against the current candidates,
+    tile_stale whether its ranking is a bound rather than its score, and
+    tile_refill whether it holds a partial unpick (with the fibres of
+    targets assigned elsewhere emptied) to be refilled by
+    TaipanTile.reunpick_tile, rather than being unpicked from scratch.
+    """
+
+    def __init__(self, candidate_tiles, candidate_targets, standard_targets,
+                 guide_targets, unpick_kwargs, ranking_method,
+                 disqualify_below_min, randomise_pa, recompute_difficulty,
+                 difficulty_radius, reunpick_method, defer_unpicks,
+                 selection_engine, ncpu, counters, report):
+        self.candidate_tiles = candidate_tiles
+        self.candidate_targets = candidate_targets
+        self.standard_targets = standard_targets
+        self.guide_targets = guide_targets
+        self.unpick_kwargs = unpick_kwargs
+        # reunpick_tile takes the same options, less those it fixes itself
+        self.reunpick_kwargs = dict(
+            (k, v) for k, v in unpick_kwargs.iteritems()
+            if k not in ['recompute_difficulty', 'consider_removed_targets'])
+        self.ranking_method = ranking_method
+        self.disqualify_below_min = disqualify_below_min
+        self.randomise_pa = randomise_pa
+        self.recompute_difficulty = recompute_difficulty
+        self.difficulty_radius = difficulty_radius
+        self.reunpick_method = reunpick_method
+        self.defer_unpicks = defer_unpicks
+        self.selection_engine = selection_engine
+        self.difficulty_ranking = ranking_method.split('-')[0] in [
+            'difficulty', 'combined']
+        self.counters = counters
+        self.report = report
+        self.ranking_list = []
+        self.tile_unpicked = []
+        self.tile_stale = []
+        self.tile_refill = []
+        # Index of which candidate tiles currently hold each science target
+        self.target_tiles = {}
+        # The heap holds (-1 * ranking, order, version, tile) entries. The
+        # order of a tile is its order in candidate_tiles, so ties go to the
+        # first tile, as for np.argmax. An entry is out of date if the
+        # tile's version has changed since it was pushed
+        self._heap = []
+        self._order = {}
+        self._version = {}
+        self._position = {}
+        self._next_order = 0
+        # The candidate tiles always sit at the same positions (a selected
+        # tile is replaced at its own position), so the positions are held
+        # in a fixed KD-tree. Each tile holds the slot of its position
+        self._slot = dict((t, s) for s, t in enumerate(candidate_tiles))
+        self._slot_tiles = candidate_tiles[:]
+        self._slot_tree = None
+        self._slot_neighbours = None
+        # For the 'check' engine, the unpicks the exhaustive engine would
+        # hold for each candidate tile (see update_shadow_tiles)
+        self._shadow_tiles = {}
+        if len(candidate_tiles) > 0:
+            self._slot_tree = cKDTree([tp.polar2cart((t.ra, t.dec))
+                                       for t in candidate_tiles])
+
+        # Create a persistent worker pool for the tile unpicks, if requested.
+        # The workers are given the full candidate list now; as targets are
+        # assigned, the remaining candidates are sent with each task. The
+        # caller shuts the pool down (see _closing_pool)
+        self.pool = None
+        if ncpu > 1 and not defer_unpicks:
+            self.pool = create_unpick_pool(candidate_targets,
+                                           standard_targets, guide_targets,
+                                           ncpu, **unpick_kwargs)
+
+    def unpick(self, tile):
+        burn = tile.unpick_tile(self.candidate_targets, self.standard_targets,
+                                self.guide_targets, overwrite_existing=True,
+                                **self.unpick_kwargs)
+        index_tile_targets(self.target_tiles, tile)
+        return burn
+
+    def reunpick(self, tile, removed_targets):
+        unindex_tile_targets(self.target_tiles, tile)
+        burn = tile.reunpick_tile(removed_targets, self.candidate_targets,
+                                  self.standard_targets, self.guide_targets,
+                                  **self.reunpick_kwargs)
+        index_tile_targets(self.target_tiles, tile)
+        return burn
+
+    def unpick_on_pool(self, tiles):
+        # Any difficulty changes made by each unpick are seen by the unpicks
+        # of nearby tiles after it, as for a serial unpick
+        burn = unpick_tiles_waves(self.pool, [[tile] for tile in tiles],
+                                  self.candidate_targets,
+                                  overwrite_existing=True,
+                                  repeat_targets=True)
+        for tile in tiles:
+            index_tile_targets(self.target_tiles, tile)
+
+    def score_bounds(self, tiles):
+        return [tile.calculate_tile_score_bound(
+                    cands, stds, method=self.ranking_method,
+                    check_tile_radius=False)
+                for tile, cands, stds in zip(
+                    tiles,
+                    tp.targets_in_range_tiles(tiles, self.candidate_targets),
+                    tp.targets_in_range_tiles(tiles, self.standard_targets))]
+
+    def score_tile(self, tile):
+        self.counters['score_evaluations'] += 1
+        with self.report.stage('scoring'):
+            return tile.calculate_tile_score(
+                method=self.ranking_method,
+                disqualify_below_min=self.disqualify_below_min)
+
+    def set_ranking(self, k, ranking):
+        # Set the ranking of candidate tile k, and push it onto the heap
+        tile = self.candidate_tiles[k]
+        self.ranking_list[k] = ranking
+        self._version[tile] += 1
+        heapq.heappush(self._heap, (-1 * ranking, self._order[tile],
+                                    self._version[tile], tile))
+
+    def rebuild_heap(self):
+        # Re-build the heap, and the position of each tile in
+        # candidate_tiles, from ranking_list
+        for tile in self.candidate_tiles:
+            if tile not in self._order:
+                self._order[tile] = self._next_order
+                self._next_order += 1
+        self._position = dict((t, k) for k, t in
+                              enumerate(self.candidate_tiles))
+        self._version = dict((t, 0) for t in self.candidate_tiles)
+        self._heap = [(-1 * r, self._order[t], 0, t) for t, r in
+                      zip(self.candidate_tiles, self.ranking_list)]
+        heapq.heapify(self._heap)
+
+    def tiles_near(self, positions, dist):
+        # Indices of the candidate tiles within dist of any of the (ra, dec)
+        # positions
+        if self._slot_tree is None:
+            return []
+        slots = set()
+        for inds in self._slot_tree.query_ball_point(
+                [tp.polar2cart(posn) for posn in positions],
+                tp.dist_euclidean(dist / 3600.)):
+            slots.update(inds)
+        return sorted(self._position[self._slot_tiles[s]] for s in slots)
+
+    def refresh_tile(self, k, unpicked=False):
+        # Bring the unpick and score of candidate tile k up to date. If
+        # unpicked, the tile has already been unpicked (see unpick_stale_top)
+        tile = self.candidate_tiles[k]
+        if not self.tile_unpicked[k]:
+            if not unpicked:
+                with self.report.stage('re_unpick'):
+                    if self.tile_refill[k]:
+                        burn = self.reunpick(tile, [])
+                    else:
+                        burn = self.unpick(tile)
+            self.tile_unpicked[k] = True
+            self.tile_refill[k] = False
+            if self.difficulty_ranking and self.selection_engine != \
+                    'exhaustive':
+                # Unpicking may change the difficulties of the targets
+                # around the tile (see TaipanTile.assign_tile), so re-score
+                # the up-to-date tiles which may hold them
+                for n in self.tiles_near([(tile.ra, tile.dec)],
+                                         TILE_INTERACTION_RADIUS):
+                    if n != k and not self.tile_stale[n]:
+                        self.set_ranking(n, self.score_tile(
+                            self.candidate_tiles[n]))
+        self.tile_stale[k] = False
+        self.set_ranking(k, self.score_tile(tile))
+
+    def unpick_stale_top(self):
+        """
+        Take the stale tiles ranked above the best up-to-date tile off the
+        heap, and refresh them, unpicking them together on the pool. Tiles
+        which need refilling (see reunpick_method) are refreshed in this
+        process.
+        """
+        stale = []
+        while len(self._heap) > 0:
+            negative_ranking, order, version, tile = self._heap[0]
+            if self._version.get(tile) != version:
+                # Out-of-date entry
+                burn = heapq.heappop(self._heap)
+                continue
+            k = self._position[tile]
+            if not self.tile_stale[k]:
+                break
+            burn = heapq.heappop(self._heap)
+            stale.append(k)
+        # The unpicks are made with recompute_difficulty=False, so unpicking
+        # tiles the serial algorithm would not have reached yet does not
+        # change the scores of the others
+        to_unpick = [k for k in stale
+                     if not self.tile_unpicked[k] and not self.tile_refill[k]]
+        if len(to_unpick) > 0:
+            with self.report.stage('re_unpick'):
+                self.unpick_on_pool([self.candidate_tiles[k]
+                                     for k in to_unpick])
+        to_unpick = set(to_unpick)
+        for k in stale:
+            self.refresh_tile(k, unpicked=k in to_unpick)
+
+    def resolve_best_tile(self):
+        """
+        Refresh the stale tiles at the top of the heap, until the top tile
+        is up to date. Returns the index of that tile in candidate_tiles.
+        """
+        if self.pool is not None:
+            self.unpick_stale_top()
+        while True:
+            negative_ranking, order, version, tile = self._heap[0]
+            if self._version.get(tile) != version:
+                # Out-of-date entry
+                burn = heapq.heappop(self._heap)
+                continue
+            k = self._position[tile]
+            if not self.tile_stale[k]:
+                return k
+            burn = heapq.heappop(self._heap)
+            self.refresh_tile(k)
+
+    def mark_stale(self, inds):
+        """
+        Mark candidate tiles as stale, ranking them by an upper bound on
+        their score.
+        """
+        for k, bound in zip(inds, self.score_bounds(
+                [self.candidate_tiles[k] for k in inds])):
+            self.tile_stale[k] = True
+            self.set_ranking(k, bound)
+
+    def initial_unpick(self):
+        """
+        Unpick all of the candidate tiles (or, if defer_unpicks, bound their
+        scores), and compute their initial rankings.
+        """
+        n_tiles = len(self.candidate_tiles)
+        self.tile_refill[:] = [False] * n_tiles
+        # Note that we are *not* updating candidate_targets during this
+        # process, as overlap is allowed - instead, we will need to manually
+        # update candidate_tiles once we pick the highest-ranked tile
+        with self.report.stage('initial_unpick'):
+            if self.defer_unpicks:
+                logging.info('Computing initial tile score bounds...')
+                self.ranking_list[:] = self.score_bounds(self.candidate_tiles)
+                self.tile_unpicked[:] = [False] * n_tiles
+                self.tile_stale[:] = [True] * n_tiles
+                self.rebuild_heap()
+                self.resolve_best_tile()
+                return
+            if self.pool is not None:
+                self.unpick_on_pool(self.candidate_tiles)
+            else:
+                for i, tile in enumerate(self.candidate_tiles):
+                    burn = self.unpick(tile)
+                    logging.info('Created %d / %d tiles' % (i + 1, n_tiles))
+        # Compute initial rankings for all of the tiles
+        self.ranking_list[:] = [self.score_tile(tile)
+                                for tile in self.candidate_tiles]
+        self.tile_unpicked[:] = [True] * n_tiles
+        self.tile_stale[:] = [False] * n_tiles
+        self.rebuild_heap()
+
+    def restore(self, state):
+        """
+        Restore the rankings of the candidate tiles from the ranking_list,
+        tile_unpicked, tile_stale and tile_refill entries of a checkpoint.
+        The candidate tiles must already hold their (partial) unpicks.
+        """
+        for name in ['ranking_list', 'tile_unpicked', 'tile_stale',
+                     'tile_refill']:
+            getattr(self, name)[:] = state[name]
+        for tile, unpicked, refill in zip(self.candidate_tiles,
+                                          self.tile_unpicked,
+                                          self.tile_refill):
+            if unpicked or refill:
+                index_tile_targets(self.target_tiles, tile)
+        self.rebuild_heap()
+
+    def select_tile_batch(self, targets_needed):
+        # Select a set of tiles which cannot interact with each other. Each
+        # tile must be up to date, and be the highest-ranked of all the tiles
+        # it could interact with, so selecting it commutes with selecting the
+        # other tiles in the batch. The tiles are taken off the heap in
+        # ranking order; stale tiles are refreshed when they are reached
+        # before the first tile of the batch (as in resolve_best_tile), and
+        # after that only when their score bound would block a tile. Stop
+        # adding tiles once the batch would assign targets_needed targets
+        if self._slot_neighbours is None:
+            # The tiles which could interact with the tile in each slot
+            # (including itself); fixed, as the tile positions are
+            self._slot_neighbours = self._slot_tree.query_ball_point(
+                self._slot_tree.data,
+                tp.dist_euclidean(TILE_INTERACTION_RADIUS / 3600.))
+        ranking_list = self.ranking_list
+        if self.pool is not None and len(self._heap) > 0:
+            # Unpick the stale tiles at the top of the heap together
+            burn = self.resolve_best_tile()
+        batch = []
+        blocked = set()
+        # The up-to-date entries taken off the heap, to be put back
+        taken = []
+        while len(self._heap) > 0 and targets_needed > 0:
+            entry = heapq.heappop(self._heap)
+            negative_ranking, order, version, tile = entry
+            if self._version.get(tile) != version:
+                # Out-of-date entry
+                continue
+            k = self._position[tile]
+            if self.tile_stale[k]:
+                if len(batch) == 0:
+                    self.refresh_tile(k)
+                else:
+                    # Only refreshed if its bound blocks a tile below
+                    taken.append(entry)
+                continue
+            taken.append(entry)
+            if -1 * negative_ranking <= 0.05:
+                break
+            if k in blocked:
+                continue
+            neighbours = [self._position[self._slot_tiles[s]]
+                          for s in self._slot_neighbours[self._slot[tile]]]
+
+            def outranks(n):
+                return (ranking_list[n],
+                        -1 * self._order[self.candidate_tiles[n]]) > \
+                    (ranking_list[k], -1 * order)
+
+            # Go through the neighbours which outrank this tile, best first.
+            # Stale ones are refreshed, as their bound may be beaten; an
+            # up-to-date one blocks this tile
+            beaten = False
+            for n in sorted([n for n in neighbours if outranks(n)],
+                            key=lambda x: -1 * ranking_list[x]):
+                if self.tile_stale[n]:
+                    self.refresh_tile(n)
+                if outranks(n):
+                    beaten = True
+                    break
+            if self._version[tile] != version:
+                # Refreshing the neighbours has re-scored this tile; it will
+                # be reached again in its new place
+                continue
+            if not beaten:
+                batch.append(k)
+                blocked.update(neighbours)
+                targets_needed -= self.candidate_tiles[
+                    k].count_assigned_targets_science()
+        for entry in taken:
+            heapq.heappush(self._heap, entry)
+        return batch
+
+    def select_tiles(self, remove_targets, targets_needed=None):
+        """
+        Select the highest-ranked candidate tile or, if targets_needed is
+        given, a batch of non-interacting tiles assigning up to
+        targets_needed targets (see iter_tiling_greedy, batch_selection).
+
+        remove_targets is called with the list of science targets assigned
+        to each selected tile, and must remove them from candidate_targets.
+        The selected tiles are replaced, and the candidate tiles affected by
+        the selection updated.
+
+        Returns the list of selected tiles.
+        """
+        candidate_tiles = self.candidate_tiles
+        ranking_list = self.ranking_list
+        lists = [ranking_list, self.tile_unpicked, self.tile_stale,
+                 self.tile_refill]
+        lazy = self.selection_engine != 'exhaustive'
+        score_evaluations = self.counters['score_evaluations']
+
+        # Find the highest-ranked tile(s) in the candidates_list, and remove
+        # them
+        with self.report.stage('selection'):
+            if targets_needed is not None:
+                batch = self.select_tile_batch(targets_needed)
+            else:
+                batch = [self.resolve_best_tile()]
+            batch_tiles = [candidate_tiles[k] for k in batch]
+            batch_rankings = [ranking_list[k] for k in batch]
+            for k in sorted(batch, reverse=True):
+                burn = candidate_tiles.pop(k)
+                for l in lists:
+                    burn = l.pop(k)
+        for tile in batch_tiles:
+            del self._version[tile]
+        assigned_targets = []
+        batch_positions = []
+        for best_tile, best_ranking in zip(batch_tiles, batch_rankings):
+            logging.debug('Tile selected!')
+            # Record the ra and dec of the candidate for tile re-creation
+            best_ra = best_tile.ra
+            best_dec = best_tile.dec
+
+            # Strip the now-assigned targets out of the candidate_targets list,
+            # then recalculate difficulties for affected remaning targets
+            logging.debug('Re-computing target list...')
+            tile_targets = best_tile.get_assigned_targets_science()
+            with self.report.stage('target_removal'):
+                remove_targets(tile_targets)
+            if self.recompute_difficulty:
+                logging.info('Re-computing target difficulties...')
+                with self.report.stage('difficulty_recompute'):
+                    tp.compute_target_difficulties(tp.targets_in_range(
+                        best_ra, best_dec, self.candidate_targets,
+                        self.difficulty_radius))
+
+            # Replace the removed tile in candidate_tiles; it will be picked
+            # along with the affected tiles below
+            pa = 0.
+            if self.randomise_pa:
+                pa = random.uniform(0., 360.)
+            tile = tp.TaipanTile(best_ra, best_dec, pa=pa)
+            candidate_tiles.append(tile)
+            for l, value in zip(lists, [0., True, False, False]):
+                l.append(value)
+            self._order[tile] = self._next_order
+            self._next_order += 1
+            self._version[tile] = 0
+            self._slot[tile] = self._slot.pop(best_tile)
+            self._slot_tiles[self._slot[tile]] = tile
+
+            assigned_targets += tile_targets
+            batch_positions.append((best_ra, best_dec))
+            logging.info('Tile has ranking score %3.1f' % (best_ranking, ))
+            logging.info('Assigned tile at %3.1f, %2.1f' % (best_ra, best_dec))
+            logging.info('%d targets, %d standards, %d guides' %
+                         (best_tile.count_assigned_targets_science(),
+                          best_tile.count_assigned_targets_standard(),
+                          best_tile.count_assigned_targets_guide(), ))
+        self._position = dict((t, k) for k, t in enumerate(candidate_tiles))
+        new_inds = range(len(candidate_tiles) - len(batch_tiles),
+                         len(candidate_tiles))
+
+        with self.report.stage('re_unpick'):
+            affected_tiles = set()
+            for t in assigned_targets:
+                affected_tiles |= self.target_tiles.pop(t.idn, set())
+            # (the selected tiles are still in the index)
+            affected_inds = sorted(self._position[t] for t in affected_tiles
+                                   if t in self._position)
+            assigned_targets_set = set(assigned_targets)
+            # Work out which other tiles may have had their score changed by
+            # the difficulty re-computation
+            if self.recompute_difficulty and self.difficulty_ranking:
+                difficulty_inds = self.tiles_near(
+                    batch_positions, self.difficulty_radius + tp.TILE_RADIUS)
+            else:
+                difficulty_inds = []
+            if self.selection_engine == 'check':
+                self.update_shadow_tiles(batch_tiles, new_inds,
+                                         assigned_targets_set)
+
+            if lazy:
+                # Leave the affected tiles to be re-unpicked, and the tiles
+                # holding targets with re-computed difficulties to be
+                # re-scored, when they reach the top of the heap
+                for k in affected_inds:
+                    tile = candidate_tiles[k]
+                    if self.reunpick_method == 'delta':
+                        # Empty the fibres of the assigned targets now, so
+                        # the tile is found again if its other targets are
+                        # assigned before it is refilled
+                        unindex_tile_targets(self.target_tiles, tile)
+                        burn = tile.remove_duplicates(assigned_targets_set)
+                        index_tile_targets(self.target_tiles, tile)
+                        self.tile_refill[k] = True
+                    else:
+                        unindex_tile_targets(self.target_tiles, tile)
+                    self.tile_unpicked[k] = False
+                for k in new_inds:
+                    self.tile_unpicked[k] = False
+                self.mark_stale(sorted(set(affected_inds) | set(new_inds) |
+                                       set(difficulty_inds)))
+            else:
+                # The new tile(s) are re-picked along with the affected tiles
+                affected_inds += new_inds
+                affected_tiles = [candidate_tiles[k] for k in affected_inds]
+                for tile in affected_tiles:
+                    unindex_tile_targets(self.target_tiles, tile)
+                if self.defer_unpicks:
+                    # Rather than re-picking the affected tiles, bound their
+                    # scores and leave them to be unpicked if they come into
+                    # contention. The bounds on other deferred tiles remain
+                    # valid, as removing targets can only reduce them
+                    # (difficulties aside)
+                    for k in affected_inds:
+                        self.tile_unpicked[k] = False
+                    self.mark_stale(sorted(set(affected_inds) | set(
+                        [k for k in difficulty_inds
+                         if not self.tile_unpicked[k]])))
+                    affected_tiles = []
+                if self.pool is not None and self.reunpick_method == 'full':
+                    # Re-pick the affected tiles in parallel
+                    self.unpick_on_pool(affected_tiles)
+                    affected_tiles = []
+                logging.info('Re-picking affected tiles...')
+                for j, tile in enumerate(affected_tiles):
+                    if self.reunpick_method == 'delta':
+                        burn = self.reunpick(tile, assigned_targets_set)
+                    else:
+                        burn = self.unpick(tile)
+                    logging.info('Completed %d / %d' %
+                                 (j + 1, len(affected_tiles)))
+
+        if not lazy:
+            # Re-score every candidate tile
+            for k, tile in enumerate(candidate_tiles):
+                if self.tile_unpicked[k]:
+                    ranking_list[k] = self.score_tile(tile)
+            self.rebuild_heap()
+        best = self.resolve_best_tile()
+        if self.selection_engine == 'check':
+            self.check_selection(best)
+        # An exhaustive engine would have scored every candidate tile
+        self.counters['score_evaluations_avoided'] += (
+            len(candidate_tiles) - (self.counters['score_evaluations'] -
+                                    score_evaluations))
+
+        return batch_tiles
+
+    def shadow_unpick(self, tile, refill, removed_targets):
+        # Return a clone of tile, unpicked against the current candidates
+        tile = tile.clone()
+        if refill:
+            burn = tile.reunpick_tile(
+                removed_targets, self.candidate_targets,
+                self.standard_targets, self.guide_targets,
+                **self.reunpick_kwargs)
+        else:
+            burn = tile.unpick_tile(
+                self.candidate_targets, self.standard_targets,
+                self.guide_targets, overwrite_existing=True,
+                **self.unpick_kwargs)
+        return tile
+
+    def update_shadow_tiles(self, selected_tiles, new_inds, removed_targets):
+        """
+        For the 'check' selection engine, bring the shadow copies of the
+        candidate tiles up to date with a selection, as the exhaustive
+        engine would: the shadows holding any of removed_targets, and those
+        of the replacement tiles new_inds, are re-unpicked straight away.
+        The selector itself is left as it was.
+        """
+        for tile in selected_tiles:
+            burn = self._shadow_tiles.pop(tile, None)
+        # The selector's index of targets to tiles doesn't cover the stale
+        # tiles, so look for the affected shadows directly
+        inds = [k for k, tile in enumerate(self.candidate_tiles)
+                if tile in self._shadow_tiles and
+                not removed_targets.isdisjoint(
+                    self._shadow_tiles[tile].get_assigned_targets_science())]
+        inds += [k for k in new_inds if k not in inds]
+        # Unpicking may change the target difficulties (see refresh_tile),
+        # so put them back afterwards
+        difficulties = [t.difficulty for t in self.candidate_targets]
+        for k in inds:
+            tile = self.candidate_tiles[k]
+            if self.defer_unpicks:
+                burn = self._shadow_tiles.pop(tile, None)
+                continue
+            self._shadow_tiles[tile] = self.shadow_unpick(
+                self._shadow_tiles.get(tile, tile),
+                self.reunpick_method == 'delta', removed_targets)
+        for t, difficulty in zip(self.candidate_targets, difficulties):
+            t.difficulty = difficulty
+
+    def check_selection(self, best):
+        """
+        Check the tile chosen by the lazy engine, candidate tile best,
+        against the tile the exhaustive engine would choose, i.e. the
+        highest-ranked of the shadow tiles (see update_shadow_tiles). The
+        selections differ if that is a different tile, or if the two hold
+        different targets. Tiles without a shadow (those not yet unpicked,
+        if defer_unpicks) are unpicked now.
+        """
+        difficulties = [t.difficulty for t in self.candidate_targets]
+        for k, tile in enumerate(self.candidate_tiles):
+            if tile not in self._shadow_tiles:
+                if self.tile_unpicked[k]:
+                    self._shadow_tiles[tile] = tile.clone()
+                else:
+                    self._shadow_tiles[tile] = self.shadow_unpick(
+                        tile, self.tile_refill[k], [])
+        for t, difficulty in zip(self.candidate_targets, difficulties):
+            t.difficulty = difficulty
+        exhaustive_list = [self._shadow_tiles[tile].calculate_tile_score(
+            method=self.ranking_method,
+            disqualify_below_min=self.disqualify_below_min)
+            for tile in self.candidate_tiles]
+
+        exhaustive_best = int(np.argmax(exhaustive_list))
+        if exhaustive_best != best:
+            self.counters['selection_mismatches'] += 1
+            logging.warning('### WARNING: lazy selection engine selected '
+                            'a tile with exhaustive score %3.1f; the '
+                            'exhaustive engine would select one with score '
+                            '%3.1f' % (exhaustive_list[best],
+                                       exhaustive_list[exhaustive_best]))
+        elif self.candidate_tiles[best].fibres != \
+                self._shadow_tiles[self.candidate_tiles[best]].fibres:
+            self.counters['selection_mismatches'] += 1
+            logging.warning('### WARNING: lazy selection engine selected '
+                            'the same tile as the exhaustive engine would, '
+                            'but with different fibre assignments')
+
+    def relax_requirements(self, rescore=True):
+        """
+        If no legal tiles remain, stop disqualifying tiles without the
+        minimum numbers of guides and standards (see
+        TaipanTile.calculate_tile_score), and re-score the candidate tiles
+        unless rescore is False.
+        """
+        # If the max of the ranking_list is now 0, try switching off
+        # the disqualify flag
+        if max(self.ranking_list) < 0.05 and self.disqualify_below_min:
+            logging.info('Detected no remaining legal tiles - '
+                         'relaxing requirements')
+            self.disqualify_below_min = False
+            if rescore:
+                # The score bounds of stale tiles ignore the requirements
+                for k, tile in enumerate(self.candidate_tiles):
+                    if self.tile_unpicked[k]:
+                        self.ranking_list[k] = self.score_tile(tile)
+                        self.tile_stale[k] = False
+                self.rebuild_heap()
+            burn = self.resolve_best_tile()
+
+
+def iter_tiling_greedy(candidate_targets, standard_targets, guide_targets,
+                       completeness_target=1.0,
+                       ranking_method='completeness',
+                       tiles=None,
+                       disqualify_below_min=True,
+                       tiling_method='SH', randomise_pa=True,
+                       randomise_SH=True, tiling_file='ipack.3.8192.txt',
+                       ra_min=0.0, ra_max=360.0, dec_min=-90.0,
+                       dec_max=90.0,
+                       tiling_set_size=1000,
+                       tile_unpick_method='sequential', combined_weight=1.0,
+                       sequential_ordering=(1,2), rank_supplements=False,
+                       repick_after_complete=True,
+                       recompute_difficulty=True,
+                       reunpick_method='full',
+                       defer_unpicks=False,
+                       selection_engine='lazy',
+                       ncpu=1,
+                       preserve_order=True,
+                       batch_selection=False,
+                       checkpoint_file=None,
+                       checkpoint_interval=10,
+                       resume_from=None,
+                       target_overlay=False,
+                       adaptive_threshold=None,
+                       adaptive_jitter=2,
+                       report=None):
+    """
+    Generate a tiling based on the greedy algorithm, yielding each tile as it
+    is selected.
+
+    The tiles are yielded as soon as they are selected, so they may be
+    written out (or the tiling stopped) before the tiling is complete.
+    Unless checkpoint_file is given, the selected tiles are not retained
+    once they have been yielded. The tiles are not consolidated (see
+    tiling_consolidate) or globally re-picked; generate_tiling_greedy does
+    this once all of the tiles have been yielded.
 
     The greedy algorithm works as follows:
     
@@ -700,6 +2772,9 @@ def generate_tiling_greedy(candidate_targets, standard_targets, guide_targets,
     tiling_method : 
         The method by which to generate a tiling set. Currently available are:
         'SH' - Use Slaone-Harding tilings
+        'adaptive' - Use a coarse Sloane-Harding tiling (given by
+        tiling_file), with extra tiles added where the target density is
+        high (see generate_adaptive_tiling)
         'user' - Use a user-provided set of TaipanTiles as the 'seed' tiling
 
     tiles:
@@ -752,18 +2827,146 @@ def generate_tiling_greedy(candidate_targets, standard_targets, guide_targets,
         difficulties after a tile is moved to the results lsit. Defaults to
         True.
 
-    Returns
-    -------
-    tile_list : 
-        The list of tiles making up the tiling.
-        
-    final_completeness : 
-        The target completeness achieved.
-        
-    candidate_targets : 
-        Any targets from candidate_targets that do not
-        appear in the final tiling_list (i.e. were not assigned to a successful
-        tile).
+    reunpick_method :
+        The method used to re-unpick the candidate tiles affected by each
+        tile selection. Available are:
+        'full' - Strip the tile and unpick it again from scratch
+        'delta' - Only refill the fibres whose targets were taken by the
+        selected tile (see TaipanTile.reunpick_tile). Much faster, but gives
+        slightly different results. With the 'lazy' selection_engine, the
+        taken targets are removed straight away, but the fibres are only
+        refilled once the tile reaches the top of the ranking.
+        Defaults to 'full'.
+
+    defer_unpicks :
+        Boolean value, denoting whether to defer the unpicking of candidate
+        tiles until they are in contention for selection. Deferred tiles are
+        ranked by an upper bound on their score (see
+        TaipanTile.calculate_tile_score_bound), and are only unpicked if that
+        bound beats the best unpicked tile. Tiles are then unpicked against
+        the candidate targets at the time they are needed, so results may
+        differ slightly from the non-deferred case. The 'lazy'
+        selection_engine always defers the re-unpicks after each selection;
+        this option also defers the initial unpicks. Defaults to False.
+
+    selection_engine :
+        How the tile rankings are updated after each tile selection.
+        Available are:
+        'lazy' - Keep the tiles in a max-heap on their ranking. The tiles
+        affected by a selection (those which held the selected targets,
+        plus those holding targets which had their difficulty re-computed,
+        if the ranking_method depends on difficulty) are flagged as stale,
+        and keyed on an upper bound of their score (see
+        TaipanTile.calculate_tile_score_bound). Stale tiles are only
+        re-unpicked and re-scored once they reach the top of the heap, until
+        an up-to-date tile stays on top.
+        'exhaustive' - Re-unpick every affected tile straight away, and
+        re-score every candidate tile.
+        'check' - As for 'lazy', but also re-unpick (on copies) every
+        tile without an up-to-date unpick and re-score every tile after each
+        selection, as 'exhaustive' would. A warning is logged, and the
+        'selection_mismatches' counter incremented, whenever the
+        highest-ranked tile differs from the one 'lazy' selects. This is
+        slower than 'exhaustive', and is meant for testing.
+        Tiles are re-unpicked against the candidate targets at the time they
+        reach the top, rather than straight after each selection. This only
+        picks the same tiles as 'exhaustive' if each tile's unpick doesn't
+        depend on the order of the candidate list, so 'lazy' and 'check'
+        require preserve_order=True. The number of calls to the scoring
+        function made, and avoided relative to 'exhaustive', is logged at
+        the end of tiling. Defaults to 'lazy'.
+
+    ncpu :
+        The number of processes to use for unpicking the candidate tiles.
+        If greater than 1, the initial unpicks, and the re-picks of the
+        tiles affected by each selection (if reunpick_method is 'full' and
+        selection_engine is 'exhaustive'), are done on a persistent pool of
+        worker processes (see create_unpick_pool and unpick_tiles_waves).
+        The lazy re-unpicks of the stale tiles ranked above the best
+        up-to-date tile are done together on the pool. This requires
+        preserve_order, and gives the same result as unpicking serially with
+        preserve_order=True. Has no effect if defer_unpicks is True.
+        Defaults to 1.
+
+    preserve_order :
+        Boolean value, passed to TaipanTile.unpick_tile, denoting whether to
+        keep the targets considered for each tile in the order of the
+        candidate list, rather than the order of a KDTree built over the
+        list. The worker processes unpick each tile against only the
+        candidates near it, so they only match a serial unpick if this is
+        True. Must be True if ncpu > 1, or if selection_engine is 'lazy' or
+        'check'. Defaults to True, so that the tiling doesn't depend on ncpu
+        or the selection engine.
+
+    batch_selection :
+        Boolean value, denoting whether to select a batch of tiles in each
+        iteration of the algorithm, rather than a single tile. The batch
+        is built from the highest-ranked tiles which cannot interact
+        with each other (i.e. their centres are more than
+        TILE_INTERACTION_RADIUS apart), and which are each the
+        highest-ranked tile of all the tiles they could interact with. The
+        tiles affected by the whole batch are then re-picked and re-scored
+        together. This greatly reduces the number of iterations needed for
+        large regions.
+        The tiling is only guaranteed to match that with
+        batch_selection=False while each batch holds a single tile (as is
+        typical for small regions). Larger batches select their tiles in a
+        different order to the one-at-a-time algorithm. That order changes
+        the position angles of the replacement tiles (if randomise_pa), the
+        target difficulties seen by later re-picks, and the point at which
+        the completeness target is reached. The tiling then generally
+        differs, although the number of tiles and the completeness achieved
+        are typically very close. Defaults to False.
+
+    checkpoint_file :
+        File name to periodically write the state of the tiling to (see
+        save_tiling_checkpoint), so that it may be resumed if interrupted.
+        Defaults to None, in which case no checkpoints are written.
+
+    checkpoint_interval :
+        The number of tiles to select between writing checkpoints. Defaults
+        to 10.
+
+    resume_from :
+        A checkpoint file to resume the tiling from. The same target lists
+        and options must be passed as for the original run; the resumed run
+        will then give the same result as an uninterrupted run. Defaults to
+        None.
+
+    target_overlay :
+        Boolean value, denoting whether to hold the priorities and
+        difficulties of the candidate targets in a run-specific
+        TargetOverlay, rather than writing them to the targets themselves.
+        The target objects passed in are then never modified, so they may be
+        shared between tiling runs. The yielded tiles hold the original
+        target objects. candidate_targets is only reduced in place once the
+        iteration finishes or is stopped. Defaults to False.
+
+    adaptive_threshold, adaptive_jitter :
+        The threshold and jitter arguments to generate_adaptive_tiling,
+        used if tiling_method='adaptive'. Default to None and 2,
+        respectively.
+
+    report :
+        Optional TilingReport in which to record the time spent in each
+        stage of the tiling ('tile_generation', 'initial_unpick',
+        'selection', 'target_removal', 'difficulty_recompute', 're_unpick',
+        'scoring' and 'checkpoint'), and the selection engine counters.
+        Defaults to None.
+
+    Yields
+    ------
+    tile :
+        The next tile selected for the tiling. When resuming from a
+        checkpoint, the tiles stored in the checkpoint are yielded first.
+
+    completeness :
+        The target completeness achieved so far.
+
+    remaining_targets :
+        The number of targets from candidate_targets not yet assigned to a
+        tile. The unassigned targets are those left in candidate_targets,
+        which is reduced in place.
     """
     
     tile_list = []
@@ -771,11 +2974,29 @@ def generate_tiling_greedy(candidate_targets, standard_targets, guide_targets,
     # Input checking
     TILING_METHODS = [
         'SH',               # Sloane-Harding
+        'adaptive',         # Sloane-Harding, refined by target density
         'user',             # user defined
     ]
     if tiling_method not in TILING_METHODS:
         raise ValueError('tiling_method must be one of %s' 
             % str(TILING_METHODS))
+    if reunpick_method not in REUNPICK_METHODS:
+        raise ValueError('reunpick_method must be one of %s'
+            % str(REUNPICK_METHODS))
+    if selection_engine not in SELECTION_ENGINES:
+        raise ValueError('selection_engine must be one of %s'
+            % str(SELECTION_ENGINES))
+    ncpu = int(ncpu)
+    if ncpu <= 0:
+        raise ValueError('ncpu must be > 0')
+    if ncpu > 1 and not preserve_order:
+        raise ValueError('ncpu > 1 requires preserve_order=True')
+    if selection_engine != 'exhaustive' and not preserve_order:
+        raise ValueError("selection_engine '%s' requires preserve_order=True"
+                         % selection_engine)
+    checkpoint_interval = int(checkpoint_interval)
+    if checkpoint_interval <= 0:
+        raise ValueError('checkpoint_interval must be > 0')
 
     tiling_set_size = int(tiling_set_size)
     if tiling_set_size <= 0:
@@ -784,102 +3005,90 @@ def generate_tiling_greedy(candidate_targets, standard_targets, guide_targets,
     if completeness_target <= 0. or completeness_target > 1:
         raise ValueError('completeness_target must be in the range (0, 1]')
 
-    if tiling_method == 'user' and tiles is None:
-        raise ValueError("Must provide tiles list if tiling_method is 'user'")
+    if tiling_method == 'user':
+        if tiles is None:
+            raise ValueError("Must provide tiles list if tiling_method is "
+                             "'user'")
+        if not(isinstance(tiles, list)):
+            raise ValueError('tiles must be a list of TaipanTile objects')
+        if not(np.all([isinstance(t, tp.TaipanTile) for t in tiles])):
+            raise ValueError('tiles must be a list of TaipanTile objects')
 
-    if not(isinstance(tiles, list)):
-        raise ValueError('tiles must be a list of TaipanTile objects')
-    if not(np.all([isinstance(t, tp.TaipanTile) for t in tiles])):
-        raise ValueError('tiles must be a list of TaipanTile objects')
+    if report is None:
+        report = TilingReport('iter_tiling_greedy')
 
     # Push the coordinate limits into standard format
     ra_min, ra_max, dec_min, dec_max = compute_bounds(ra_min, ra_max,
                                                       dec_min, dec_max)
     # print ra_min, ra_max, dec_min, dec_max
 
-    if tiling_method == 'SH':
-        # Generate the SH tiling to cover the region of interest
-        candidate_tiles = generate_SH_tiling(tiling_file,
-                                             randomise_seed=randomise_SH,
-                                             randomise_pa=randomise_pa)
-        candidate_tiles = [t for t in candidate_tiles
-                           if is_within_bounds(t, ra_min, ra_max,
-                                               dec_min, dec_max)]
-    elif tiling_method == 'user':
-        # Using copy.deepcopy copies both the list *and* makes fresh copies of
-        # the passed tiles list, so the original list & objects aren't
-        # unexpectedly modified
-        candidate_tiles = copy.deepcopy(tiles)
-
-    # Unpick ALL of these tiles
-    # Note that we are *not* updating candidate_targets during this process,
-    # as overlap is allowed - instead, we will need to manually update
-    # candidate_tiles once we pick the highest-ranked tile
-    # Likewise, we don't want the target difficulties to change
-    # Therefore, we'll assign the output of the function to a dummy variable
-    logging.info('Creating initial tile unpicks...')
-    i = 0
-    # print len(candidate_targets)
+    with report.stage('tile_generation'):
+        if tiling_method == 'SH':
+            # Generate the SH tiling to cover the region of interest
+            candidate_tiles = generate_SH_tiling(
+                tiling_file, randomise_seed=randomise_SH,
+                randomise_pa=randomise_pa, ra_min=ra_min, ra_max=ra_max,
+                dec_min=dec_min, dec_max=dec_max)
+        elif tiling_method == 'adaptive':
+            # Generate a coarse SH tiling, refined where the targets are dense
+            candidate_tiles = generate_adaptive_tiling(
+                candidate_targets, tiling_file,
+                randomise_seed=randomise_SH, randomise_pa=randomise_pa,
+                ra_min=ra_min, ra_max=ra_max, dec_min=dec_min, dec_max=dec_max,
+                threshold=adaptive_threshold, jitter=adaptive_jitter)
+        elif tiling_method == 'user':
+            # Clone the passed tiles, so the original list & objects aren't
+            # unexpectedly modified
+            candidate_tiles = [t.clone() for t in tiles]
+
+    overlay, caller_targets = None, candidate_targets
+    if target_overlay:
+        # Work with views of the targets, so that the targets themselves are
+        # never modified
+        overlay = tp.TargetOverlay(candidate_targets)
+        candidate_targets = overlay.views[:]
+        standard_targets = [overlay.view(t) for t in standard_targets]
+        guide_targets = [overlay.view(t) for t in guide_targets]
     candidate_targets_master = candidate_targets[:]
     # Initialise some of our counter variables
     no_submitted_targets = len(candidate_targets_master)
     if no_submitted_targets == 0:
         raise ValueError('Attempting to generate a tiling with no targets!')
 
-    for tile in candidate_tiles:
-        # print 'inter: %d' % len(candidate_targets)
-        burn = tile.unpick_tile(candidate_targets, standard_targets,
-                                guide_targets,
-                                overwrite_existing=True, check_tile_radius=True,
-                                recompute_difficulty=False,
-                                method=tile_unpick_method,
-                                combined_weight=combined_weight,
-                                sequential_ordering=sequential_ordering,
-                                rank_supplements=rank_supplements,
-                                repick_after_complete=False,
-                                consider_removed_targets=False)
-        i += 1
-        logging.info('Created %d / %d tiles' % (i, len(candidate_tiles)))
-    # print len(candidate_targets)
-
-    # Compute initial rankings for all of the tiles
-    ranking_list = [tile.calculate_tile_score(method=ranking_method,
-        disqualify_below_min=disqualify_below_min) for tile in candidate_tiles]
-    # print ranking_list
-
-    # Define a helper function
-    def gen_pa(randomise_pa):
-        pa = 0.
-        if randomise_pa:
-            pa = random.uniform(0., 360.)
-        return pa
-
-    # While we are below our completeness criteria AND the highest-ranked tile
-    # is not empty, perform the greedy algorithm
-    logging.info('Starting greedy tiling allocation...')
-    i = 0
-    while ((float(no_submitted_targets - len(candidate_targets)) 
-        / float(no_submitted_targets)) < completeness_target) and (
-        max(ranking_list) > 0.05):
-
-        # Find the highest-ranked tile in the candidates_list, and remove it
-        # print 'a : %d' % len(candidate_targets)
-        i = np.argmax(ranking_list)
-        tile_list.append(candidate_tiles.pop(i))
-        best_ranking = ranking_list.pop(i)
-        logging.debug('Tile selected!')
-        # Record the ra and dec of the candidate for tile re-creation
-        best_ra = tile_list[-1].ra
-        best_dec = tile_list[-1].dec
-        # print 'b : %d' % len(candidate_targets)
-
-        # Force a wait here to see if it solves the target problem
-        # time.sleep(5)
-
-        # Strip the now-assigned targets out of the candidate_targets list,
-        # then recalculate difficulties for affected remaning targets
-        logging.debug('Re-computing target list...')
-        # print 'c : %d' % len(candidate_targets)
+    # Counters for reporting the work done by the selection engine
+    counters = {
+        'score_evaluations': 0,
+        'score_evaluations_avoided': 0,
+        'selection_mismatches': 0,
+    }
+
+    catalogues = (candidate_targets_master, standard_targets, guide_targets)
+
+    def write_checkpoint():
+        with report.stage('checkpoint'):
+            lookup = _catalogue_lookup(catalogues)
+            candidate_lookup = dict((id(t), k) for k, t in
+                                    enumerate(candidate_targets_master))
+            save_tiling_checkpoint(checkpoint_file, {
+                'function': 'generate_tiling_greedy',
+                'no_submitted_targets': no_submitted_targets,
+                'candidate_inds': [candidate_lookup[id(t)]
+                                   for t in candidate_targets],
+                'difficulties': [t.difficulty
+                                 for t in candidate_targets_master],
+                'tile_list': [_encode_tile(t, lookup) for t in tile_list],
+                'candidate_tiles': [_encode_tile(t, lookup)
+                                    for t in selector.candidate_tiles],
+                'ranking_list': selector.ranking_list,
+                'tile_unpicked': selector.tile_unpicked,
+                'tile_stale': selector.tile_stale,
+                'tile_refill': selector.tile_refill,
+                'disqualify_below_min': selector.disqualify_below_min,
+                'counters': counters,
+                'random_state': random.getstate(),
+            })
+
+    def remove_targets(assigned_targets):
         # ERROR: Something goes wrong here with the target reduction -- not all
         # of the assigned targets appear to be removed from candidate_targets
         # It works correctly for the first pass or two, and then start to not
@@ -888,11 +3097,6 @@ def generate_tiling_greedy(candidate_targets, standard_targets, guide_targets,
         # targets fail, but in the return test_tiling, ALL of the objects
         # within the tiling are members of the originally passed master
         # list of targets
-        assigned_targets = tile_list[-1].get_assigned_targets_science()
-        # targets_not_in_cands = [t for t in assigned_targets if t not in
-        #   candidate_targets]
-
-        # print assigned_targets
         before_targets_len = len(candidate_targets)
         for t in assigned_targets:
             candidate_targets.pop(candidate_targets.index(t))
@@ -906,75 +3110,233 @@ def generate_tiling_greedy(candidate_targets, standard_targets, guide_targets,
                             '%d removed from list' %
                             (len(assigned_targets),
                              before_targets_len - len(candidate_targets)))
-            logging.warning('I have %d assigned targets apparently '
-                            'not in master list' %
-                            (len(targets_not_in_cands)))
-        if recompute_difficulty:
-            logging.info('Re-computing target difficulties...')
-            tp.compute_target_difficulties(tp.targets_in_range(
-                best_ra, best_dec, candidate_targets,
-                tp.TILE_RADIUS + 2.0*tp.FIBRE_EXCLUSION_RADIUS))
-        # print 'e : %d' % len(candidate_targets)
-
-        # Replace the removed tile in candidate_targets, repick any tiles
-        # within 2 * TILE_RADIUS of it, and then add to the ranking_list
-        candidate_tiles.append(tp.TaipanTile(best_ra, best_dec, pa=gen_pa(
-            randomise_pa)))
-        j = 0
-        logging.info('Re-picking affected tiles...')
-        # print 'f : %d' % len(candidate_targets)
-        affected_tiles = [t for t in candidate_tiles
-            if np.any(map(lambda x: x in t.get_assigned_targets_science(),
-                assigned_targets))]
-        # This won't cause the new tile to be re-picked, so manually add that
-        affected_tiles.append(candidate_tiles[-1])
-        for tile in affected_tiles:
-            # print 'inter: %d' % len(candidate_targets)
-            burn = tile.unpick_tile(candidate_targets, standard_targets, 
-                guide_targets,
-                overwrite_existing=True, check_tile_radius=True,
-                recompute_difficulty=False,
-                method=tile_unpick_method, combined_weight=combined_weight,
-                sequential_ordering=sequential_ordering,
-                rank_supplements=rank_supplements, 
-                repick_after_complete=False,
-                consider_removed_targets=False)
-            j += 1
-            logging.info('Completed %d / %d' % (j, len(affected_tiles)))
-        # print 'g : %d' % len(candidate_targets)
-        ranking_list = [tile.calculate_tile_score(method=ranking_method,
-            disqualify_below_min=disqualify_below_min) 
-            for tile in candidate_tiles]
-        # print ranking_list
-        # print [len(t.get_assigned_targets_science()) for t in candidate_tiles]
-
-        logging.info('Tile has ranking score %3.1f' % (best_ranking, ))
-        logging.info('Assigned tile at %3.1f, %2.1f' % (best_ra, best_dec))
-        logging.info('%d targets, %d standards, %d guides' %
-                     (tile_list[-1].count_assigned_targets_science(),
-                      tile_list[-1].count_assigned_targets_standard(),
-                      tile_list[-1].count_assigned_targets_guide(), ))
-        logging.info('Now assigned %d tiles' % (len(tile_list), ))
-        logging.info('Completeness achieved: %1.4f' %
-                     (float(no_submitted_targets - len(candidate_targets)
-                            ) / float(no_submitted_targets)))
-        logging.info('Remaining targets: %d' % len(candidate_targets))
-        logging.info('Remaining guides & standards: %d, %d' %
-                     (len(guide_targets), len(standard_targets)))
-
-        # If the max of the ranking_list is now 0, try switching off 
-        # the disqualify flag
-        if max(ranking_list) < 0.05 and disqualify_below_min:
-            logging.info('Detected no remaining legal tiles - '
-                         'relaxing requirements')
-            disqualify_below_min = False
-            ranking_list = [tile.calculate_tile_score(method=ranking_method,
-                disqualify_below_min=disqualify_below_min) 
-                for tile in candidate_tiles]
-            # print ranking_list
+
+    if resume_from is not None:
+        # Restore the tiling state, including the unpicks and rankings of
+        # the candidate tiles, from the checkpoint
+        logging.info('Resuming tiling from %s...' % resume_from)
+        state = load_tiling_checkpoint(
+            resume_from, tiling_function='generate_tiling_greedy')
+        if state['no_submitted_targets'] != no_submitted_targets:
+            raise ValueError('The checkpoint in %s was written for a '
+                             'different candidate_targets list' %
+                             resume_from)
+        for t, difficulty in zip(candidate_targets_master,
+                                 state['difficulties']):
+            t.difficulty = difficulty
+        candidate_targets[:] = [candidate_targets_master[k]
+                                for k in state['candidate_inds']]
+        tile_list = [_decode_tile(t, catalogues)
+                     for t in state['tile_list']]
+        candidate_tiles = [_decode_tile(t, catalogues)
+                           for t in state['candidate_tiles']]
+        disqualify_below_min = state['disqualify_below_min']
+        counters.update(state['counters'])
+        random.setstate(state['random_state'])
+
+    # The greedy selection (see _TileSelector)
+    selector = _TileSelector(
+        candidate_tiles, candidate_targets, standard_targets, guide_targets,
+        dict(check_tile_radius=True,
+             recompute_difficulty=False,
+             method=tile_unpick_method,
+             combined_weight=combined_weight,
+             sequential_ordering=sequential_ordering,
+             rank_supplements=rank_supplements,
+             repick_after_complete=False,
+             consider_removed_targets=False,
+             preserve_order=preserve_order),
+        ranking_method, disqualify_below_min, randomise_pa,
+        recompute_difficulty, tp.TILE_RADIUS + 2.0*tp.FIBRE_EXCLUSION_RADIUS,
+        reunpick_method, defer_unpicks, selection_engine, ncpu, counters,
+        report)
+
+    with _closing_pool(selector.pool):
+        # Unpick ALL of these tiles
+        # Likewise, we don't want the target difficulties to change
+        # Therefore, the unpicks are made with recompute_difficulty=False
+        if resume_from is not None:
+            selector.restore(state)
+        else:
+            logging.info('Creating initial tile unpicks...')
+            selector.initial_unpick()
+
+        # While we are below our completeness criteria AND the highest-ranked
+        # tile is not empty, perform the greedy algorithm
+        logging.info('Starting greedy tiling allocation...')
+        n_tiles = len(tile_list)
+        last_checkpoint = n_tiles
+        # If resuming, pass on the tiles restored from the checkpoint first
+        completeness = (float(no_submitted_targets -
+                              len(candidate_targets))
+                        / float(no_submitted_targets))
+        try:
+            for tile in tile_list:
+                yield (_output_tile(tile, overlay), completeness,
+                       len(candidate_targets))
+        except GeneratorExit:
+            _release_targets(overlay, caller_targets, candidate_targets)
+            raise
+        if checkpoint_file is None:
+            del tile_list[:]
+        while ((float(no_submitted_targets - len(candidate_targets)) 
+            / float(no_submitted_targets)) < completeness_target) and (
+            max(selector.ranking_list) > 0.05):
+
+            targets_needed = None
+            if batch_selection:
+                # Stop adding tiles to the batch once it would reach the
+                # completeness target
+                targets_needed = (math.ceil(completeness_target *
+                                            no_submitted_targets)
+                                  - (no_submitted_targets -
+                                     len(candidate_targets)))
+            batch_tiles = selector.select_tiles(remove_targets,
+                                                targets_needed=targets_needed)
+            tile_list += batch_tiles
+            n_tiles += len(batch_tiles)
+
+            logging.info('Now assigned %d tiles' % (n_tiles, ))
+            logging.info('Completeness achieved: %1.4f' %
+                         (float(no_submitted_targets - len(candidate_targets)
+                                ) / float(no_submitted_targets)))
+            logging.info('Remaining targets: %d' % len(candidate_targets))
+            logging.info('Remaining guides & standards: %d, %d' %
+                         (len(guide_targets), len(standard_targets)))
+
+            selector.relax_requirements()
+
+            # Pass the selected tiles on, before writing any checkpoint, so
+            # that a tile is never lost if the tiling is interrupted
+            completeness = (float(no_submitted_targets -
+                                  len(candidate_targets))
+                            / float(no_submitted_targets))
+            try:
+                for tile in batch_tiles:
+                    yield (_output_tile(tile, overlay), completeness,
+                           len(candidate_targets))
+            except GeneratorExit:
+                _release_targets(overlay, caller_targets, candidate_targets)
+                raise
+            if checkpoint_file is None:
+                # The selected tiles are only kept for writing checkpoints
+                del tile_list[:]
+            elif n_tiles - last_checkpoint >= checkpoint_interval:
+                write_checkpoint()
+                last_checkpoint = n_tiles
+
+
+    report.counters.update(counters)
+    report.count('tiles_selected', n_tiles)
+    logging.info('Selection engine %s: %d tile score evaluations, '
+                 '%d avoided' % (selection_engine,
+                                 counters['score_evaluations'],
+                                 counters['score_evaluations_avoided']))
+    if selection_engine == 'check':
+        logging.info('Selection engine check: %d mismatches found' %
+                     counters['selection_mismatches'])
+
+    _release_targets(overlay, caller_targets, candidate_targets)
+
+
+def generate_tiling_greedy(candidate_targets, standard_targets, guide_targets,
+                           completeness_target=1.0,
+                           ranking_method='completeness',
+                           tiles=None,
+                           disqualify_below_min=True,
+                           tiling_method='SH', randomise_pa=True,
+                           randomise_SH=True, tiling_file='ipack.3.8192.txt',
+                           ra_min=0.0, ra_max=360.0, dec_min=-90.0,
+                           dec_max=90.0,
+                           tiling_set_size=1000,
+                           tile_unpick_method='sequential', combined_weight=1.0,
+                           sequential_ordering=(1,2), rank_supplements=False,
+                           repick_after_complete=True,
+                           recompute_difficulty=True,
+                           reunpick_method='full',
+                           defer_unpicks=False,
+                           selection_engine='lazy',
+                           ncpu=1,
+                           preserve_order=True,
+                           batch_selection=False,
+                           checkpoint_file=None,
+                           checkpoint_interval=10,
+                           resume_from=None,
+                           target_overlay=False,
+                           adaptive_threshold=None,
+                           adaptive_jitter=2,
+                           report_file=None,
+                           return_report=False):
+    """
+    Generate a tiling based on the greedy algorithm.
+
+    The tiles are generated by iter_tiling_greedy, and then consolidated (see
+    tiling_consolidate). See iter_tiling_greedy for a description of the
+    algorithm and the other parameters.
+
+    Parameters
+    ----------
+    report_file :
+        File name to write a JSON report of the time spent in each stage of
+        the tiling, and the work counters, to (see TilingReport). Defaults
+        to None, in which case no report is written.
+
+    return_report :
+        Boolean value, denoting whether to also return the report (as a
+        dictionary). Defaults to False.
+
+    Returns
+    -------
+    tile_list : 
+        The list of tiles making up the tiling.
+        
+    final_completeness : 
+        The target completeness achieved.
+        
+    candidate_targets : 
+        Any targets from candidate_targets that do not
+        appear in the final tiling_list (i.e. were not assigned to a successful
+        tile).
+
+    report :
+        The report of the tiling (see TilingReport.as_dict). Only returned
+        if return_report is True.
+    """
+    no_submitted_targets = len(candidate_targets)
+    report = TilingReport('generate_tiling_greedy')
+
+    tile_list = [tile for tile, completeness, remaining in iter_tiling_greedy(
+        candidate_targets, standard_targets, guide_targets,
+        completeness_target=completeness_target,
+        ranking_method=ranking_method,
+        tiles=tiles,
+        disqualify_below_min=disqualify_below_min,
+        tiling_method=tiling_method, randomise_pa=randomise_pa,
+        randomise_SH=randomise_SH, tiling_file=tiling_file,
+        ra_min=ra_min, ra_max=ra_max, dec_min=dec_min, dec_max=dec_max,
+        tiling_set_size=tiling_set_size,
+        tile_unpick_method=tile_unpick_method,
+        combined_weight=combined_weight,
+        sequential_ordering=sequential_ordering,
+        rank_supplements=rank_supplements,
+        repick_after_complete=repick_after_complete,
+        recompute_difficulty=recompute_difficulty,
+        reunpick_method=reunpick_method,
+        defer_unpicks=defer_unpicks,
+        selection_engine=selection_engine,
+        ncpu=ncpu,
+        preserve_order=preserve_order,
+        batch_selection=batch_selection,
+        checkpoint_file=checkpoint_file,
+        checkpoint_interval=checkpoint_interval,
+        resume_from=resume_from,
+        target_overlay=target_overlay,
+        adaptive_threshold=adaptive_threshold,
+        adaptive_jitter=adaptive_jitter,
+        report=report)]
 
     # Consolidate the tiling
-    tile_list = tiling_consolidate(tile_list)
+    tile_list = tiling_consolidate(tile_list, report=report)
     # print ranking_list
 
     # Return the tiling, the completeness factor and the remaining targets
@@ -983,40 +3345,61 @@ def generate_tiling_greedy(candidate_targets, standard_targets, guide_targets,
 
     if not repick_after_complete:
         # Do a global re-pick, given we didn't do it on the fly
-        for t in tile_list:
-            t.repick_tile()
+        with report.stage('repick'):
+            for t in tile_list:
+                t.repick_tile()
 
-    return tile_list, final_completeness, candidate_targets
+    report.result.update([('tiles', len(tile_list)),
+                          ('completeness', final_completeness),
+                          ('remaining_targets', len(candidate_targets))])
+    return _finish_report(report, report_file, return_report,
+                          (tile_list, final_completeness, candidate_targets))
 
 #Uncomment the following line for FunnelWeb line_profile.
 #@profile
-def generate_tiling_funnelweb(candidate_targets, standard_targets,
-                              guide_targets,
-                              completeness_target = 1.0,
-                              ranking_method='priority-sum',
-                              disqualify_below_min=True,
-                              tiling_method='SH', randomise_pa=True,
-                              randomise_SH=True, tiling_file='ipack.3.8192.txt',
-                              ra_min=0.0, ra_max=360.0, dec_min=-90.0,
-                              dec_max=90.0,
-                              mag_ranges_prioritise=[[5,7],
-                                                     [7,8],
-                                                     [9,10],
-                                                     [11,12]],
-                              prioritise_extra=4,
-                              completeness_priority=4,
-                              mag_ranges=[[5,8],[7,10],[9,12],[11,14]],
-                              tiling_set_size=1000,
-                              tile_unpick_method='sequential',
-                              combined_weight=1.0,
-                              sequential_ordering=(1,2), rank_supplements=False,
-                              repick_after_complete=True,
-                              recompute_difficulty=True):
+def iter_tiling_funnelweb(candidate_targets, standard_targets,
+                          guide_targets,
+                          completeness_target = 1.0,
+                          ranking_method='priority-sum',
+                          disqualify_below_min=True,
+                          tiling_method='SH', randomise_pa=True,
+                          randomise_SH=True, tiling_file='ipack.3.8192.txt',
+                          ra_min=0.0, ra_max=360.0, dec_min=-90.0,
+                          dec_max=90.0,
+                          mag_ranges_prioritise=[[5,7],
+                                                 [7,8],
+                                                 [9,10],
+                                                 [11,12]],
+                          prioritise_extra=4,
+                          completeness_priority=4,
+                          mag_ranges=[[5,8],[7,10],[9,12],[11,14]],
+                          tiling_set_size=1000,
+                          tile_unpick_method='sequential',
+                          combined_weight=1.0,
+                          sequential_ordering=(1,2), rank_supplements=False,
+                          repick_after_complete=True,
+                          recompute_difficulty=True,
+                          reunpick_method='full',
+                          defer_unpicks=False,
+                          selection_engine='lazy',
+                          ncpu=1,
+                          preserve_order=True,
+                          checkpoint_file=None,
+                          checkpoint_interval=10,
+                          resume_from=None,
+                          target_overlay=False,
+                          report=None):
     """
     Generate a tiling based on the greedy algorithm operating on a set of magnitude 
-    ranges sequentially. Within each magnitude range, a complete set of tiles are 
+    ranges sequentially, yielding each tile as it is selected. Within each
+    magnitude range, a complete set of tiles are 
     selected that enables completeness higher than the minimum priority only.
 
+    As for iter_tiling_greedy, the tiles are neither retained (unless
+    checkpoint_file is given) nor consolidated; generate_tiling_funnelweb
+    consolidates the tiles of each magnitude range once all of the tiles
+    have been yielded.
+
     The greedy algorithm works as follows:
     
     - Generate a set of tiles covering the area of interest.
@@ -1106,18 +3489,59 @@ def generate_tiling_funnelweb(candidate_targets, standard_targets,
         it also means recompute for each mag range. Defaults to
         True.
 
-    Returns
-    -------
-    tile_list : 
-        The list of tiles making up the tiling.
-        
-    final_completeness : 
-        The target completeness achieved.
-        
-    candidate_targets : 
-        Any targets from candidate_targets that do not
-        appear in the final tiling_list (i.e. were not assigned to a successful
-        tile).
+    reunpick_method :
+        The method used to re-unpick the candidate tiles affected by each
+        tile selection, either 'full' or 'delta'. See the documentation for
+        generate_tiling_greedy for details. Defaults to 'full'.
+
+    defer_unpicks :
+        Boolean value, denoting whether to defer the unpicking of candidate
+        tiles until they are in contention for selection. See the
+        documentation for iter_tiling_greedy for details. Defaults to
+        False.
+
+    selection_engine :
+        How the tile rankings are updated after each tile selection, either
+        'lazy', 'exhaustive' or 'check'. See the documentation for
+        iter_tiling_greedy for details. Defaults to 'lazy'.
+
+    ncpu :
+        The number of processes to use for unpicking the candidate tiles.
+        A separate worker pool is used for each magnitude range. See the
+        documentation for iter_tiling_greedy for details. Defaults to 1.
+
+    preserve_order :
+        Boolean value, denoting whether to keep the targets considered for
+        each tile in the order of the candidate list. Required if ncpu > 1,
+        or if selection_engine is 'lazy' or 'check'. See the documentation
+        for iter_tiling_greedy for details. Defaults to True.
+
+    checkpoint_file, checkpoint_interval, resume_from :
+        Periodically write the state of the tiling to checkpoint_file, every
+        checkpoint_interval tiles, and/or resume the tiling from the
+        checkpoint file resume_from. The checkpoint records the magnitude
+        range in progress. See the documentation for iter_tiling_greedy
+        for details. Default to None, 10 and None respectively.
+
+    target_overlay :
+        Boolean value, denoting whether to hold the target priorities
+        (including the mag_ranges_prioritise boosts) and difficulties in a
+        run-specific TargetOverlay. See the documentation for
+        iter_tiling_greedy for details. Defaults to False.
+
+    report :
+        Optional TilingReport in which to record the time spent in each
+        stage of the tiling (see iter_tiling_greedy). The set-up and tile pruning for
+        each magnitude range are recorded as the 'range_setup' and
+        'tile_pruning' stages. Defaults to None.
+
+    Yields
+    ------
+    tile, completeness, remaining_targets :
+        The next tile selected, the target completeness achieved so far, and
+        the number of targets from candidate_targets not yet assigned to a
+        tile. See iter_tiling_greedy. The magnitude range each tile was
+        selected for is recorded in its mag_min and mag_max attributes.
     """
     
     tile_lists = []
@@ -1129,6 +3553,23 @@ def generate_tiling_funnelweb(candidate_targets, standard_targets,
     if tiling_method not in TILING_METHODS:
         raise ValueError('tiling_method must be one of %s' 
             % str(TILING_METHODS))
+    if reunpick_method not in REUNPICK_METHODS:
+        raise ValueError('reunpick_method must be one of %s'
+            % str(REUNPICK_METHODS))
+    if selection_engine not in SELECTION_ENGINES:
+        raise ValueError('selection_engine must be one of %s'
+            % str(SELECTION_ENGINES))
+    ncpu = int(ncpu)
+    if ncpu <= 0:
+        raise ValueError('ncpu must be > 0')
+    if ncpu > 1 and not preserve_order:
+        raise ValueError('ncpu > 1 requires preserve_order=True')
+    if selection_engine != 'exhaustive' and not preserve_order:
+        raise ValueError("selection_engine '%s' requires preserve_order=True"
+                         % selection_engine)
+    checkpoint_interval = int(checkpoint_interval)
+    if checkpoint_interval <= 0:
+        raise ValueError('checkpoint_interval must be > 0')
 
     tiling_set_size = int(tiling_set_size)
     if tiling_set_size <= 0:
@@ -1137,27 +3578,110 @@ def generate_tiling_funnelweb(candidate_targets, standard_targets,
     if completeness_target <= 0. or completeness_target > 1:
         raise ValueError('completeness_target must be in the range (0, 1]')
 
+    if report is None:
+        report = TilingReport('iter_tiling_funnelweb')
+
     # Push the coordinate limits into standard format
     ra_min, ra_max, dec_min, dec_max = compute_bounds(ra_min, ra_max,
         dec_min, dec_max)
 
     # Generate the SH tiling to cover the region of interest
-    candidate_tiles = generate_SH_tiling(tiling_file, 
-        randomise_seed=randomise_SH, randomise_pa=randomise_pa)
-    candidate_tiles = [t for t in candidate_tiles
-        if is_within_bounds(t, ra_min, ra_max, dec_min, dec_max)]
-
+    with report.stage('tile_generation'):
+        candidate_tiles = generate_SH_tiling(tiling_file, 
+            randomise_seed=randomise_SH, randomise_pa=randomise_pa,
+            ra_min=ra_min, ra_max=ra_max, dec_min=dec_min, dec_max=dec_max)
+
+    overlay, caller_targets = None, candidate_targets
+    if target_overlay:
+        # Work with views of the targets (see iter_tiling_greedy)
+        overlay = tp.TargetOverlay(candidate_targets)
+        candidate_targets = overlay.views[:]
+        standard_targets = [overlay.view(t) for t in standard_targets]
+        guide_targets = [overlay.view(t) for t in guide_targets]
     candidate_targets_master = candidate_targets[:]
     # Initialise some of our counter variables
     no_submitted_targets = len(candidate_targets_master)
     if no_submitted_targets == 0:
         raise ValueError('Attempting to generate a tiling with no targets!')
-    
+
+    # The guides used for each magnitude range, as indices into guide_targets
+    range_guide_inds = []
+    range_guide_targets = []
+
+    # Counters for reporting the work done by the selection engine (see
+    # iter_tiling_greedy)
+    counters = {
+        'score_evaluations': 0,
+        'score_evaluations_avoided': 0,
+        'selection_mismatches': 0,
+    }
+
+    disqualify_below_min_range = disqualify_below_min
+    state = None
+    if resume_from is not None:
+        # Restore the targets and the tiles of the completed magnitude
+        # ranges from the checkpoint. The state of the magnitude range in
+        # progress is restored once it has been set up below
+        logging.info('Resuming tiling from %s...' % resume_from)
+        state = load_tiling_checkpoint(
+            resume_from, tiling_function='generate_tiling_funnelweb')
+        if state['no_submitted_targets'] != no_submitted_targets:
+            raise ValueError('The checkpoint in %s was written for a '
+                             'different candidate_targets list' % resume_from)
+        candidate_targets[:] = [candidate_targets_master[k]
+                                for k in state['candidate_inds']]
+        range_guide_inds = state['guide_inds'][:state['range_ix']]
+        for guide_inds, encoded_tiles in zip(range_guide_inds,
+                                             state['tile_lists']):
+            non_candidate_guide_targets = [_guide_view(guide_targets[k])
+                                           for k in guide_inds]
+            range_guide_targets.append(non_candidate_guide_targets)
+            tile_lists.append([_decode_tile(t, (candidate_targets_master,
+                                                standard_targets,
+                                                non_candidate_guide_targets))
+                               for t in encoded_tiles])
+        disqualify_below_min_range = state['disqualify_below_min_range']
+        # Pass on the tiles of the completed magnitude ranges
+        completeness = (float(no_submitted_targets - len(candidate_targets))
+                        / float(no_submitted_targets))
+        try:
+            for tiles in tile_lists:
+                for tile in tiles:
+                    yield (_output_tile(tile, overlay), completeness,
+                           len(candidate_targets))
+        except GeneratorExit:
+            _release_targets(overlay, caller_targets, candidate_targets)
+            raise
+
+    tiles_since_checkpoint = 0
+
+    # Build a spatial index of the candidate and standard targets once, and
+    # re-use it for each magnitude range by masking out the targets which
+    # aren't in that range
+    index_targets = candidate_targets_master + standard_targets
+    burn = [t.compute_usposn() for t in index_targets if t.usposn is None]
+    index_tree = cKDTree([t.usposn for t in index_targets])
+    index_lookup = dict((id(t), k) for k, t in
+                        enumerate(candidate_targets_master))
+    if recompute_difficulty:
+        # The difficulty of a target is the number of in-range targets
+        # within FIBRE_EXCLUSION_RADIUS of it (including itself)
+        difficulty_neighbours = index_tree.query_ball_point(
+            [t.usposn for t in candidate_targets_master],
+            tp.dist_euclidean(tp.FIBRE_EXCLUSION_RADIUS / 3600.))
+        difficulty_counts = [len(n) for n in difficulty_neighbours]
+        difficulty_flat = np.concatenate(difficulty_neighbours)
+        difficulty_offsets = np.cumsum(difficulty_counts) - difficulty_counts
+
     #XXX
     #print '1', [aa for aa in candidate_targets if aa=='02260685-0433118']
     #Loop over magnitude ranges.
-    disqualify_below_min_range = disqualify_below_min
     for range_ix, mag_range in enumerate(mag_ranges):
+        if state is not None and range_ix < state['range_ix']:
+            # This magnitude range was completed before the checkpoint
+            continue
+        resuming = state is not None and range_ix == state['range_ix']
+        range_timings = [time.time()]
         tile_list = []
         logging.info("Mag range: {0:5.1f} {1:5.1f}".format(mag_range[0],
                                                            mag_range[1]))
@@ -1181,92 +3705,84 @@ def generate_tiling_funnelweb(candidate_targets, standard_targets,
         #Find the guides that are not candidate targets only. These have to be copied, 
         #because the same target will be a guide for one field and not a guide for 
         #another field.
-        non_candidate_guide_targets = []
-        for potential_guide in guide_targets:
-            if potential_guide not in candidate_targets_range:
-                aguide = copy.copy(potential_guide)
-                aguide.guide=True
-                #WARNING: We have to set the standard and science flags as well, as this error
-                #checking isn't done in core.py
-                aguide.standard=False
-                aguide.science=False
-                non_candidate_guide_targets.append(aguide)
+        #Rather than copying them, the guides are wrapped in views which set
+        #the guide, standard and science flags (see _GuideTargetView).
+        if resuming:
+            # Some of the candidates have already been assigned, so use the
+            # guides found when this range was started
+            guide_inds = state['guide_inds'][range_ix]
+        else:
+            candidate_ids_range = set(id(t) for t in candidate_targets_range)
+            guide_inds = [k for k, potential_guide in enumerate(guide_targets)
+                          if id(potential_guide) not in candidate_ids_range]
+        range_guide_inds.append(guide_inds)
+        non_candidate_guide_targets = [_guide_view(guide_targets[k])
+                                       for k in guide_inds]
+        range_guide_targets.append(non_candidate_guide_targets)
+
+        # Mask of the in-range targets in the spatial index
+        range_mask = np.zeros(len(index_targets), dtype=bool)
+        range_mask[[index_lookup[id(t)] for t in candidate_targets_range]] = \
+            True
         
         if recompute_difficulty:
             logging.info("Computing difficulties...")
-            tp.compute_target_difficulties(candidate_targets_range)
-
-        # Unpick ALL of these tiles
-        # Note that we are *not* updating candidate_targets during this process,
-        # as overlap is allowed - instead, we will need to manually update
-        # candidate_tiles once we pick the highest-ranked tile
-        # Likewise, we don't want the target difficulties to change
-        # Therefore, we'll assign the output of the function to a dummy variable
-        logging.info('Creating initial tile unpicks...')
-        i = 0
-        
-        for tile in candidate_tiles:
-            # print 'inter: %d' % len(candidate_targets)
-            #PARALLEL - the following loop doesn't chance variables and could run many 
-            #versions together.
-            burn = tile.unpick_tile(candidate_targets_range, standard_targets_range, 
-                non_candidate_guide_targets,
-                overwrite_existing=True, check_tile_radius=True,
-                recompute_difficulty=False,
-                method=tile_unpick_method, combined_weight=combined_weight,
-                sequential_ordering=sequential_ordering,
-                rank_supplements=rank_supplements, 
-                repick_after_complete=repick_after_complete,
-                consider_removed_targets=False, allow_standard_targets=True)
-            i += 1
-            logging.info('Created %d / %d tiles' % (i, len(candidate_tiles)))
-
-        # Compute initial rankings for all of the tiles
-        ranking_list = [tile.calculate_tile_score(method=ranking_method,
-            disqualify_below_min=disqualify_below_min_range) for tile in candidate_tiles]
-        # print ranking_list
-
-        # Define a helper function
-        def gen_pa(randomise_pa):
-            pa = 0.
-            if randomise_pa:
-                pa = random.uniform(0., 360.)
-            return pa
-
-        # While we are below our completeness criteria AND the
-        # highest-ranked tile
-        # is not empty, perform the greedy algorithm
-        logging.info('Starting greedy/Funnelweb tiling allocation...')
-        i = 0
-        n_priority_targets = 0
-        for t in candidate_targets_range:
-            if t.priority >= completeness_priority:
-                n_priority_targets += 1
-        if n_priority_targets == 0:
-            raise ValueError('Require some priority targets in each mag range!')
-        remaining_priority_targets = n_priority_targets
-        #PARALLEL - the following loop could copy tile_list, and run many versions of
-        #this together. 
-        while ((float(n_priority_targets - remaining_priority_targets) 
-            / float(n_priority_targets)) < completeness_target) and (
-            max(ranking_list) > 0.05): # !!! Warning: 0.05 is hardwirded here
-            # - what does it mean??? It a simple proxy for max > 0
-
-            # Find the highest-ranked tile in the candidates_list, and remove it
-            i = np.argmax(ranking_list)
-            tile_list.append(candidate_tiles.pop(i))
-            best_ranking = ranking_list.pop(i)
-            logging.info('Tile selected!')
-            # Record the ra and dec of the candidate for tile re-creation
-            best_ra = tile_list[-1].ra
-            best_dec = tile_list[-1].dec
-
-            # Strip the now-assigned targets out of the candidate_targets list,
-            # then recalculate difficulties for affected remaning targets
-            logging.info('Re-computing target list...')
-            assigned_targets = tile_list[-1].get_assigned_targets_science()
-
-            # print assigned_targets
+            difficulties = np.add.reduceat(
+                range_mask[difficulty_flat].astype(int), difficulty_offsets)
+            range_inds = [index_lookup[id(t)] for t in candidate_targets_range]
+            if overlay is not None:
+                # Write straight to the overlay's difficulty array
+                overlay.difficulties[[t._index for t in
+                                      candidate_targets_range]] = \
+                    difficulties[range_inds]
+            else:
+                for t, k in zip(candidate_targets_range, range_inds):
+                    t.difficulty = int(difficulties[k])
+
+        def write_checkpoint():
+            # Stale tiles may still hold targets from a previous magnitude
+            # range, so only store the fibres of (partially) unpicked tiles
+            lookup = _catalogue_lookup(catalogues)
+            candidate_lookup = dict((id(t), k) for k, t in
+                                    enumerate(candidate_targets_master))
+            save_tiling_checkpoint(checkpoint_file, {
+                'function': 'generate_tiling_funnelweb',
+                'no_submitted_targets': no_submitted_targets,
+                'candidate_inds': [candidate_lookup[id(t)]
+                                   for t in candidate_targets],
+                'difficulties': [t.difficulty
+                                 for t in candidate_targets_master],
+                'range_ix': range_ix,
+                'guide_inds': range_guide_inds,
+                'tile_lists': [[_encode_tile(t, _catalogue_lookup(
+                                   (candidate_targets_master,
+                                    standard_targets, guides)))
+                                for t in tiles]
+                               for tiles, guides in zip(tile_lists,
+                                                        range_guide_targets)],
+                'tile_list': [_encode_tile(t, lookup) for t in tile_list],
+                'candidate_tiles': [_encode_tile(t, lookup if unpicked or
+                                                 refill else None)
+                                    for t, unpicked, refill in zip(
+                                        selector.candidate_tiles,
+                                        selector.tile_unpicked,
+                                        selector.tile_refill)],
+                'tile_positions': [start_position.get(t)
+                                   for t in selector.candidate_tiles],
+                'pruned_tiles': [_encode_tile(t, None) for t in pruned_tiles],
+                'pruned_positions': [start_position[t] for t in pruned_tiles],
+                'ranking_list': selector.ranking_list,
+                'tile_unpicked': selector.tile_unpicked,
+                'tile_stale': selector.tile_stale,
+                'tile_refill': selector.tile_refill,
+                'n_priority_targets': n_priority_targets,
+                'remaining_priority_targets': remaining_priority_targets,
+                'disqualify_below_min_range': selector.disqualify_below_min,
+                'counters': counters,
+                'random_state': random.getstate(),
+            })
+
+        def remove_targets(assigned_targets):
             before_targets_len = len(candidate_targets)
             reobserved_standards = []
             for t in assigned_targets:
@@ -1290,87 +3806,172 @@ def generate_tiling_funnelweb(candidate_targets, standard_targets,
                                 'only %d removed from list' %
                                 (len(assigned_targets),
                                  before_targets_len - len(candidate_targets)))
-            #!!! WARNING - difficulty here is computed for all targets...
-            # not just in-range targets. Maybe OK...
-            if recompute_difficulty:
-                logging.info('Re-computing target difficulties...')
-                tp.compute_target_difficulties(tp.targets_in_range(
-                    best_ra, best_dec, candidate_targets_range,
-                    tp.TILE_RADIUS+tp.FIBRE_EXCLUSION_RADIUS))
-            # print 'e : %d' % len(candidate_targets)
-
-            # Replace the removed tile in candidate_targets, repick any tiles
-            # within 2 * TILE_RADIUS of it, and then add to the ranking_list
-            candidate_tiles.append(tp.TaipanTile(best_ra, best_dec, pa=gen_pa(
-                randomise_pa)))
-            j = 0
-            logging.info('Re-picking affected tiles...')
-            # print 'f : %d' % len(candidate_targets)
-            #This is  a big n_targets x n_assigned operation XXX
-            
-            #affected_tiles = [[atile for atile in tiles_to_try if \
-            #        target in atile.get_assigned_targets_science()] for target in assigned_targets]
-            #for target in assigned_targets:
-            #    for atile in candidate_tiles:
-            #        if target in atile.get_assigned_targets_science()
-            
-            affected_tiles = list({atile for atile in candidate_tiles for t in assigned_targets if t in atile.get_assigned_targets_science()})
-            #affected_tiles = [t for t in candidate_tiles
-            #    if np.any(map(lambda x: x in t.get_assigned_targets_science(),
-            #        assigned_targets))]
-            
-            # This won't cause the new tile to be re-picked,
-            # so manually add that
-            affected_tiles.append(candidate_tiles[-1])
-            for tile in affected_tiles:
-                # print 'inter: %d' % len(candidate_targets)
-                burn = tile.unpick_tile(candidate_targets_range, standard_targets_range, 
-                    non_candidate_guide_targets,
-                    overwrite_existing=True, check_tile_radius=True,
-                    recompute_difficulty=False,
-                    method=tile_unpick_method, combined_weight=combined_weight,
-                    sequential_ordering=sequential_ordering,
-                    rank_supplements=rank_supplements, 
-                    repick_after_complete=repick_after_complete,
-                    consider_removed_targets=False, allow_standard_targets=True)
-                j += 1
-                logging.info('Completed %d / %d' % (j, len(affected_tiles)))
-            # print 'g : %d' % len(candidate_targets)
-            ranking_list = [tile.calculate_tile_score(method=ranking_method,
-                disqualify_below_min=disqualify_below_min_range) 
-                for tile in candidate_tiles]
-            # print ranking_list
-            # print [len(t.get_assigned_targets_science()) for t in candidate_tiles]
 
-            logging.info('Assigned tile at %3.1f, %2.1f' % (best_ra, best_dec))
-            logging.info('Tile has ranking score %3.1f' % (best_ranking, ))
-            logging.info('%d targets, %d standards, %d guides' %
-                         (tile_list[-1].count_assigned_targets_science(),
-                          tile_list[-1].count_assigned_targets_standard(),
-                          tile_list[-1].count_assigned_targets_guide(), ))
-            logging.info('Now assigned %d tiles' % (len(tile_list), ))
-            logging.info('Completeness achieved: %1.4f' %
-                         (float(no_submitted_targets - len(candidate_targets)) / float(no_submitted_targets)))
-            logging.info('Remaining targets: %d' % len(candidate_targets))
-            logging.info('Remaining guides & standards (this mag range): %d, %d' %
-                         (len(non_candidate_guide_targets), len(standard_targets_range)))
+        catalogues = (candidate_targets_master, standard_targets,
+                      non_candidate_guide_targets)
+
+        range_timings.append(time.time())
+
+        # Set aside the candidate tiles which can't hold any targets in this
+        # range (i.e. have no in-range science targets within TILE_RADIUS).
+        # These would only ever score zero. They are returned to the
+        # candidate tiles, in their original order, at the end of the range
+        all_tiles = candidate_tiles
+        if resuming:
+            candidate_tiles = [_decode_tile(t, catalogues)
+                               for t in state['candidate_tiles']]
+            pruned_tiles = [_decode_tile(t, catalogues)
+                            for t in state['pruned_tiles']]
+            start_position = dict(
+                (t, k) for t, k in zip(candidate_tiles + pruned_tiles,
+                                       state['tile_positions'] +
+                                       state['pruned_positions'])
+                if k is not None)
+        else:
+            start_position = dict((t, k) for k, t in enumerate(all_tiles))
+            tile_mask = np.copy(range_mask)
+            tile_mask[len(candidate_targets_master):] = [
+                t.science and mag_range[0] <= t.mag < mag_range[1]
+                for t in standard_targets]
+            tile_inds = index_tree.query_ball_point(
+                [tp.polar2cart((t.ra, t.dec)) for t in all_tiles],
+                tp.dist_euclidean(tp.TILE_RADIUS / 3600.))
+            keep = [np.any(tile_mask[inds]) for inds in tile_inds]
+            candidate_tiles = [t for t, k in zip(all_tiles, keep) if k]
+            pruned_tiles = [t for t, k in zip(all_tiles, keep) if not k]
+        logging.info('Using %d of %d candidate tiles for this mag range' %
+                     (len(candidate_tiles), len(all_tiles)))
+        range_timings.append(time.time())
+
+        if resuming:
+            # Restore the state of this magnitude range from the checkpoint
+            for t, difficulty in zip(candidate_targets_master,
+                                     state['difficulties']):
+                t.difficulty = difficulty
+            tile_list = [_decode_tile(t, catalogues)
+                         for t in state['tile_list']]
+            counters.update(state['counters'])
+            random.setstate(state['random_state'])
+
+        # The greedy selection for this magnitude range (see _TileSelector).
+        # A separate worker pool is used for each magnitude range
+        selector = _TileSelector(
+            candidate_tiles, candidate_targets_range, standard_targets_range,
+            non_candidate_guide_targets,
+            dict(check_tile_radius=True,
+                 recompute_difficulty=False,
+                 method=tile_unpick_method,
+                 combined_weight=combined_weight,
+                 sequential_ordering=sequential_ordering,
+                 rank_supplements=rank_supplements,
+                 repick_after_complete=repick_after_complete,
+                 consider_removed_targets=False,
+                 allow_standard_targets=True,
+                 preserve_order=preserve_order),
+            ranking_method, disqualify_below_min_range, randomise_pa,
+            recompute_difficulty, tp.TILE_RADIUS+tp.FIBRE_EXCLUSION_RADIUS,
+            reunpick_method, defer_unpicks, selection_engine, ncpu, counters,
+            report)
+
+        with _closing_pool(selector.pool):
+            # Unpick ALL of these tiles
+            # Note that we are *not* updating candidate_targets during this process,
+            # as overlap is allowed - instead, we will need to manually update
+            # candidate_tiles once we pick the highest-ranked tile
+            if resuming:
+                selector.restore(state)
+            else:
+                logging.info('Creating initial tile unpicks...')
+                selector.initial_unpick()
+
+            # While we are below our completeness criteria AND the
+            # highest-ranked tile
+            # is not empty, perform the greedy algorithm
+            range_timings.append(time.time())
+            logging.info('Starting greedy/Funnelweb tiling allocation...')
+            if resuming:
+                n_priority_targets = state['n_priority_targets']
+                remaining_priority_targets = state['remaining_priority_targets']
+            else:
+                n_priority_targets = 0
+                for t in candidate_targets_range:
+                    if t.priority >= completeness_priority:
+                        n_priority_targets += 1
+                if n_priority_targets == 0:
+                    raise ValueError('Require some priority targets in each mag range!')
+                remaining_priority_targets = n_priority_targets
+            # If resuming, pass on the tiles restored from the checkpoint first
+            n_range_tiles = len(tile_list)
+            completeness = (float(no_submitted_targets -
+                                  len(candidate_targets))
+                            / float(no_submitted_targets))
+            try:
+                for tile in tile_list:
+                    yield (_output_tile(tile, overlay), completeness,
+                           len(candidate_targets))
+            except GeneratorExit:
+                _release_targets(overlay, caller_targets, candidate_targets)
+                raise
+            if checkpoint_file is None:
+                del tile_list[:]
+            #PARALLEL - the following loop could copy tile_list, and run many versions of
+            #this together. 
+            while ((float(n_priority_targets - remaining_priority_targets) 
+                / float(n_priority_targets)) < completeness_target) and (
+                max(selector.ranking_list) > 0.05): # !!! Warning: 0.05 is hardwirded here
+                # - what does it mean??? It a simple proxy for max > 0
+
+                # Find the highest-ranked tile in the candidates_list, and
+                # remove it
+                tile_list += selector.select_tiles(remove_targets)
+                n_range_tiles += 1
+
+                logging.info('Now assigned %d tiles' % (len(tile_list), ))
+                logging.info('Completeness achieved: %1.4f' %
+                             (float(no_submitted_targets - len(candidate_targets)) / float(no_submitted_targets)))
+                logging.info('Remaining targets: %d' % len(candidate_targets))
+                logging.info('Remaining guides & standards (this mag range): %d, %d' %
+                             (len(non_candidate_guide_targets), len(standard_targets_range)))
                 
-            # Add the magnitude range information
-            tile_list[-1].mag_min = mag_range[0]
-            tile_list[-1].mag_max = mag_range[1]
-
-            # If the max of the ranking_list is now 0, try switching off 
-            # the disqualify flag
-            if max(ranking_list) < 0.05 and disqualify_below_min_range:
-                logging.info('Detected no remaining legal tiles - '
-                             'relaxing requirements')
-                disqualify_below_min_range = False
-                ranking_list = [tile.calculate_tile_score(
-                    method=ranking_method,
-                    disqualify_below_min=disqualify_below_min) 
-                    for tile in candidate_tiles]
-                # print ranking_list
+                # Add the magnitude range information
+                tile_list[-1].mag_min = mag_range[0]
+                tile_list[-1].mag_max = mag_range[1]
+
+                # If the max of the ranking_list is now 0, switch off the
+                # disqualify flag. The rankings of this magnitude range are
+                # left as they are, so the relaxed requirements only apply from
+                # the next magnitude range on
+                selector.relax_requirements(rescore=False)
+
+                # Pass the selected tile on, before writing any checkpoint (see
+                # iter_tiling_greedy)
+                try:
+                    yield (_output_tile(tile_list[-1], overlay),
+                           float(no_submitted_targets - len(candidate_targets)) /
+                           float(no_submitted_targets),
+                           len(candidate_targets))
+                except GeneratorExit:
+                    _release_targets(overlay, caller_targets, candidate_targets)
+                    raise
+                tiles_since_checkpoint += 1
+                if checkpoint_file is None:
+                    del tile_list[:]
+                elif tiles_since_checkpoint >= checkpoint_interval:
+                    with report.stage('checkpoint'):
+                        write_checkpoint()
+                    tiles_since_checkpoint = 0
                 
+        disqualify_below_min_range = selector.disqualify_below_min
+        range_timings.append(time.time())
+
+        # Return the set-aside tiles to the candidate tiles. The remaining
+        # tiles keep their original order, followed by the replacement tiles
+        # in the order they were created
+        candidate_tiles = sorted(
+            [t for t in candidate_tiles if t in start_position] +
+            pruned_tiles, key=start_position.get) + [
+            t for t in candidate_tiles if t not in start_position]
+
         # Now return the priorities to as they were!
         if mag_range_prioritise: 
             for t in candidate_targets_range:
@@ -1378,18 +3979,143 @@ def generate_tiling_funnelweb(candidate_targets, standard_targets,
                     t.priority -= prioritise_extra
         #Log where we're up to:
         logging.info('** For mag range: {0:3.1f} to {1:3.1f}, '.format(mag_range_prioritise[0], mag_range_prioritise[1]))
-        logging.info('Total Tiles so far = {0:d}'.format(len(tile_list)))
+        logging.info('Total Tiles so far = {0:d}'.format(n_range_tiles))
+        logging.info('Mag range timings: setup {0:.1f}s, tile pruning '
+                     '{1:.1f}s, initial unpicks {2:.1f}s, '
+                     'tile selection {3:.1f}s'.format(
+                         *np.diff(range_timings)))
+        for name, seconds in zip(['range_setup', 'tile_pruning'],
+                                 np.diff(range_timings)):
+            report.add_time(name, seconds)
+        report.count('tiles_selected', n_range_tiles)
 
-        # Consolidate the tiling. For FunnelWeb, we only do this for separate magnitude ranges.
-        #!!! This doesn't seem to do much.
-        tile_list = tiling_consolidate(tile_list)
         # print ranking_list
         tile_lists.append(tile_list)
-    
+
+    report.counters.update(counters)
+    logging.info('Selection engine %s: %d tile score evaluations, '
+                 '%d avoided' % (selection_engine,
+                                 counters['score_evaluations'],
+                                 counters['score_evaluations_avoided']))
+    if selection_engine == 'check':
+        logging.info('Selection engine check: %d mismatches found' %
+                     counters['selection_mismatches'])
+
+    _release_targets(overlay, caller_targets, candidate_targets)
+
+
+def generate_tiling_funnelweb(candidate_targets, standard_targets,
+                              guide_targets,
+                              completeness_target = 1.0,
+                              ranking_method='priority-sum',
+                              disqualify_below_min=True,
+                              tiling_method='SH', randomise_pa=True,
+                              randomise_SH=True, tiling_file='ipack.3.8192.txt',
+                              ra_min=0.0, ra_max=360.0, dec_min=-90.0,
+                              dec_max=90.0,
+                              mag_ranges_prioritise=[[5,7],
+                                                     [7,8],
+                                                     [9,10],
+                                                     [11,12]],
+                              prioritise_extra=4,
+                              completeness_priority=4,
+                              mag_ranges=[[5,8],[7,10],[9,12],[11,14]],
+                              tiling_set_size=1000,
+                              tile_unpick_method='sequential',
+                              combined_weight=1.0,
+                              sequential_ordering=(1,2), rank_supplements=False,
+                              repick_after_complete=True,
+                              recompute_difficulty=True,
+                              reunpick_method='full',
+                              defer_unpicks=False,
+                              selection_engine='lazy',
+                              ncpu=1,
+                              preserve_order=True,
+                              checkpoint_file=None,
+                              checkpoint_interval=10,
+                              resume_from=None,
+                              target_overlay=False,
+                              report_file=None,
+                              return_report=False):
+    """
+    Generate a tiling based on the greedy algorithm operating on a set of magnitude 
+    ranges sequentially.
+
+    The tiles are generated by iter_tiling_funnelweb, and the tiles for each
+    magnitude range are then consolidated (see tiling_consolidate). See
+    iter_tiling_funnelweb for a description of the algorithm and the
+    other parameters.
+
+    Parameters
+    ----------
+    report_file, return_report :
+        Write a JSON report of the time spent in each stage of the tiling
+        to report_file, and/or return it. See generate_tiling_greedy.
+        Default to None and False, respectively.
+
+    Returns
+    -------
+    tile_list : 
+        The list of tiles making up the tiling.
+        
+    final_completeness : 
+        The target completeness achieved.
+        
+    candidate_targets : 
+        Any targets from candidate_targets that do not
+        appear in the final tiling_list (i.e. were not assigned to a successful
+        tile).
+
+    report :
+        The report of the tiling (see TilingReport.as_dict). Only returned
+        if return_report is True.
+    """
+    no_submitted_targets = len(candidate_targets)
+    report = TilingReport('generate_tiling_funnelweb')
+
+    # Gather the tiles of each magnitude range, which are yielded in turn
+    tile_lists = []
+    mag_range = None
+    for tile, completeness, remaining in iter_tiling_funnelweb(
+            candidate_targets, standard_targets, guide_targets,
+            completeness_target=completeness_target,
+            ranking_method=ranking_method,
+            disqualify_below_min=disqualify_below_min,
+            tiling_method=tiling_method, randomise_pa=randomise_pa,
+            randomise_SH=randomise_SH, tiling_file=tiling_file,
+            ra_min=ra_min, ra_max=ra_max, dec_min=dec_min, dec_max=dec_max,
+            mag_ranges_prioritise=mag_ranges_prioritise,
+            prioritise_extra=prioritise_extra,
+            completeness_priority=completeness_priority,
+            mag_ranges=mag_ranges,
+            tiling_set_size=tiling_set_size,
+            tile_unpick_method=tile_unpick_method,
+            combined_weight=combined_weight,
+            sequential_ordering=sequential_ordering,
+            rank_supplements=rank_supplements,
+            repick_after_complete=repick_after_complete,
+            recompute_difficulty=recompute_difficulty,
+            reunpick_method=reunpick_method,
+            defer_unpicks=defer_unpicks,
+            selection_engine=selection_engine,
+            ncpu=ncpu,
+            preserve_order=preserve_order,
+            checkpoint_file=checkpoint_file,
+            checkpoint_interval=checkpoint_interval,
+            resume_from=resume_from,
+            target_overlay=target_overlay,
+            report=report):
+        if (tile.mag_min, tile.mag_max) != mag_range:
+            mag_range = (tile.mag_min, tile.mag_max)
+            tile_lists.append([])
+        tile_lists[-1].append(tile)
+
+    # Consolidate the tiling. For FunnelWeb, we only do this for separate magnitude ranges.
+    #!!! This doesn't seem to do much.
     #Put all tiles in one big list now.
     tile_list=[]
     for l in tile_lists:
-        tile_list.extend(l)
+        tile_list.extend(tiling_consolidate(l, report=report))
 
     # Return the tiling, the completeness factor and the remaining targets
     final_completeness = float(no_submitted_targets 
@@ -1397,10 +4123,15 @@ def generate_tiling_funnelweb(candidate_targets, standard_targets,
 
     if not repick_after_complete:
         # Do a global re-pick, given we didn't do it on the fly
-        for t in tile_list:
-            t.repick_tile()
+        with report.stage('repick'):
+            for t in tile_list:
+                t.repick_tile()
 
-    return tile_list, final_completeness, candidate_targets
+    report.result.update([('tiles', len(tile_list)),
+                          ('completeness', final_completeness),
+                          ('remaining_targets', len(candidate_targets))])
+    return _finish_report(report, report_file, return_report,
+                          (tile_list, final_completeness, candidate_targets))
 
 
 def generate_tiling_greedy_npasses(candidate_targets, standard_targets,
@@ -1417,6 +4148,7 @@ def generate_tiling_greedy_npasses(candidate_targets, standard_targets,
                                    repick_after_complete=True,
                                    recompute_difficulty=True,
                                    repeat_targets=False,
+                                   ncpu=1,
                                    ):
     """
     Generate a tiling based on the greedy algorithm, but instead of going
@@ -1502,6 +4234,15 @@ def generate_tiling_greedy_npasses(candidate_targets, standard_targets,
         generated must have an independent set of science targets assigned
         (False). Defaults to False.
 
+    ncpu:
+        The number of worker processes to use. Defaults to 1. If greater
+        than 1, fields which cannot interact are tiled concurrently (see
+        unpick_tiles_waves). The output is the same as for ncpu=1, as the
+        tiles are always unpicked with preserve_order=True (see
+        TaipanTile.unpick_tile). In either case, the targets near each
+        field are found with a single spatial query, and each field is
+        unpicked against only those targets.
+
     Returns
     -------
     tile_list :
@@ -1523,6 +4264,10 @@ def generate_tiling_greedy_npasses(candidate_targets, standard_targets,
     ra_min, ra_max, dec_min, dec_max = compute_bounds(ra_min, ra_max,
                                                       dec_min, dec_max)
 
+    ncpu = int(ncpu)
+    if ncpu <= 0:
+        raise ValueError('ncpu must be > 0')
+
     logging.info('Starting tile unpicking')
     no_submitted_targets = len(candidate_targets)
     if no_submitted_targets == 0:
@@ -1537,33 +4282,607 @@ def generate_tiling_greedy_npasses(candidate_targets, standard_targets,
         recompute_difficulty = True
 
     candidate_targets_master = candidate_targets[:]
-
-    for tile in tiles:
+    unpick_kwargs = dict(method=tile_unpick_method,
+                         combined_weight=combined_weight,
+                         sequential_ordering=sequential_ordering,
+                         rank_supplements=rank_supplements,
+                         repick_after_complete=repick_after_complete,
+                         consider_removed_targets=False,
+                         recompute_difficulty=recompute_difficulty,
+                         preserve_order=True)
+
+    # Find the candidates near each field once. Each field is then unpicked
+    # against only these (see unpick_tiles_waves), rather than the full
+    # candidate list
+    in_range = tp.targets_in_range_multi(
+        [(tile.ra, tile.dec) for tile in tiles], candidate_targets_master,
+        tp.TILE_RADIUS + 2. * tp.FIBRE_EXCLUSION_RADIUS, preserve_order=True)
+
+    if ncpu > 1:
+        pool = create_unpick_pool(candidate_targets, standard_targets,
+                                  guide_targets, ncpu, **unpick_kwargs)
+        field_tiles = [[tile.clone() for i in range(npass)] for tile in tiles]
+        with _closing_pool(pool):
+            candidate_targets_master = unpick_tiles_waves(
+                pool, field_tiles, candidate_targets_master,
+                overwrite_existing=True, repeat_targets=repeat_targets,
+                in_range=in_range)
+        output_tiles = [t for field in field_tiles for t in field]
+        return output_tiles, candidate_targets_master
+
+    local = _LocalCandidates(tiles, candidate_targets_master,
+                             tp.TILE_RADIUS + 2. * tp.FIBRE_EXCLUSION_RADIUS,
+                             in_range=in_range)
+    for k, tile in enumerate(tiles):
         # Regenerate the target catalogue
         logging.info('Tiling for field %d (RA %3.1f, DEC %2.1f)' %
                      (tile.field_id, tile.ra, tile.dec))
         if repeat_targets:
-            candidate_targets_master = candidate_targets[:]
-        for i in range(npass):
-            logging.debug('Pass %d of %d' % (i+1, npass))
-            # Create a tile copy
-            candidate_tile = copy.copy(tile)
-            # Unpick the tile based on the candidate list
-            candidate_targets_master, _ = candidate_tile.unpick_tile(
-                candidate_targets_master,
-                standard_targets,
-                guide_targets,
-                overwrite_existing=True,
-                check_tile_radius=True,
-                method=tile_unpick_method,
-                combined_weight=combined_weight,
-                sequential_ordering=sequential_ordering,
-                rank_supplements=rank_supplements,
-                repick_after_complete=repick_after_complete,
-                consider_removed_targets=False,
-                recompute_difficulty=recompute_difficulty
-            )
-            output_tiles.append(candidate_tile)
+            # Each field starts from the full candidate list
+            cands = in_range[k]
+        else:
+            cands = local.near(k)
+        # Unpick npass copies of the tile, one after another, based on the
+        # candidates near it
+        field_tiles = [tile.clone() for i in range(npass)]
+        changes = _unpick_position(field_tiles, cands, standard_targets,
+                                   guide_targets,
+                                   dict(unpick_kwargs,
+                                        overwrite_existing=True))
+        if not repeat_targets or k == len(tiles) - 1:
+            local.update(*changes)
+        output_tiles += field_tiles
 
     # Send the returned tiles back
-    return output_tiles, candidate_targets_master
+    return output_tiles, local.remaining()
+
+
+# Target catalogues and tiling options for the region worker processes.
+# These are set before the worker pool is created; see create_unpick_pool.
+_region_catalogues = None
+_region_kwargs = None
+
+
+def _region_worker(patch):
+    """
+    Tile a single region patch in a worker process.
+
+    Parameters
+    ----------
+    patch : tuple
+        (key, (ra_min, ra_max, dec_min, dec_max), seed, candidate_inds,
+        standard_inds, guide_inds), where the bounds are those of the patch
+        (tile centres are restricted to this region), seed is used to seed
+        the random module before the patch is tiled, and the index lists
+        give the targets in the patch and its halo.
+
+    Returns
+    -------
+    key :
+        The key passed in with the patch.
+
+    tiles : list of 4-tuples
+        The tiles generated, as (ra, dec, pa, fibres) tuples, where fibres
+        are encoded as per _encode_fibres.
+    """
+    key, bounds, seed, candidate_inds, standard_inds, guide_inds = patch
+    catalogues = [[_region_catalogues[c][i] for i in inds] for c, inds
+                  in enumerate([candidate_inds, standard_inds, guide_inds])]
+    if len(catalogues[0]) == 0:
+        return key, []
+    random.seed(seed)
+    # The patch is tiled with a target overlay, so the catalogues (which
+    # may be shared with other patches tiled by this process) are left
+    # untouched
+    tile_list, burn, burn = generate_tiling_greedy(
+        catalogues[0][:], catalogues[1], catalogues[2],
+        ra_min=bounds[0], ra_max=bounds[1],
+        dec_min=bounds[2], dec_max=bounds[3],
+        target_overlay=True, **_region_kwargs)
+    lookup = _catalogue_lookup(_region_catalogues)
+    return key, [(t.ra, t.dec, t.pa, _encode_fibres(t, lookup))
+                 for t in tile_list]
+
+
+def compute_region_patches(ra_min, ra_max, dec_min, dec_max,
+                           ra_patches=2, dec_patches=2):
+    """
+    Split a region of sky into a grid of patches.
+
+    Parameters
+    ----------
+    ra_min, ra_max, dec_min, dec_max :
+        The RA and Dec bounds of the region, in decimal degrees. See
+        compute_bounds for the handling of RA ranges spanning 0 deg RA.
+
+    ra_patches, dec_patches :
+        The number of patches to divide the region into in RA and Dec
+        respectively. Defaults to 2.
+
+    Returns
+    -------
+    patches : list of 4-tuples
+        The (ra_min, ra_max, dec_min, dec_max) bounds of each patch, in
+        a form which may be passed directly to compute_bounds and
+        is_within_bounds.
+    """
+    ra_patches = int(ra_patches)
+    dec_patches = int(dec_patches)
+    if ra_patches <= 0 or dec_patches <= 0:
+        raise ValueError('ra_patches and dec_patches must be > 0')
+
+    ra_min, ra_max, dec_min, dec_max = compute_bounds(ra_min, ra_max,
+                                                      dec_min, dec_max)
+    ra_edges = np.linspace(ra_min, ra_max, ra_patches + 1)
+    dec_edges = np.linspace(dec_min, dec_max, dec_patches + 1)
+
+    patches = []
+    for i in range(dec_patches):
+        for j in range(ra_patches):
+            ra_lo, ra_hi = ra_edges[j], ra_edges[j + 1]
+            # Patches wholly below 0 RA need to be moved back into range
+            if ra_hi <= 0.:
+                ra_lo += 360.
+                ra_hi += 360.
+            patches.append((ra_lo, ra_hi, dec_edges[i], dec_edges[i + 1]))
+
+    return patches
+
+
+def is_within_halo(target, ra_min, ra_max, dec_min, dec_max, halo):
+    """
+    Check if a target (or tile) is within a region plus a surrounding halo.
+
+    Parameters
+    ----------
+    target :
+        The TaipanTarget (or TaipanTile) to check.
+
+    ra_min, ra_max, dec_min, dec_max :
+        The bounds of the region, as returned by compute_region_patches.
+
+    halo :
+        The width of the halo, in arcseconds.
+
+    Returns
+    -------
+    within_halo :
+        Boolean value denoting whether the target is within the region or
+        its halo.
+    """
+    halo = halo / 3600.
+    if target.dec < dec_min - halo or target.dec > dec_max + halo:
+        return False
+    # Work out the RA extent of the halo at the most polar point of the
+    # expanded region
+    dec_extreme = min(max(abs(dec_min - halo), abs(dec_max + halo)), 90.)
+    if dec_extreme > 90. - 1e-5:
+        return True
+    halo_ra = halo / math.cos(math.radians(dec_extreme))
+    half_width = (ra_max - ra_min) / 2.
+    if half_width + halo_ra >= 180.:
+        return True
+    ra_offset = abs((target.ra - (ra_min + half_width) + 180.) % 360. - 180.)
+    return ra_offset <= half_width + halo_ra
+
+
+def generate_tiling_greedy_regions(candidate_targets, standard_targets,
+                                   guide_targets,
+                                   ra_min=0.0, ra_max=360.0, dec_min=-90.0,
+                                   dec_max=90.0,
+                                   ra_patches=2, dec_patches=2,
+                                   ncpu=1, seed=None,
+                                   **kwargs):
+    """
+    Generate a tiling by running the greedy algorithm independently on
+    patches of the sky, and then merging the results.
+
+    Tiles more than a few degrees apart do not interact, so large regions
+    can be tiled by splitting them into patches, and tiling each patch in
+    its own process:
+
+    - Split the region into a grid of patches (see compute_region_patches);
+    - Tile each patch with generate_tiling_greedy. Tile centres are
+      restricted to the patch, but the targets in a halo of width
+      2 * TILE_RADIUS around the patch are also made available;
+    - Reconcile the patch tilings. Any target assigned in more than one
+      patch (which can only happen in the halos) is kept on the tile from
+      the patch which owns the target (i.e. the patch containing it), or
+      the first tile found otherwise, and removed from the others. The
+      tiles which lost targets are then re-unpicked around their existing
+      assignments (see TaipanTile.reunpick_tile), to fill the freed fibres
+      from the unassigned targets;
+    - Consolidate the merged tiling.
+
+    Parameters
+    ----------
+    candidate_targets, standard_targets, guide_targets :
+        The lists of science, standard and guide targets to consider,
+        respectively. Should be lists of TaipanTarget objects. Targets should
+        have unique idns.
+
+    ra_min, ra_max, dec_min, dec_max :
+        The RA and Dec bounds of the region to be considered, in decimal
+        degrees. See generate_tiling_greedy for details.
+
+    ra_patches, dec_patches :
+        The number of patches to divide the region into in RA and Dec
+        respectively. Defaults to 2.
+
+    ncpu :
+        The number of patches to tile concurrently. Defaults to 1. The
+        patches themselves are always tiled with ncpu=1, and with a target
+        overlay (see generate_tiling_greedy), so the tiling does not depend
+        on ncpu.
+
+    seed :
+        The master seed, from which the seed for tiling each patch is
+        derived (see generate_tiling_greedy_ensemble). Defaults to None, in
+        which case the master seed is drawn from the random module.
+
+    kwargs :
+        Any other arguments to be passed to generate_tiling_greedy. Note
+        that completeness_target will apply separately to each patch
+        (including its halo targets).
+
+    Returns
+    -------
+    tile_list :
+        The list of tiles making up the tiling.
+
+    final_completeness :
+        The target completeness achieved.
+
+    candidate_targets :
+        Any targets from candidate_targets that do not appear in the final
+        tiling_list.
+
+    report : dict
+        A summary of the tiling, with keys:
+        'patches' - a list with one dict per patch, giving the patch
+        'bounds', the number of candidate targets owned by the patch
+        ('targets'), the number of these assigned in the merged tiling
+        ('assigned'), the resulting 'completeness', and the number of tiles
+        the patch contributed to the merged tiling ('tiles');
+        'duplicates' - the number of duplicate target assignments removed;
+        'completeness' - the completeness of the merged tiling.
+    """
+    global _region_catalogues, _region_kwargs
+
+    ncpu = int(ncpu)
+    if ncpu <= 0:
+        raise ValueError('ncpu must be > 0')
+    no_submitted_targets = len(candidate_targets)
+    if no_submitted_targets == 0:
+        raise ValueError('Attempting to generate a tiling with no targets!')
+
+    patches = compute_region_patches(ra_min, ra_max, dec_min, dec_max,
+                                     ra_patches=ra_patches,
+                                     dec_patches=dec_patches)
+    halo = 2.0 * tp.TILE_RADIUS
+    catalogues = (candidate_targets[:], standard_targets[:],
+                  guide_targets[:])
+
+    # Derive the seed of each patch from the master seed up front, so the
+    # seeds don't depend on how the patches are distributed
+    if seed is None:
+        seed = random.randint(0, 2**31 - 1)
+    seed_rng = random.Random(seed)
+    seeds = [seed_rng.randint(0, 2**31 - 1) for k in range(len(patches))]
+
+    # Work out which targets each patch owns, and which are available to it
+    logging.info('Dividing region into %d patches...' % len(patches))
+    owner = {}
+    tasks = []
+    for k, bounds in enumerate(patches):
+        for t in catalogues[0]:
+            if id(t) not in owner and is_within_bounds(t, *bounds):
+                owner[id(t)] = k
+        tasks.append((k, bounds, seeds[k]) + tuple(
+            [i for i, t in enumerate(catalogue)
+             if is_within_halo(t, *bounds, halo=halo)]
+            for catalogue in catalogues))
+    # Tile the densest patches first
+    tasks.sort(key=lambda x: -1 * len(x[3]))
+
+    # Tile the patches. Tiling the patches in this process reseeds the
+    # random module, so put it back how we found it afterwards
+    _region_catalogues = catalogues
+    _region_kwargs = dict(kwargs, ncpu=1)
+    random_state = random.getstate()
+    pool = None
+    if ncpu > 1:
+        pool = multiprocessing.Pool(ncpu)
+    try:
+        with _closing_pool(pool):
+            if pool is not None:
+                results = pool.imap_unordered(_region_worker, tasks,
+                                              chunksize=1)
+            else:
+                results = (_region_worker(task) for task in tasks)
+            patch_tiles = {}
+            for k, tiles in results:
+                logging.info('Patch %d complete: %d tiles' % (k, len(tiles)))
+                patch_tiles[k] = []
+                for ra, dec, pa, fibres in tiles:
+                    tile = tp.TaipanTile(ra, dec, pa=pa)
+                    _decode_fibres(tile, fibres, catalogues)
+                    patch_tiles[k].append(tile)
+    finally:
+        random.setstate(random_state)
+
+    # Reconcile the patch tilings
+    logging.info('Reconciling patch tilings...')
+    tile_patch = {}
+    holders = {}
+    for k in range(len(patches)):
+        for tile in patch_tiles[k]:
+            tile_patch[tile] = k
+            for f, t in tile.get_assigned_targets_science(
+                    return_dict=True).iteritems():
+                holders.setdefault(id(t), []).append((tile, f))
+    duplicates = 0
+    changed_tiles = set()
+    for target_id, held in holders.iteritems():
+        if len(held) < 2:
+            continue
+        keep = [h for h in held
+                if tile_patch[h[0]] == owner.get(target_id)]
+        keep = keep[0] if len(keep) > 0 else held[0]
+        for tile, f in held:
+            if (tile, f) != keep:
+                tile.unassign_fibre(f)
+                changed_tiles.add(tile)
+                duplicates += 1
+    logging.info('Removed %d duplicate target assignments' % duplicates)
+
+    assigned = set(holders.keys())
+    remaining_targets = [t for t in catalogues[0] if id(t) not in assigned]
+    for k in range(len(patches)):
+        for tile in patch_tiles[k]:
+            if tile in changed_tiles:
+                remaining_targets, burn = tile.reunpick_tile(
+                    set(), remaining_targets, catalogues[1], catalogues[2],
+                    method=kwargs.get('tile_unpick_method', 'sequential'),
+                    combined_weight=kwargs.get('combined_weight', 1.0),
+                    sequential_ordering=kwargs.get('sequential_ordering',
+                                                   (1, 2)),
+                    rank_supplements=kwargs.get('rank_supplements', False))
+
+    tile_list = [tile for k in range(len(patches))
+                 for tile in patch_tiles[k]]
+    tile_list = tiling_consolidate(tile_list)
+
+    # Build the report
+    final_completeness = float(no_submitted_targets
+        - len(remaining_targets)) / float(no_submitted_targets)
+    unassigned = set([id(t) for t in remaining_targets])
+    report = {'patches': [], 'duplicates': duplicates,
+              'completeness': final_completeness}
+    for k, bounds in enumerate(patches):
+        owned = [i for i, o in owner.iteritems() if o == k]
+        n_assigned = len([i for i in owned if i not in unassigned])
+        report['patches'].append({
+            'bounds': bounds,
+            'targets': len(owned),
+            'assigned': n_assigned,
+            'completeness': (float(n_assigned) / float(len(owned))
+                             if len(owned) > 0 else 1.),
+            'tiles': len([t for t in tile_list if tile_patch.get(t) == k]),
+        })
+        logging.info('Patch %d (RA %3.1f - %3.1f, Dec %2.1f - %2.1f): '
+                     'completeness %1.4f, %d tiles' %
+                     ((k, ) + tuple(bounds) +
+                      (report['patches'][-1]['completeness'],
+                       report['patches'][-1]['tiles'])))
+    logging.info('Merged tiling completeness: %1.4f' % final_completeness)
+
+    return tile_list, final_completeness, remaining_targets, report
+
+
+# Target catalogues and tiling options for the ensemble worker processes.
+# These are set before the worker pool is created; see create_unpick_pool.
+_ensemble_catalogues = None
+_ensemble_kwargs = None
+
+ENSEMBLE_SELECTION = [
+    'tiles',
+    'completeness',
+]
+
+
+def _ensemble_worker(task):
+    """
+    Generate a single seeded tiling of an ensemble in a worker process.
+
+    Parameters
+    ----------
+    task : 2-tuple
+        (key, seed), where seed is used to seed the random module before
+        the tiling is generated.
+
+    Returns
+    -------
+    key :
+        The key passed in with the task.
+
+    tiles : list of 4-tuples
+        The tiles generated, as (ra, dec, pa, fibres) tuples, where fibres
+        are encoded as per _encode_fibres.
+
+    completeness : float
+        The completeness of the tiling.
+
+    remaining_inds : list of ints
+        The indices into the candidate targets of those targets which were
+        not assigned.
+
+    run_time : float
+        The time taken to generate the tiling, in seconds.
+    """
+    key, seed = task
+    start = time.time()
+    random.seed(seed)
+    # The tiling is run with a target overlay, so the catalogues (which may
+    # be shared with other tilings run by this process) are left untouched
+    tile_list, completeness, remaining_targets = generate_tiling_greedy(
+        _ensemble_catalogues[0][:], _ensemble_catalogues[1],
+        _ensemble_catalogues[2], target_overlay=True, **_ensemble_kwargs)
+    lookup = _catalogue_lookup(_ensemble_catalogues)
+    return (key, [(t.ra, t.dec, t.pa, _encode_fibres(t, lookup))
+                  for t in tile_list],
+            completeness, [lookup[id(t)][1] for t in remaining_targets],
+            time.time() - start)
+
+
+def generate_tiling_greedy_ensemble(candidate_targets, standard_targets,
+                                    guide_targets,
+                                    nseeds=4, seed=0,
+                                    select_by='tiles',
+                                    ncpu=1,
+                                    **kwargs):
+    """
+    Generate several greedy tilings with different random seeds, and return
+    the best.
+
+    The greedy tiling depends on the random seed offset and position angles
+    of the initial tiles (see randomise_SH and randomise_pa in
+    generate_tiling_greedy). This function runs the same tiling nseeds times,
+    each with the random module seeded from a seed derived from the master
+    seed, and returns the best result. The tilings are independent of each
+    other, and of the number of processes used, so the result is fixed for
+    a given master seed.
+
+    Parameters
+    ----------
+    candidate_targets, standard_targets, guide_targets :
+        The lists of science, standard and guide targets to consider,
+        respectively. Should be lists of TaipanTarget objects.
+
+    nseeds :
+        The number of tilings to generate. Defaults to 4.
+
+    seed :
+        The master seed, from which the seed for each tiling is derived.
+        Defaults to 0.
+
+    select_by : str
+        The criterion used to pick the best tiling. One of:
+
+        *tiles* - The tiling with the fewest tiles, with ties broken by
+        completeness. This is the default.
+
+        *completeness* - The tiling with the highest completeness, with ties
+        broken by the number of tiles.
+
+        Any remaining ties are broken in favour of the earlier seed.
+
+    ncpu :
+        The number of tilings to generate concurrently. Defaults to 1. The
+        tilings themselves are always generated with ncpu=1.
+
+    kwargs :
+        Any other arguments to be passed to generate_tiling_greedy. The
+        checkpointing arguments (checkpoint_file, resume_from) and
+        report_file are not supported, target_overlay is always used, and
+        return_report is ignored.
+
+    Returns
+    -------
+    tile_list :
+        The list of tiles making up the best tiling.
+
+    final_completeness :
+        The target completeness achieved by the best tiling.
+
+    candidate_targets :
+        Any targets from candidate_targets that do not appear in the best
+        tiling.
+
+    report : dict
+        A summary of the ensemble, with keys:
+        'seeds' - a list with one dict per tiling, in seed order, giving the
+        'seed' used, the number of 'tiles', the 'completeness', the number of
+        'remaining' targets and the run 'time' in seconds;
+        'best' - the index into 'seeds' of the tiling returned.
+    """
+    global _ensemble_catalogues, _ensemble_kwargs
+
+    nseeds = int(nseeds)
+    if nseeds <= 0:
+        raise ValueError('nseeds must be > 0')
+    ncpu = int(ncpu)
+    if ncpu <= 0:
+        raise ValueError('ncpu must be > 0')
+    if select_by not in ENSEMBLE_SELECTION:
+        raise ValueError('select_by must be one of %s' %
+                         str(ENSEMBLE_SELECTION))
+    for arg in ['checkpoint_file', 'resume_from', 'report_file']:
+        if kwargs.get(arg) is not None:
+            raise ValueError('%s cannot be used with an ensemble tiling' %
+                             arg)
+    kwargs.pop('target_overlay', None)
+    kwargs.pop('return_report', None)
+    if len(candidate_targets) == 0:
+        raise ValueError('Attempting to generate a tiling with no targets!')
+
+    # Derive the seed of each tiling from the master seed. This is done up
+    # front, so the seeds don't depend on how the tilings are distributed
+    seed_rng = random.Random(seed)
+    seeds = [seed_rng.randint(0, 2**31 - 1) for k in range(nseeds)]
+    tasks = list(enumerate(seeds))
+    logging.info('Generating %d tilings with master seed %s...' %
+                 (nseeds, str(seed), ))
+
+    # Generate the tilings. Running the tilings in this process reseeds the
+    # random module, so put it back how we found it afterwards
+    catalogues = (candidate_targets[:], standard_targets[:],
+                  guide_targets[:])
+    _ensemble_catalogues = catalogues
+    _ensemble_kwargs = dict(kwargs, ncpu=1)
+    random_state = random.getstate()
+    pool = None
+    if ncpu > 1:
+        pool = multiprocessing.Pool(min(ncpu, nseeds))
+    try:
+        with _closing_pool(pool):
+            if pool is not None:
+                results = pool.map(_ensemble_worker, tasks, chunksize=1)
+            else:
+                results = [_ensemble_worker(task) for task in tasks]
+    finally:
+        random.setstate(random_state)
+    results.sort(key=lambda x: x[0])
+
+    report = {'seeds': []}
+    for k, tiles, completeness, remaining_inds, run_time in results:
+        report['seeds'].append({
+            'seed': seeds[k],
+            'tiles': len(tiles),
+            'completeness': completeness,
+            'remaining': len(remaining_inds),
+            'time': run_time,
+        })
+        logging.info('Seed %d: %d tiles, completeness %1.4f (%.1f s)' %
+                     (seeds[k], len(tiles), completeness, run_time))
+
+    # Pick the best tiling
+    if select_by == 'tiles':
+        rank = lambda k: (report['seeds'][k]['tiles'],
+                          -1 * report['seeds'][k]['completeness'], k)
+    else:
+        rank = lambda k: (-1 * report['seeds'][k]['completeness'],
+                          report['seeds'][k]['tiles'], k)
+    best = min(range(nseeds), key=rank)
+    report['best'] = best
+    logging.info('Best tiling from seed %d' % seeds[best])
+
+    burn, tiles, final_completeness, remaining_inds, burn = results[best]
+    tile_list = []
+    for ra, dec, pa, fibres in tiles:
+        tile = tp.TaipanTile(ra, dec, pa=pa)
+        _decode_fibres(tile, fibres, catalogues)
+        tile_list.append(tile)
+    remaining_targets = [catalogues[0][i] for i in remaining_inds]
+
+    return tile_list, final_completeness, remaining_targets, report